@@ -0,0 +1,105 @@
+"""
+Benchmark for command line startup time.
+
+Each command runs in a new process for ``--repeat`` times, reporting min/median/max wall time.
+Modules imported by each command are checked,
+so that heavy packages (matplotlib, cartopy, cedar_graph) are not loaded before they are needed.
+
+Example:
+
+    python benchmarks/bench_cli_startup.py --repeat 10 --output startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+COMMANDS = {
+    "help": ["--help"],
+    "list-plots": ["list-plots"],
+    "draw-help": ["draw", "--help"],
+    "task-help": ["task", "--help"],
+}
+
+HEAVY_MODULES = ["pandas", "matplotlib", "cartopy", "cedar_graph", "cedarkit.maps"]
+
+# run CLI and print heavy modules loaded at exit, to stderr.
+CHECK_SCRIPT = """
+import atexit, sys, runpy
+heavy = {heavy_modules!r}
+atexit.register(lambda: print(",".join(m for m in heavy if m in sys.modules), file=sys.stderr))
+sys.argv = ["cemc_plots_kit"] + {arguments!r}
+runpy.run_module("cemc_plots_kit", run_name="__main__")
+"""
+
+
+def time_command(arguments: list[str], repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "cemc_plots_kit", *arguments],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - start_time)
+    return times
+
+
+def get_loaded_heavy_modules(arguments: list[str]) -> list[str]:
+    script = CHECK_SCRIPT.format(heavy_modules=HEAVY_MODULES, arguments=arguments)
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ""
+    return [m for m in last_line.split(",") if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark for command line startup time")
+    parser.add_argument("--repeat", type=int, default=5, help="repeat count of each command")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+
+    # python interpreter without any package, as reference.
+    baseline_times = []
+    for _ in range(args.repeat):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        baseline_times.append(time.perf_counter() - start_time)
+
+    results = [{
+        "command": "python",
+        "min": min(baseline_times),
+        "median": statistics.median(baseline_times),
+        "max": max(baseline_times),
+        "heavy_modules": [],
+    }]
+    for name, arguments in COMMANDS.items():
+        times = time_command(arguments, repeat=args.repeat)
+        results.append({
+            "command": name,
+            "min": min(times),
+            "median": statistics.median(times),
+            "max": max(times),
+            "heavy_modules": get_loaded_heavy_modules(arguments),
+        })
+
+    print(f"{'command':<16}{'min (s)':>10}{'median (s)':>12}{'max (s)':>10}  heavy modules")
+    for result in results:
+        print(f"{result['command']:<16}{result['min']:>10.3f}{result['median']:>12.3f}{result['max']:>10.3f}"
+              f"  {','.join(result['heavy_modules'])}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
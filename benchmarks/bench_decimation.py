@@ -0,0 +1,166 @@
+"""
+Benchmark for field decimation, plotting a forecast sequence for each plot type in modes:
+
+* off: plot fields at model resolution (current default)
+* mean: reduce fields by block average, see ``decimation`` in runtime config
+* subsample: reduce fields by taking one grid point from each block
+
+Reported time of each frame is ``decimate`` + ``plot`` stages, loading and saving are not included.
+Each mode and plot type runs in a new process.
+Output images of each mode are written to ``{work_dir}/{mode}/{plot_type}`` for visual comparison.
+
+Example:
+
+    python benchmarks/bench_decimation.py \
+        --system-name CMA-MESO-1KM \
+        --data-dir ./data/cma_meso_1km/{start_time_label} \
+        --start-time 2024111300 \
+        --plot-type t_2m --plot-type wind_10m \
+        --work-dir ./bench
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+
+MODES = ["off", "mean", "subsample"]
+
+
+def run_mode(
+        mode: str,
+        plot_type: str,
+        system_name: str,
+        data_dir: str,
+        start_time: str,
+        forecast_time: str,
+        forecast_interval: str,
+        work_dir: str,
+        area: Optional[str] = None,
+) -> dict:
+    import numpy as np
+    import pandas as pd
+    from cemc_plots_kit.config import (
+        ExprConfig, RuntimeConfig, TimeConfig, PlotConfig, JobConfig,
+        parse_start_time, get_default_data_file_name_template,
+    )
+    from cemc_plots_kit.plots import get_plot_module
+    from cemc_plots_kit.task import run_by_serial
+
+    area_range = None
+    if area is not None:
+        from cedarkit.maps.util import AreaRange
+        area_range = AreaRange.from_tuple([float(i) for i in area.split(",")])
+
+    start_time = parse_start_time(start_time)
+    plot_module = get_plot_module(plot_name=plot_type)
+    output_dir = Path(work_dir, mode, plot_type).absolute()
+    expr_config = ExprConfig(
+        system_name=system_name,
+        data_dir=data_dir,
+        data_file_name_template=get_default_data_file_name_template(system_name=system_name),
+        area=area_range,
+    )
+    runtime_config = RuntimeConfig(
+        work_dir=output_dir,
+        output_dir=output_dir,
+        decimation=None if mode == "off" else mode,
+    )
+
+    job_configs = []
+    for current_forecast_time in pd.timedelta_range("0h", forecast_time, freq=forecast_interval):
+        time_config = TimeConfig(start_time=start_time, forecast_time=current_forecast_time)
+        plot_config = PlotConfig(plot_name=plot_type)
+        if not plot_module.check_available(time_config=time_config, plot_config=plot_config):
+            continue
+        job_configs.append(JobConfig(
+            expr_config=expr_config,
+            time_config=time_config,
+            runtime_config=runtime_config,
+            plot_config=plot_config,
+        ))
+
+    job_results = run_by_serial(job_configs=job_configs)
+
+    frame_times = [
+        r.stage_times.get("decimate", 0.0) + r.stage_times.get("plot", 0.0)
+        for r in job_results if r.succeeded
+    ]
+    return {
+        "mode": mode,
+        "plot_type": plot_type,
+        "frames": len(job_results),
+        "failed": len(job_results) - len(frame_times),
+        "p50_frame_time": float(np.percentile(frame_times, 50)) if len(frame_times) > 0 else None,
+        "max_frame_time": float(np.max(frame_times)) if len(frame_times) > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark for field decimation")
+    parser.add_argument("--system-name", required=True, help="system name, such as CMA-MESO-1KM")
+    parser.add_argument("--data-dir", required=True, help="data directory")
+    parser.add_argument("--start-time", required=True, help="start time, such as 2024111300")
+    parser.add_argument("--forecast-time", default="24h", help="last forecast time")
+    parser.add_argument("--forecast-interval", default="3h", help="forecast interval")
+    parser.add_argument("--plot-type", action="append", required=True, help="plot type, can be set several times")
+    parser.add_argument("--area", default=None, help="plot area, format: start_lon,end_lon,start_lat,end_lat")
+    parser.add_argument("--work-dir", default=".", help="directory for output images")
+    parser.add_argument("--mode", choices=MODES, default=None, help="run only one mode in current process")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        result = run_mode(
+            mode=args.mode,
+            plot_type=args.plot_type[0],
+            system_name=args.system_name,
+            data_dir=args.data_dir,
+            start_time=args.start_time,
+            forecast_time=args.forecast_time,
+            forecast_interval=args.forecast_interval,
+            work_dir=args.work_dir,
+            area=args.area,
+        )
+        print(json.dumps(result))
+        return
+
+    results = []
+    for plot_type in args.plot_type:
+        for mode in MODES:
+            command = [
+                sys.executable, __file__,
+                "--system-name", args.system_name,
+                "--data-dir", args.data_dir,
+                "--start-time", args.start_time,
+                "--forecast-time", args.forecast_time,
+                "--forecast-interval", args.forecast_interval,
+                "--plot-type", plot_type,
+                "--work-dir", args.work_dir,
+                "--mode", mode,
+            ]
+            if args.area is not None:
+                command.extend(["--area", args.area])
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'plot type':<24}{'mode':>12}{'frames':>8}{'failed':>8}{'p50 (s)':>10}{'max (s)':>10}{'speed-up':>10}")
+    baseline = dict()
+    for result in results:
+        p50_frame_time = result["p50_frame_time"] or float("nan")
+        max_frame_time = result["max_frame_time"] or float("nan")
+        if result["mode"] == "off":
+            baseline[result["plot_type"]] = p50_frame_time
+        speed_up = baseline[result["plot_type"]] / p50_frame_time
+        print(f"{result['plot_type']:<24}{result['mode']:>12}{result['frames']:>8}{result['failed']:>8}"
+              f"{p50_frame_time:>10.2f}{max_frame_time:>10.2f}{speed_up:>10.2f}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"start_time": args.start_time, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark for reading fields from GRIB2 files using ``ExprLocalDataSource``:
+
+* file: scan file from beginning using ``get_field_from_file`` (current default)
+* index: seek to message using GRIB2 message index
+* mmap: decode message from memory-mapped file using GRIB2 message index
+
+Each mode runs in a new process to measure peak RSS.
+
+Example:
+
+    python benchmarks/bench_grib_read.py \
+        --file /g3/COMMONDATA/OPER/CEMC/GFS_GMF/Prod-grib/2024111300/ORIG/gmf.gra.2024111300024.grb2 \
+        --index-dir ./index --repeat 3
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from copy import deepcopy
+from pathlib import Path
+
+
+MODES = ["file", "index", "mmap"]
+
+
+def get_field_infos() -> list:
+    from cedar_graph.data.field_info import hgt_info, mslp_info, u_info, v_info, t_2m_info, apcp_info
+
+    hgt_500_info = deepcopy(hgt_info)
+    hgt_500_info.level_type = "pl"
+    hgt_500_info.level = 500
+
+    u_10m_info = deepcopy(u_info)
+    u_10m_info.level_type = "heightAboveGround"
+    u_10m_info.level = 10
+
+    v_10m_info = deepcopy(v_info)
+    v_10m_info.level_type = "heightAboveGround"
+    v_10m_info.level = 10
+
+    return [hgt_500_info, mslp_info, u_10m_info, v_10m_info, t_2m_info, apcp_info]
+
+
+def run_mode(mode: str, file_path: str, index_dir: str, repeat: int) -> dict:
+    from cedar_graph.data.source import get_field_from_file
+    from cemc_plots_kit.source import get_field_from_file_with_index, get_field_from_file_with_mmap
+    from cemc_plots_kit.source.index import get_grib_index
+
+    field_infos = get_field_infos()
+
+    if mode != "file":
+        # index is built once for each file, exclude it from reading time.
+        get_grib_index(file_path=file_path, index_dir=index_dir)
+
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for field_info in field_infos:
+            if mode == "file":
+                field = get_field_from_file(field_info=field_info, file_path=file_path)
+            elif mode == "index":
+                field = get_field_from_file_with_index(field_info=field_info, file_path=file_path, index_dir=index_dir)
+            else:
+                field = get_field_from_file_with_mmap(field_info=field_info, file_path=file_path, index_dir=index_dir)
+            if field is None:
+                raise ValueError(f"field is not found: {field_info}")
+            del field
+    elapsed = time.perf_counter() - start_time
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {
+        "mode": mode,
+        "fields": len(field_infos) * repeat,
+        "time": elapsed,
+        "time_per_field": elapsed / (len(field_infos) * repeat),
+        "max_rss_mb": usage.ru_maxrss / 1024,
+        "block_input": usage.ru_inblock,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark for reading GRIB2 fields")
+    parser.add_argument("--file", required=True, help="GRIB2 file path")
+    parser.add_argument("--index-dir", default=None, help="directory of index files")
+    parser.add_argument("--repeat", type=int, default=1, help="repeat times for all fields")
+    parser.add_argument("--mode", choices=MODES, default=None, help="run only one mode in current process")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        result = run_mode(args.mode, args.file, args.index_dir, args.repeat)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for mode in MODES:
+        command = [sys.executable, __file__, "--file", args.file, "--repeat", str(args.repeat), "--mode", mode]
+        if args.index_dir is not None:
+            command.extend(["--index-dir", args.index_dir])
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'mode':<8}{'fields':>8}{'time (s)':>12}{'per field (s)':>16}{'max rss (MB)':>16}")
+    for result in results:
+        print(f"{result['mode']:<8}{result['fields']:>8}{result['time']:>12.3f}"
+              f"{result['time_per_field']:>16.4f}{result['max_rss_mb']:>16.1f}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"file": str(Path(args.file).absolute()), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
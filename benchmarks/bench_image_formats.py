@@ -0,0 +1,103 @@
+"""
+Benchmark for output image formats.
+
+Images produced by plot jobs (such as ``output`` directory of a task) are decoded into RGBA arrays,
+and encoded with each format supported by ``image_format`` in runtime config.
+Size and encoding time are compared against the current output, RGBA PNG with default compression level.
+Pixel difference after decoding is also reported, lossless formats should have zero difference.
+Quantized ``png8`` images change colors of some pixels slightly,
+pixels differing by more than ``VISIBLE_DIFFERENCE`` levels in any channel are counted as visible changes.
+
+Example:
+
+    python benchmarks/bench_image_formats.py ./output/*.png --repeat 3 --output image_formats.json
+"""
+import argparse
+import io
+import json
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from cemc_plots_kit.output import encode_image, IMAGE_FILE_SUFFIXES
+
+
+VISIBLE_DIFFERENCE = 8
+
+# (case name, image format, PNG compression level), the first one is the reference.
+CASES = [
+    ("png", "png", None),
+    ("png-level1", "png", 1),
+    *[(image_format, image_format, None) for image_format in IMAGE_FILE_SUFFIXES if image_format != "png"],
+]
+
+
+def run_case(image: np.ndarray, image_format: str, compress_level, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        content = encode_image(image, image_format=image_format, compress_level=compress_level)
+        times.append(time.perf_counter() - start_time)
+    decoded_image = np.asarray(Image.open(io.BytesIO(content)).convert("RGBA"))
+    difference = np.abs(decoded_image.astype(np.int16) - image.astype(np.int16)).max(axis=-1)
+    return {
+        "size": len(content),
+        "encode_time": statistics.median(times),
+        "max_difference": int(difference.max()),
+        "changed_pixels": float((difference > 0).mean()),
+        "visible_pixels": float((difference > VISIBLE_DIFFERENCE).mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark for output image formats")
+    parser.add_argument("images", nargs="+", help="image files produced by plot jobs")
+    parser.add_argument("--repeat", type=int, default=3, help="repeat count of encoding each image")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for image_file in args.images:
+        image = np.asarray(Image.open(image_file).convert("RGBA"))
+        for name, image_format, compress_level in CASES:
+            result = run_case(image, image_format=image_format, compress_level=compress_level, repeat=args.repeat)
+            result.update(image=str(Path(image_file).name), case=name)
+            results.append(result)
+
+    summary = []
+    reference = [r for r in results if r["case"] == CASES[0][0]]
+    reference_size = sum(r["size"] for r in reference)
+    reference_time = sum(r["encode_time"] for r in reference)
+    for name, _, _ in CASES:
+        case_results = [r for r in results if r["case"] == name]
+        size = sum(r["size"] for r in case_results)
+        encode_time = sum(r["encode_time"] for r in case_results)
+        summary.append({
+            "case": name,
+            "mean_size": size / len(case_results),
+            "mean_encode_time": encode_time / len(case_results),
+            "size_ratio": size / reference_size,
+            "time_ratio": encode_time / reference_time,
+            "max_difference": max(r["max_difference"] for r in case_results),
+            "changed_pixels": statistics.mean(r["changed_pixels"] for r in case_results),
+            "visible_pixels": statistics.mean(r["visible_pixels"] for r in case_results),
+        })
+
+    print(f"{len(args.images)} images, compared with {CASES[0][0]}")
+    print(f"{'case':<12}{'size (KB)':>12}{'size ratio':>12}{'encode (s)':>12}{'time ratio':>12}"
+          f"{'max diff':>10}{'changed':>10}{'visible':>10}")
+    for item in summary:
+        print(f"{item['case']:<12}{item['mean_size'] / 1024:>12.1f}{item['size_ratio']:>12.2f}"
+              f"{item['mean_encode_time']:>12.3f}{item['time_ratio']:>12.2f}"
+              f"{item['max_difference']:>10}{item['changed_pixels']:>10.2%}{item['visible_pixels']:>10.2%}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"repeat": args.repeat, "summary": summary, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark for map feature cache and panel reuse, plotting a forecast sequence for each plot type in modes:
+
+* off: create figure and load map features for each frame (current default)
+* map_feature_cache: reuse map features, see ``map_feature_cache`` in runtime config
+* reuse_panels: reuse figures with the same map layout, see ``reuse_panels`` in runtime config
+
+Default sequence is 41 frames, 0h to 240h every 6h.
+Each mode and plot type runs in a new process, so the first frame includes loading map features.
+
+Example:
+
+    python benchmarks/bench_map_cache.py \
+        --system-name CMA-GFS \
+        --data-dir /g3/COMMONDATA/OPER/CEMC/GFS_GMF/Prod-grib/{start_time_label}/ORIG \
+        --start-time 2024111300 \
+        --plot-type height_500_mslp --plot-type t_2m \
+        --work-dir ./bench
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+MODES = ["off", "map_feature_cache", "reuse_panels"]
+
+
+def run_mode(
+        mode: str,
+        plot_type: str,
+        system_name: str,
+        data_dir: str,
+        start_time: str,
+        forecast_time: str,
+        forecast_interval: str,
+        work_dir: str,
+) -> dict:
+    import pandas as pd
+    from cemc_plots_kit.config import (
+        ExprConfig, RuntimeConfig, TimeConfig, PlotConfig, JobConfig,
+        parse_start_time, get_default_data_file_name_template,
+    )
+    from cemc_plots_kit.plots import get_plot_module
+    from cemc_plots_kit.task import run_by_serial
+
+    start_time = parse_start_time(start_time)
+    plot_module = get_plot_module(plot_name=plot_type)
+    output_dir = Path(work_dir, mode, plot_type).absolute()
+    expr_config = ExprConfig(
+        system_name=system_name,
+        data_dir=data_dir,
+        data_file_name_template=get_default_data_file_name_template(system_name=system_name),
+    )
+    runtime_config = RuntimeConfig(work_dir=output_dir, output_dir=output_dir)
+
+    job_configs = []
+    for current_forecast_time in pd.timedelta_range("0h", forecast_time, freq=forecast_interval):
+        time_config = TimeConfig(start_time=start_time, forecast_time=current_forecast_time)
+        plot_config = PlotConfig(plot_name=plot_type)
+        if not plot_module.check_available(time_config=time_config, plot_config=plot_config):
+            continue
+        job_configs.append(JobConfig(
+            expr_config=expr_config,
+            time_config=time_config,
+            runtime_config=runtime_config,
+            plot_config=plot_config,
+        ))
+
+    begin_time = time.perf_counter()
+    job_results = run_by_serial(
+        job_configs=job_configs,
+        map_feature_cache=mode == "map_feature_cache",
+        reuse_panels=mode == "reuse_panels",
+    )
+    elapsed = time.perf_counter() - begin_time
+
+    job_times = [r.elapsed_time.total_seconds() for r in job_results if r.succeeded]
+    return {
+        "mode": mode,
+        "plot_type": plot_type,
+        "frames": len(job_results),
+        "failed": len(job_results) - len(job_times),
+        "time": elapsed,
+        "first_frame_time": job_times[0] if len(job_times) > 0 else None,
+        "mean_frame_time": sum(job_times[1:]) / (len(job_times) - 1) if len(job_times) > 1 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark for map feature cache and panel reuse")
+    parser.add_argument("--system-name", required=True, help="system name, such as CMA-GFS")
+    parser.add_argument("--data-dir", required=True, help="data directory")
+    parser.add_argument("--start-time", required=True, help="start time, such as 2024111300")
+    parser.add_argument("--forecast-time", default="240h", help="last forecast time")
+    parser.add_argument("--forecast-interval", default="6h", help="forecast interval")
+    parser.add_argument("--plot-type", action="append", required=True, help="plot type, can be set several times")
+    parser.add_argument("--work-dir", default=".", help="directory for output images")
+    parser.add_argument("--mode", choices=MODES, default=None, help="run only one mode in current process")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        result = run_mode(
+            mode=args.mode,
+            plot_type=args.plot_type[0],
+            system_name=args.system_name,
+            data_dir=args.data_dir,
+            start_time=args.start_time,
+            forecast_time=args.forecast_time,
+            forecast_interval=args.forecast_interval,
+            work_dir=args.work_dir,
+        )
+        print(json.dumps(result))
+        return
+
+    results = []
+    for plot_type in args.plot_type:
+        for mode in MODES:
+            command = [
+                sys.executable, __file__,
+                "--system-name", args.system_name,
+                "--data-dir", args.data_dir,
+                "--start-time", args.start_time,
+                "--forecast-time", args.forecast_time,
+                "--forecast-interval", args.forecast_interval,
+                "--plot-type", plot_type,
+                "--work-dir", args.work_dir,
+                "--mode", mode,
+            ]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'plot type':<24}{'mode':>20}{'frames':>8}{'time (s)':>12}{'first (s)':>12}{'mean (s)':>12}{'speed-up':>10}")
+    baseline = dict()
+    for result in results:
+        if result["mode"] == "off":
+            baseline[result["plot_type"]] = result["time"]
+        speed_up = baseline[result["plot_type"]] / result["time"]
+        first_frame_time = result["first_frame_time"] or float("nan")
+        mean_frame_time = result["mean_frame_time"] or float("nan")
+        print(f"{result['plot_type']:<24}{result['mode']:>20}{result['frames']:>8}{result['time']:>12.2f}"
+              f"{first_frame_time:>12.2f}{mean_frame_time:>12.2f}{speed_up:>10.2f}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"start_time": args.start_time, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
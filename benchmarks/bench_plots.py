@@ -0,0 +1,347 @@
+"""
+Benchmark for all plot modules and task executors, using synthetic data from ``synthetic_data.py``
+so it can run without the data archive.
+
+Two kinds of cases are measured, each one in a new process:
+
+* plot: run jobs of one plot module with ``run_by_serial``, reporting p50/p95/max of each job stage.
+* executor: run a task file with all plot modules using ``run_task`` for each executor (serial, parallel, pipeline).
+
+Jobs whose data files are missing are skipped, such as ``rain_1h_wind_10m`` if data interval is longer than 1h.
+
+Results are written as JSON with ``--output``.
+Use ``--baseline`` to compare with a previous result file,
+the command exits with code 1 if any case is slower than the baseline by more than ``--threshold``.
+
+Example:
+
+    python benchmarks/bench_plots.py \
+        --system-name CMA-MESO-3KM \
+        --data-dir ./data/cma_meso_3km/{start_time_label} \
+        --generate \
+        --work-dir ./bench \
+        --output ./bench/result.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+
+EXECUTORS = ["serial", "parallel", "pipeline"]
+
+
+def get_plot_types() -> list[str]:
+    from cemc_plots_kit.registry import get_plot_names
+
+    return get_plot_names()
+
+
+def get_job_configs(
+        plot_type: str,
+        system_name: str,
+        data_dir: str,
+        start_time: str,
+        forecast_time: str,
+        forecast_interval: str,
+        output_dir: Path,
+) -> tuple[list, int]:
+    """
+    Return available jobs and count of jobs skipped because of missing data files.
+    """
+    import pandas as pd
+    from cemc_plots_kit.config import (
+        ExprConfig, RuntimeConfig, TimeConfig, PlotConfig, JobConfig,
+        parse_start_time, get_default_data_file_name_template,
+    )
+    from cemc_plots_kit.plots import get_plot_module
+    from cemc_plots_kit.schedule import get_job_input_files
+
+    start_time = parse_start_time(start_time)
+    plot_module = get_plot_module(plot_name=plot_type)
+    expr_config = ExprConfig(
+        system_name=system_name,
+        data_dir=data_dir,
+        data_file_name_template=get_default_data_file_name_template(system_name=system_name),
+    )
+    runtime_config = RuntimeConfig(work_dir=output_dir, output_dir=output_dir)
+
+    job_configs = []
+    skipped_count = 0
+    for current_forecast_time in pd.timedelta_range("0h", forecast_time, freq=forecast_interval):
+        time_config = TimeConfig(start_time=start_time, forecast_time=current_forecast_time)
+        plot_config = PlotConfig(plot_name=plot_type)
+        if not plot_module.check_available(time_config=time_config, plot_config=plot_config):
+            continue
+        job_config = JobConfig(
+            expr_config=expr_config,
+            time_config=time_config,
+            runtime_config=runtime_config,
+            plot_config=plot_config,
+        )
+        if not all(f.exists() for f in get_job_input_files(job_config)):
+            skipped_count += 1
+            continue
+        job_configs.append(job_config)
+    return job_configs, skipped_count
+
+
+def run_plot_case(
+        plot_type: str,
+        system_name: str,
+        data_dir: str,
+        start_time: str,
+        forecast_time: str,
+        forecast_interval: str,
+        work_dir: str,
+) -> dict:
+    from cemc_plots_kit.task import run_by_serial
+    from cemc_plots_kit.timing import summarize_stage_times
+
+    job_configs, skipped_count = get_job_configs(
+        plot_type=plot_type,
+        system_name=system_name,
+        data_dir=data_dir,
+        start_time=start_time,
+        forecast_time=forecast_time,
+        forecast_interval=forecast_interval,
+        output_dir=Path(work_dir, "plot", plot_type).absolute(),
+    )
+
+    begin_time = time.perf_counter()
+    job_results = run_by_serial(job_configs=job_configs)
+    elapsed = time.perf_counter() - begin_time
+
+    records = [r.to_timing_record() for r in job_results if r.succeeded]
+    stages = summarize_stage_times(records).get(plot_type, dict())
+    return {
+        "case": f"plot/{plot_type}",
+        "jobs": len(job_results),
+        "failed": len(job_results) - len(records),
+        "skipped": skipped_count,
+        "time": elapsed,
+        "stages": stages,
+    }
+
+
+def run_executor_case(
+        executor: str,
+        plot_types: list[str],
+        system_name: str,
+        data_dir: str,
+        start_time: str,
+        forecast_time: str,
+        forecast_interval: str,
+        work_dir: str,
+        max_workers: Optional[int],
+) -> dict:
+    from cemc_plots_kit.task import run_task
+
+    base_work_dir = Path(work_dir, "executor", executor).absolute()
+    base_work_dir.mkdir(parents=True, exist_ok=True)
+    runtime_config = {
+        "base_work_dir": str(base_work_dir),
+        "executor": executor,
+    }
+    if max_workers is not None:
+        runtime_config["max_workers"] = max_workers
+    task_config = {
+        "runtime": runtime_config,
+        "source": {"data_dir": data_dir},
+        "system_name": system_name,
+        "time": {
+            "start_time": start_time,
+            "forecast_time": forecast_time,
+            "forecast_interval": forecast_interval,
+        },
+        "plots": {plot_type: True for plot_type in plot_types},
+    }
+    task_file_path = Path(base_work_dir, "task.yaml")
+    with open(task_file_path, "w") as f:
+        yaml.safe_dump(task_config, f)
+
+    begin_time = time.perf_counter()
+    job_results = run_task(task_file_path=task_file_path, force=True)
+    elapsed = time.perf_counter() - begin_time
+
+    failed_count = len([r for r in job_results if not r.succeeded])
+    return {
+        "case": f"executor/{executor}",
+        "jobs": len(job_results),
+        "failed": failed_count,
+        "skipped": 0,
+        "time": elapsed,
+    }
+
+
+def get_available_plot_types(args, plot_types: list[str]) -> list[str]:
+    """
+    Return plot types with no skipped jobs, used in executor cases so failed jobs don't distort the time.
+    """
+    available_plot_types = []
+    for plot_type in plot_types:
+        job_configs, skipped_count = get_job_configs(
+            plot_type=plot_type,
+            system_name=args.system_name,
+            data_dir=args.data_dir,
+            start_time=args.start_time,
+            forecast_time=args.forecast_time,
+            forecast_interval=args.forecast_interval,
+            output_dir=Path(args.work_dir),
+        )
+        if skipped_count == 0 and len(job_configs) > 0:
+            available_plot_types.append(plot_type)
+    return available_plot_types
+
+
+def get_environment() -> dict:
+    from cemc_plots_kit.manifest import get_package_versions
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": get_package_versions(),
+    }
+
+
+def compare_with_baseline(results: list[dict], baseline_file: str, threshold: float) -> list[str]:
+    """
+    Return messages of cases slower than baseline by more than ``threshold``.
+    """
+    with open(baseline_file) as f:
+        baseline_results = {r["case"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        baseline_result = baseline_results.get(result["case"], None)
+        if baseline_result is None or baseline_result["time"] <= 0:
+            continue
+        ratio = result["time"] / baseline_result["time"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{result['case']}: {baseline_result['time']:.2f}s -> {result['time']:.2f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark for plot modules and task executors")
+    parser.add_argument("--system-name", required=True, help="system name, such as CMA-GFS, CMA-MESO-3KM")
+    parser.add_argument("--data-dir", required=True, help="data directory, such as ./data/{start_time_label}")
+    parser.add_argument("--start-time", default="2024111300", help="start time, such as 2024111300")
+    parser.add_argument("--forecast-time", default="24h", help="last forecast time")
+    parser.add_argument("--forecast-interval", default="3h", help="forecast interval")
+    parser.add_argument("--generate", action="store_true", help="generate synthetic data files if missing")
+    parser.add_argument("--plot-type", action="append", default=None, help="plot type, default is all plot modules")
+    parser.add_argument("--executor", action="append", choices=EXECUTORS, default=None, help="executor, default is all")
+    parser.add_argument("--max-workers", type=int, default=None, help="max workers of parallel executor")
+    parser.add_argument("--work-dir", default=".", help="directory for output images")
+    parser.add_argument("--case", default=None, help="run only one case in current process, such as plot/t_2m")
+    parser.add_argument("--output", default=None, help="output JSON file")
+    parser.add_argument("--baseline", default=None, help="baseline JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown ratio against baseline")
+    args = parser.parse_args()
+
+    plot_types = args.plot_type if args.plot_type is not None else get_plot_types()
+    executors = args.executor if args.executor is not None else EXECUTORS
+
+    if args.case is not None:
+        kind, name = args.case.split("/")
+        if kind == "plot":
+            result = run_plot_case(
+                plot_type=name,
+                system_name=args.system_name,
+                data_dir=args.data_dir,
+                start_time=args.start_time,
+                forecast_time=args.forecast_time,
+                forecast_interval=args.forecast_interval,
+                work_dir=args.work_dir,
+            )
+        else:
+            result = run_executor_case(
+                executor=name,
+                plot_types=plot_types,
+                system_name=args.system_name,
+                data_dir=args.data_dir,
+                start_time=args.start_time,
+                forecast_time=args.forecast_time,
+                forecast_interval=args.forecast_interval,
+                work_dir=args.work_dir,
+                max_workers=args.max_workers,
+            )
+        print(json.dumps(result))
+        return
+
+    if args.generate:
+        import pandas as pd
+        from cemc_plots_kit.config import parse_start_time
+        from synthetic_data import generate_data
+
+        generate_data(
+            system_name=args.system_name,
+            data_dir=args.data_dir,
+            start_time=parse_start_time(args.start_time),
+            forecast_time=pd.to_timedelta(args.forecast_time),
+            forecast_interval=pd.to_timedelta(args.forecast_interval),
+        )
+
+    executor_plot_types = get_available_plot_types(args, plot_types)
+    cases = [f"plot/{plot_type}" for plot_type in plot_types] + [f"executor/{executor}" for executor in executors]
+
+    results = []
+    for case in cases:
+        command = [
+            sys.executable, __file__,
+            "--system-name", args.system_name,
+            "--data-dir", args.data_dir,
+            "--start-time", args.start_time,
+            "--forecast-time", args.forecast_time,
+            "--forecast-interval", args.forecast_interval,
+            "--work-dir", args.work_dir,
+            "--case", case,
+        ]
+        if case.startswith("executor/"):
+            for plot_type in executor_plot_types:
+                command.extend(["--plot-type", plot_type])
+        if args.max_workers is not None:
+            command.extend(["--max-workers", str(args.max_workers)])
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'case':<32}{'jobs':>6}{'failed':>8}{'skipped':>9}{'time (s)':>10}{'load p50':>10}{'plot p50':>10}{'save p50':>10}")
+    for result in results:
+        stages = result.get("stages", dict())
+        stage_columns = "".join(
+            f"{stages[stage]['p50']:>10.2f}" if stage in stages else f"{'':>10}"
+            for stage in ["load", "plot", "save"]
+        )
+        print(f"{result['case']:<32}{result['jobs']:>6}{result['failed']:>8}{result['skipped']:>9}"
+              f"{result['time']:>10.2f}{stage_columns}")
+
+    if args.output is not None:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({
+                "system_name": args.system_name,
+                "start_time": args.start_time,
+                "forecast_time": args.forecast_time,
+                "forecast_interval": args.forecast_interval,
+                "environment": get_environment(),
+                "results": results,
+            }, f, indent=2)
+
+    if args.baseline is not None:
+        regressions = compare_with_baseline(results, baseline_file=args.baseline, threshold=args.threshold)
+        for message in regressions:
+            print(f"regression: {message}")
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
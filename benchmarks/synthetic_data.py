@@ -0,0 +1,327 @@
+"""
+Generate synthetic GRIB2 files with fields and grids of CMA systems, for running benchmarks without the data archive.
+
+Files are written with default data file name templates (see ``get_default_data_file_name_template``),
+one file for each forecast time, including all fields required by plots in ``cemc_plots_kit.plots``:
+
+* gh 500hPa, u/v 850hPa
+* prmsl, 2t, u/v 10m
+* APCP, ASNOW: accumulated from start time
+* CR: composite radar reflectivity
+
+Fields are smooth patterns changing with forecast time, so plots have contours and colors similar to real ones.
+
+Supported systems:
+
+* CMA-GFS: 0.125 degree global grid, 2880x1441
+* CMA-MESO-3KM (CMA-MESO): 0.03 degree grid over 70-145E, 10-60.1N, 2501x1671
+* CMA-MESO-1KM: 0.01 degree grid over the same area as CMA-MESO-3KM, 7501x5011
+
+Example:
+
+    python benchmarks/synthetic_data.py \
+        --system-name CMA-MESO-3KM \
+        --data-dir ./data/cma_meso_3km/{start_time_label} \
+        --start-time 2024111300 \
+        --forecast-time 24h --forecast-interval 3h
+"""
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class GridSpec:
+    """
+    Regular lat-lon grid, scanning from north to south.
+    """
+    start_longitude: float
+    end_longitude: float
+    start_latitude: float
+    end_latitude: float
+    resolution: float
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        count = int(round((self.end_longitude - self.start_longitude) / self.resolution)) + 1
+        return self.start_longitude + np.arange(count) * self.resolution
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        count = int(round((self.start_latitude - self.end_latitude) / self.resolution)) + 1
+        return self.start_latitude - np.arange(count) * self.resolution
+
+
+GRID_SPECS = {
+    "cma_gfs": GridSpec(0, 359.875, 90, -90, 0.125),
+    "cma_meso_3km": GridSpec(70, 145, 60.1, 10, 0.03),
+    "cma_meso_1km": GridSpec(70, 145, 60.1, 10, 0.01),
+}
+GRID_SPECS["cma_gfs_gmf"] = GRID_SPECS["cma_gfs"]
+GRID_SPECS["cma_meso"] = GRID_SPECS["cma_meso_3km"]
+
+
+@dataclass
+class SyntheticField:
+    """
+    A field written to each file.
+
+    Attributes
+    ----------
+    name
+        name used in log.
+    keys
+        eccodes keys of parameter and level.
+    values
+        function to create values: (lon, lat, forecast_hour) -> array, lon and lat are 2D radians.
+    accumulated
+        whether the field is accumulated from start time.
+    """
+    name: str
+    keys: dict
+    values: Callable[[np.ndarray, np.ndarray, float], np.ndarray]
+    accumulated: bool = False
+
+
+def _wave(lon: np.ndarray, lat: np.ndarray, hour: float, k: int, l: int, speed: float) -> np.ndarray:
+    return np.sin(k * lon - speed * hour / 24.0) * np.cos(l * lat)
+
+
+def _accumulated_rain(lon: np.ndarray, lat: np.ndarray, hour: float) -> np.ndarray:
+    # integral of rate max(0, pattern) * (1 + 0.5 * sin(t/6)), increasing with time.
+    pattern = np.maximum(_wave(lon, lat, 0, 12, 10, 0) * np.cos(lat), 0) * 2.0
+    return pattern * (hour + 3.0 * (1 - np.cos(hour / 6.0)))
+
+
+def _accumulated_snow(lon: np.ndarray, lat: np.ndarray, hour: float) -> np.ndarray:
+    # snow water equivalent in m, only in high latitudes.
+    cold = np.clip((np.abs(lat) - np.deg2rad(35)) * 3, 0, 1)
+    return _accumulated_rain(lon, lat, hour) * cold / 1000.0
+
+
+FIELDS = [
+    SyntheticField(
+        "gh_500",
+        dict(discipline=0, parameterCategory=3, parameterNumber=5, typeOfLevel="isobaricInhPa", level=500),
+        lambda lon, lat, hour: 5500 + 400 * np.cos(lat) ** 2 + 80 * _wave(lon, lat, hour, 5, 4, 1.5),
+    ),
+    SyntheticField(
+        "u_850",
+        dict(discipline=0, parameterCategory=2, parameterNumber=2, typeOfLevel="isobaricInhPa", level=850),
+        lambda lon, lat, hour: 10 * np.sin(2 * lat) + 8 * _wave(lon, lat, hour, 6, 5, 2),
+    ),
+    SyntheticField(
+        "v_850",
+        dict(discipline=0, parameterCategory=2, parameterNumber=3, typeOfLevel="isobaricInhPa", level=850),
+        lambda lon, lat, hour: 8 * _wave(lon + 1, lat, hour, 6, 5, 2),
+    ),
+    SyntheticField(
+        "prmsl",
+        dict(discipline=0, parameterCategory=3, parameterNumber=1, typeOfFirstFixedSurface=101),
+        lambda lon, lat, hour: 101325 + 1500 * _wave(lon, lat, hour, 4, 3, 1),
+    ),
+    SyntheticField(
+        "t_2m",
+        dict(
+            discipline=0, parameterCategory=0, parameterNumber=0,
+            typeOfFirstFixedSurface=103, scaleFactorOfFirstFixedSurface=0, scaledValueOfFirstFixedSurface=2,
+        ),
+        lambda lon, lat, hour: 245 + 55 * np.cos(lat) + 5 * np.sin(lon + 2 * np.pi * hour / 24),
+    ),
+    SyntheticField(
+        "u_10m",
+        dict(
+            discipline=0, parameterCategory=2, parameterNumber=2,
+            typeOfFirstFixedSurface=103, scaleFactorOfFirstFixedSurface=0, scaledValueOfFirstFixedSurface=10,
+        ),
+        lambda lon, lat, hour: 6 * np.sin(2 * lat) + 5 * _wave(lon, lat, hour, 8, 7, 2),
+    ),
+    SyntheticField(
+        "v_10m",
+        dict(
+            discipline=0, parameterCategory=2, parameterNumber=3,
+            typeOfFirstFixedSurface=103, scaleFactorOfFirstFixedSurface=0, scaledValueOfFirstFixedSurface=10,
+        ),
+        lambda lon, lat, hour: 5 * _wave(lon + 1, lat, hour, 8, 7, 2),
+    ),
+    SyntheticField(
+        "apcp",
+        dict(discipline=0, parameterCategory=1, parameterNumber=8, typeOfFirstFixedSurface=1),
+        _accumulated_rain,
+        accumulated=True,
+    ),
+    SyntheticField(
+        "asnow",
+        dict(discipline=0, parameterCategory=1, parameterNumber=29, typeOfFirstFixedSurface=1),
+        _accumulated_snow,
+        accumulated=True,
+    ),
+    SyntheticField(
+        "cr",
+        dict(discipline=0, parameterCategory=16, parameterNumber=224, typeOfFirstFixedSurface=10),
+        lambda lon, lat, hour: np.clip(70 * _wave(lon, lat, hour, 15, 12, 3) - 10, 0, 60),
+    ),
+]
+
+
+def get_grid_spec(system_name: str) -> GridSpec:
+    key = system_name.lower().replace("-", "_")
+    if key not in GRID_SPECS:
+        raise ValueError(f"system is not supported: {system_name}, supported: {', '.join(GRID_SPECS)}")
+    return GRID_SPECS[key]
+
+
+def write_message(
+        f,
+        grid_spec: GridSpec,
+        start_time: pd.Timestamp,
+        forecast_hour: int,
+        field: SyntheticField,
+        values: np.ndarray,
+        bits_per_value: int,
+):
+    import eccodes
+
+    handle = eccodes.codes_grib_new_from_samples("GRIB2")
+    try:
+        eccodes.codes_set(handle, "centre", "babj")
+        eccodes.codes_set(handle, "dataDate", int(start_time.strftime("%Y%m%d")))
+        eccodes.codes_set(handle, "dataTime", int(start_time.strftime("%H%M")))
+
+        longitudes = grid_spec.longitudes
+        latitudes = grid_spec.latitudes
+        eccodes.codes_set(handle, "gridType", "regular_ll")
+        eccodes.codes_set(handle, "Ni", len(longitudes))
+        eccodes.codes_set(handle, "Nj", len(latitudes))
+        eccodes.codes_set(handle, "latitudeOfFirstGridPointInDegrees", float(latitudes[0]))
+        eccodes.codes_set(handle, "longitudeOfFirstGridPointInDegrees", float(longitudes[0]))
+        eccodes.codes_set(handle, "latitudeOfLastGridPointInDegrees", float(latitudes[-1]))
+        eccodes.codes_set(handle, "longitudeOfLastGridPointInDegrees", float(longitudes[-1]))
+        eccodes.codes_set(handle, "iDirectionIncrementInDegrees", grid_spec.resolution)
+        eccodes.codes_set(handle, "jDirectionIncrementInDegrees", grid_spec.resolution)
+        eccodes.codes_set(handle, "jScansPositively", 0)
+
+        if field.accumulated:
+            eccodes.codes_set(handle, "productDefinitionTemplateNumber", 8)
+            eccodes.codes_set(handle, "typeOfStatisticalProcessing", 1)
+        for key, value in field.keys.items():
+            eccodes.codes_set(handle, key, value)
+        eccodes.codes_set(handle, "stepUnits", 1)
+        if field.accumulated:
+            eccodes.codes_set(handle, "forecastTime", 0)
+            eccodes.codes_set(handle, "indicatorOfUnitForTimeRange", 1)
+            eccodes.codes_set(handle, "lengthOfTimeRange", forecast_hour)
+        else:
+            eccodes.codes_set(handle, "forecastTime", forecast_hour)
+
+        eccodes.codes_set(handle, "bitsPerValue", bits_per_value)
+        eccodes.codes_set_values(handle, values.astype(np.float64).ravel())
+        eccodes.codes_write(handle, f)
+    finally:
+        eccodes.codes_release(handle)
+
+
+def generate_file(
+        file_path: Path,
+        grid_spec: GridSpec,
+        start_time: pd.Timestamp,
+        forecast_time: pd.Timedelta,
+        bits_per_value: int = 16,
+):
+    """
+    Write one GRIB2 file with all synthetic fields for a forecast time.
+    """
+    forecast_hour = int(forecast_time / pd.Timedelta(hours=1))
+    lon = np.deg2rad(grid_spec.longitudes).astype(np.float32)[np.newaxis, :]
+    lat = np.deg2rad(grid_spec.latitudes).astype(np.float32)[:, np.newaxis]
+    shape = (lat.shape[0], lon.shape[1])
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file_path = Path(f"{file_path}.tmp")
+    with open(temp_file_path, "wb") as f:
+        for field in FIELDS:
+            values = np.broadcast_to(field.values(lon, lat, forecast_hour), shape)
+            write_message(
+                f,
+                grid_spec=grid_spec,
+                start_time=start_time,
+                forecast_hour=forecast_hour,
+                field=field,
+                values=values,
+                bits_per_value=bits_per_value,
+            )
+    temp_file_path.replace(file_path)
+
+
+def generate_data(
+        system_name: str,
+        data_dir: str,
+        start_time: pd.Timestamp,
+        forecast_time: pd.Timedelta,
+        forecast_interval: pd.Timedelta,
+        data_file_name_template: Optional[str] = None,
+        overwrite: bool = False,
+) -> list[Path]:
+    """
+    Generate synthetic files from 0h to ``forecast_time``, existing files are skipped unless ``overwrite`` is set.
+
+    Returns
+    -------
+    list[Path]
+        paths of all files.
+    """
+    from cemc_plots_kit.config import get_default_data_file_name_template
+    from cemc_plots_kit.source import get_local_file_path
+
+    grid_spec = get_grid_spec(system_name)
+    if data_file_name_template is None:
+        data_file_name_template = get_default_data_file_name_template(system_name=system_name)
+
+    file_paths = []
+    for current_forecast_time in pd.timedelta_range("0h", forecast_time, freq=forecast_interval):
+        file_path = get_local_file_path(
+            data_dir=data_dir,
+            data_file_name_template=data_file_name_template,
+            start_time=start_time,
+            forecast_time=current_forecast_time,
+        )
+        if overwrite or not file_path.exists():
+            print(f"generating {file_path}...")
+            generate_file(
+                file_path=file_path,
+                grid_spec=grid_spec,
+                start_time=start_time,
+                forecast_time=current_forecast_time,
+            )
+        file_paths.append(file_path)
+    return file_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="generate synthetic GRIB2 files of CMA systems")
+    parser.add_argument("--system-name", required=True, help="system name, such as CMA-GFS, CMA-MESO-3KM, CMA-MESO-1KM")
+    parser.add_argument("--data-dir", required=True, help="data directory, such as ./data/{start_time_label}")
+    parser.add_argument("--start-time", default="2024111300", help="start time, such as 2024111300")
+    parser.add_argument("--forecast-time", default="24h", help="last forecast time")
+    parser.add_argument("--forecast-interval", default="3h", help="forecast interval")
+    parser.add_argument("--overwrite", action="store_true", help="overwrite existing files")
+    args = parser.parse_args()
+
+    from cemc_plots_kit.config import parse_start_time
+
+    generate_data(
+        system_name=args.system_name,
+        data_dir=args.data_dir,
+        start_time=parse_start_time(args.start_time),
+        forecast_time=pd.to_timedelta(args.forecast_time),
+        forecast_interval=pd.to_timedelta(args.forecast_interval),
+        overwrite=args.overwrite,
+    )
+
+
+if __name__ == "__main__":
+    main()
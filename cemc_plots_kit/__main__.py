@@ -1,13 +1,10 @@
 from pathlib import Path
+from typing import Optional
 
 import typer
-import pandas as pd
 
-from cedarkit.maps.util import AreaRange
-
-from cemc_plots_kit.task import run_task
-from cemc_plots_kit.draw import draw_plot
-from cemc_plots_kit.config import parse_start_time
+# Heavy packages (pandas, matplotlib, cartopy, cedar_graph) are imported in commands,
+# so that ``--help`` and ``list-plots`` start quickly.
 
 
 app = typer.Typer()
@@ -16,8 +13,80 @@ app = typer.Typer()
 @app.command(
     help="draw multiple plots using a task file.",
 )
-def task(task_file: Path = typer.Option(..., help="task file path.")):
-    run_task(task_file_path=task_file)
+def task(
+        task_file: Path = typer.Option(..., help="task file path."),
+        watch: bool = typer.Option(False, help="wait for data files and run jobs as soon as their data files are ready."),
+        force: bool = typer.Option(False, help="run all jobs, including jobs completed in previous runs."),
+        shard: Optional[str] = typer.Option(None, help="run one shard of jobs, format: i/N, i is from 0 to N-1."),
+):
+    from cemc_plots_kit.task import run_task
+    from cemc_plots_kit.schedule import parse_shard
+
+    if shard is not None:
+        shard = parse_shard(shard)
+
+    job_results = run_task(task_file_path=task_file, watch=watch, force=force, shard=shard)
+    if not all(r.succeeded for r in job_results):
+        raise typer.Exit(code=1)
+
+
+@app.command(
+    help="write planned jobs of a task file to a plan file without running them.",
+)
+def plan(
+        task_file: Path = typer.Option(..., help="task file path."),
+        output: Path = typer.Option(Path("jobs.jsonl"), help="plan file path, JSON list if suffix is .json, otherwise JSON lines."),
+        shard: Optional[str] = typer.Option(None, help="plan one shard of jobs, format: i/N, i is from 0 to N-1."),
+):
+    from cemc_plots_kit.task import plan_task
+    from cemc_plots_kit.plan import write_plan
+    from cemc_plots_kit.schedule import parse_shard
+
+    if shard is not None:
+        shard = parse_shard(shard)
+
+    _, job_configs = plan_task(task_file_path=task_file, shard=shard)
+    write_plan(output, job_configs)
+    typer.echo(f"{len(job_configs)} jobs are written to {output}")
+
+
+@app.command(
+    name="run-jobs",
+    help="run jobs in a plan file written by plan command.",
+)
+def run_jobs(
+        manifest: Path = typer.Option(..., help="plan file path."),
+        job_range: Optional[str] = typer.Option(None, "--range", help="run jobs with index from a to b-1, format: a:b."),
+        force: bool = typer.Option(False, help="run all jobs, including jobs completed in previous runs."),
+):
+    from dataclasses import replace
+    from cemc_plots_kit.plan import load_plan, parse_job_range, get_range_file_path
+    from cemc_plots_kit.manifest import get_manifest_file_path
+    from cemc_plots_kit.task import run_job_configs
+
+    if job_range is not None:
+        job_range = parse_job_range(job_range)
+
+    job_configs = load_plan(manifest, job_range=job_range)
+    if len(job_configs) == 0:
+        typer.echo("no job to run")
+        return
+
+    runtime_config = job_configs[0].runtime_config
+    if job_range is not None:
+        # each range writes its own files, so ranges can run at the same time.
+        runtime_config = replace(
+            runtime_config,
+            manifest_file=get_range_file_path(get_manifest_file_path(runtime_config), job_range),
+            timing_file=(
+                None if runtime_config.timing_file is None
+                else get_range_file_path(runtime_config.timing_file, job_range)
+            ),
+        )
+
+    job_results = run_job_configs(job_configs=job_configs, runtime_config=runtime_config, force=force)
+    if not all(r.succeeded for r in job_results):
+        raise typer.Exit(code=1)
 
 
 @app.command(
@@ -35,6 +104,11 @@ def draw(
         work_dir = typer.Option(None),
         area = typer.Option(None, help="plot area, default is CN, format: start_longitude,end_longitude,start_latitude,end_latitude"),
 ):
+    import pandas as pd
+    from cedarkit.maps.util import AreaRange
+    from cemc_plots_kit.draw import draw_plot
+    from cemc_plots_kit.config import parse_start_time
+
     start_time = parse_start_time(start_time)
     forecast_time = pd.to_timedelta(forecast_time)
 
@@ -57,5 +131,17 @@ def draw(
     )
 
 
+@app.command(
+    name="list-plots",
+    help="list supported plot types.",
+)
+def list_plots():
+    from cemc_plots_kit.registry import PLOT_REGISTRY
+
+    name_width = max(len(name) for name in PLOT_REGISTRY)
+    for plot_info in PLOT_REGISTRY.values():
+        typer.echo(f"{plot_info.name:<{name_width}}  {plot_info.description}")
+
+
 if __name__ == "__main__":
     app()
@@ -1,11 +1,28 @@
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional, Union
+from typing import Optional, Union, TYPE_CHECKING
 
 import pandas as pd
 
+if TYPE_CHECKING:
+    # cedarkit.maps.util imports matplotlib and cartopy, which are not needed for loading configs.
+    from cedarkit.maps.util import AreaRange
 
-from cedarkit.maps.util import AreaRange
+
+@dataclass
+class NamedArea:
+    """
+    A plot area with name. Name is used in output image file names and figure titles.
+
+    Attributes
+    ----------
+    name
+        area name, such as NorthChina.
+    area
+        area range.
+    """
+    name: str
+    area: "AreaRange"
 
 
 @dataclass
@@ -21,13 +38,34 @@ class ExprConfig:
         Path to the data directory, may be a template.
     area
         Plot area, default is CN.
+    areas
+        Named plot areas. If set, data is loaded once for each job and a figure is plotted for each area,
+        and ``area`` is not used.
     data_file_name_template
         File name template for data.
+    grib_index
+        Use GRIB2 message index to load fields. Index is built once for each file.
+    grib_index_dir
+        Directory to save GRIB2 message index files, default is the same directory of GRIB2 files.
+    grib_mmap
+        Map GRIB2 files into memory and decode messages from mapped bytes. GRIB2 message index is always used.
+    crop_area
+        Crop fields to ``area`` or bounding box of ``areas`` right after loading, to save memory and plotting time.
+        Not used if no plot area is set.
+    crop_margin
+        Margin in degrees added to each side of the crop area,
+        so the map border and projected edges of the plot area are still covered by data.
     """
     system_name: str
     data_dir: Union[str, Path]
-    area: Optional[AreaRange] = None
+    area: Optional["AreaRange"] = None
+    areas: Optional[list[NamedArea]] = None
     data_file_name_template: Optional[str] = None
+    grib_index: bool = False
+    grib_index_dir: Optional[Union[str, Path]] = None
+    grib_mmap: bool = False
+    crop_area: bool = False
+    crop_margin: float = 2.0
 
 
 @dataclass
@@ -41,10 +79,137 @@ class RuntimeConfig:
         Directory for some plot.
     output_dir
         Figures will be saved to this directory.
+    executor
+        Executor used to run jobs in a task, supporting:
+
+        * serial: run jobs one by one in current process.
+        * parallel: run jobs in a process pool.
+        * pipeline: run jobs in current process, loading data of following jobs and writing images in threads
+          while plotting. ``shared_field_store_size``, ``max_jobs_per_worker``, ``max_worker_rss``
+          and ``async_save`` are not supported.
+    max_workers
+        Number of worker processes for ``parallel`` executor, default is the number of CPUs.
+    max_jobs_per_worker
+        Replace a worker process by a new one after it runs this number of jobs,
+        so memory kept by matplotlib, cartopy and data decoders is released in long tasks.
+        For ``serial`` executor, jobs run in one worker process if this option or ``max_worker_rss`` is set.
+    max_worker_rss
+        Replace a worker process by a new one if its resident set size is larger than this value after a job group,
+        such as ``8GB``. See ``parse_size`` for supported format.
+    pipeline_load_workers
+        Number of threads loading data for ``pipeline`` executor.
+    pipeline_save_workers
+        Number of threads writing images for ``pipeline`` executor.
+    pipeline_queue_size
+        Max number of loaded jobs waiting for plotting, and max number of images waiting for writing,
+        for ``pipeline`` executor.
+    async_save
+        Encode and write images in a background thread of each process for ``serial`` and ``parallel`` executors,
+        so the next job is loaded and plotted while images of the previous job are being written.
+        Images are always written in threads for ``pipeline`` executor.
+    image_format
+        Format of output images, supporting:
+
+        * png: RGBA PNG, the same as matplotlib.
+        * png8: indexed-palette PNG with 8-bit pixels, much smaller for filled contours.
+          Images with more than 256 colors are quantized.
+        * webp: lossless WebP, output files use ``.webp`` suffix.
+    decimation
+        Reduce fields to resolution of output images before plotting, so contours of high resolution fields
+        over large areas are faster. Not used if None. Supporting:
+
+        * mean: block average of grid cells, better quality.
+        * subsample: take one grid point from each block, faster.
+
+        Wind components are always subsampled. See ``cemc_plots_kit.decimation``.
+    decimation_pixels_per_cell
+        Min pixels for each grid cell after reduction. Larger values make coarser fields.
+    png_compress_level
+        zlib compression level of output PNG images, 0-9. Lower levels encode faster and make larger files.
+        Default is 6, the same as matplotlib.
+    field_cache_size
+        Memory budget of field cache shared by jobs in one process, such as ``4GB``.
+        Field cache is disabled if not set. See ``parse_size`` for supported format.
+    shared_field_store_size
+        Memory budget of shared field store for ``parallel`` executor, such as ``8GB``.
+        Decoded fields are put into shared memory, decoded once and shared by all worker processes,
+        instead of being kept in field cache of each worker. Returned fields are read-only.
+        Disabled if not set. See ``cemc_plots_kit.source.shared``.
+    group_jobs_by_file
+        Group jobs by data file of their forecast time and run each group in one worker,
+        so a data file is read by as few processes as possible.
+        Groups are split if there are fewer groups than workers or shards.
+        Files of previous forecast times read by accumulated precipitation plots are not considered.
+    share_accumulated_fields
+        Load each forecast time of accumulated fields (APCP, ASNOW) once per process
+        and share them between all rain plots.
+    accumulated_field_store_size
+        Memory budget of each shared accumulated field, such as ``1GB``. Least recently used forecast times
+        are dropped when it is reached, and loaded again if needed. Not limited if None.
+        See ``parse_size`` for supported format.
+    map_feature_cache
+        Load map features (coastlines, borders, provinces, ...) once per process and reuse them in all figures,
+        so projected map paths are also reused by figures with the same projection.
+    transform_cache
+        Compute barb positions and projected grid coordinates once per process for each grid, projection and area,
+        and reuse them in all figures, instead of transforming all grid points in cartopy for each figure.
+    transform_cache_dir
+        Directory to save cached transforms, so they are reused by other processes and later tasks.
+        Only kept in memory if not set.
+    transform_cache_contours
+        Also plot contours on cached projected grid coordinates when data projection is different from
+        map projection, so contour paths are not projected for each figure.
+        Contour lines are computed in map projection, so they are slightly different from default output.
+    reuse_panels
+        Keep figures alive after saving, and reuse them for following figures with the same map layout,
+        such as a forecast sequence of one area. Only data artists are replaced for each figure.
+    watch_interval
+        Seconds between two checks of data files in watch mode.
+    watch_stable_time
+        In watch mode, a data file is complete if its size and modification time
+        have not changed for this number of seconds.
+    watch_marker_suffix
+        In watch mode, a data file is complete if marker file ``{data_file}{watch_marker_suffix}`` exists.
+        ``watch_stable_time`` is not used if set.
+    watch_timeout
+        Max time to wait for data files in watch mode, such as ``6h``. Wait forever if None.
+    manifest_file
+        File to record completed jobs, used to skip unchanged jobs in later runs.
+        Default is ``manifest.jsonl`` in ``base_work_dir``, or in ``output_dir`` if ``base_work_dir`` is not set.
+    timing_file
+        File to write time of each job stage and each loaded field, one JSON line for each job.
     """
     base_work_dir: Optional[Union[str, Path]] = None
     work_dir: Optional[Union[str, Path]]  = None
     output_dir: Optional[Union[str, Path]]  = None
+    executor: str = "serial"
+    max_workers: Optional[int] = None
+    max_jobs_per_worker: Optional[int] = None
+    max_worker_rss: Optional[Union[int, str]] = None
+    pipeline_load_workers: int = 2
+    pipeline_save_workers: int = 2
+    pipeline_queue_size: int = 4
+    async_save: bool = False
+    image_format: str = "png"
+    png_compress_level: Optional[int] = None
+    decimation: Optional[str] = None
+    decimation_pixels_per_cell: float = 1.0
+    field_cache_size: Optional[Union[int, str]] = None
+    shared_field_store_size: Optional[Union[int, str]] = None
+    group_jobs_by_file: bool = True
+    share_accumulated_fields: bool = False
+    accumulated_field_store_size: Optional[Union[int, str]] = "1GB"
+    map_feature_cache: bool = False
+    transform_cache: bool = False
+    transform_cache_dir: Optional[Union[str, Path]] = None
+    transform_cache_contours: bool = False
+    reuse_panels: bool = False
+    watch_interval: float = 10
+    watch_stable_time: float = 30
+    watch_marker_suffix: Optional[str] = None
+    watch_timeout: Optional[str] = None
+    manifest_file: Optional[Union[str, Path]] = None
+    timing_file: Optional[Union[str, Path]] = None
 
 
 @dataclass
@@ -141,6 +306,51 @@ def parse_start_time(start_time_str: str) -> pd.Timestamp:
     return pd.to_datetime(start_time_str, format=format_str)
 
 
+def parse_size(size: Union[int, str]) -> int:
+    """
+    Parse memory size into bytes.
+
+    Parameters
+    ----------
+    size
+        bytes count or size string with unit, supporting units (case insensitive):
+
+        * B
+        * KB, MB, GB, TB: 1024-based units
+
+    Returns
+    -------
+    int
+        bytes count
+
+    Examples
+    --------
+    >>> parse_size(1024)
+    1024
+    >>> parse_size("512MB")
+    536870912
+    >>> parse_size("1.5 GB")
+    1610612736
+    """
+    if isinstance(size, int):
+        return size
+    size_str = str(size).strip().upper()
+    units = {
+        "TB": 1024 ** 4,
+        "GB": 1024 ** 3,
+        "MB": 1024 ** 2,
+        "KB": 1024,
+        "B": 1,
+    }
+    for unit, factor in units.items():
+        if size_str.endswith(unit):
+            return int(float(size_str[:-len(unit)].strip()) * factor)
+    try:
+        return int(size_str)
+    except ValueError:
+        raise ValueError(f"size string is not supported: {size}")
+
+
 def get_default_data_file_name_template(system_name: str) -> Optional[str]:
     """
     Return the default data filename template.
@@ -0,0 +1,289 @@
+"""
+Reduce resolution of fields to resolution of output images before plotting.
+
+Output images of cedar_graph plots have a fixed size (8x8 inches at 400 dpi, main map is 75% of figure width),
+so fields of high resolution models over a large area have more grid points than pixels of the map,
+and contour and filled contour functions still process every point.
+
+``decimate_plot_data`` estimates pixels per grid cell for the plot area,
+and reduces scalar fields by an integer factor so each grid cell covers about ``pixels_per_cell`` pixels:
+
+* mean: block average of ``factor x factor`` grid cells, keeps the mean value of each block.
+* subsample: take one grid point from each block, faster but may miss small features.
+
+Only continuous fields are averaged. Plot modules declare fields which may be averaged in ``MEAN_DECIMATION_FIELDS``,
+other fields are subsampled, such as category masks of ``prep_24h``.
+If a plot module doesn't declare it, floating point fields without NaN values are averaged,
+see ``is_mean_field``.
+
+Wind components (fields named like ``field_u``, ``field_v_850``) are always subsampled and never averaged,
+because barbs are drawn at a few sample points (cartopy regrids vectors to a 20x20 grid),
+so wind keeps only about ``WIND_POINTS_ACROSS`` grid points across the area.
+"""
+from dataclasses import fields, is_dataclass, replace
+from typing import Optional, Collection, TYPE_CHECKING
+import math
+import re
+
+import numpy as np
+import xarray as xr
+
+if TYPE_CHECKING:
+    from cedarkit.maps.util import AreaRange
+
+
+DECIMATION_METHODS = ["mean", "subsample"]
+
+# width in pixels of main map in cedar_graph templates.
+MAP_WIDTH_PIXELS = 8 * 400 * 0.75
+
+# area of EastAsiaMapTemplate used if plot area is not set:
+# (start_longitude, end_longitude, start_latitude, end_latitude)
+DEFAULT_AREA = (70, 140, 15, 55)
+
+# grid points of wind components kept across the plot area, 10 points for each barb of a 20x20 barb grid.
+WIND_POINTS_ACROSS = 200
+
+_WIND_FIELD_PATTERN = re.compile(r"^field_[uv](_|$)")
+
+
+def check_decimation_method(method: Optional[str]):
+    """
+    Raises
+    ------
+    ValueError
+        if method is not None and not in ``DECIMATION_METHODS``.
+    """
+    if method is not None and method not in DECIMATION_METHODS:
+        raise ValueError(f"decimation should be one of {DECIMATION_METHODS}: {method}")
+
+
+def is_wind_field(name: str) -> bool:
+    """
+    Return True if field of plot data is a wind component, such as ``field_u``, ``field_v_10m``.
+    """
+    return _WIND_FIELD_PATTERN.match(name) is not None
+
+
+def is_mean_field(field: xr.DataArray) -> bool:
+    """
+    Return True if a field may be averaged when its plot module doesn't declare ``MEAN_DECIMATION_FIELDS``.
+    Fields of integer types (categories) and fields masked by NaN values are not averaged,
+    because averaged values are not valid categories and blocks at mask edges are blended.
+    """
+    values = field.values
+    return np.issubdtype(values.dtype, np.floating) and not bool(np.isnan(values).any())
+
+
+def get_area_tuple(area: Optional["AreaRange"]) -> tuple[float, float, float, float]:
+    if area is None:
+        return DEFAULT_AREA
+    return area.start_longitude, area.end_longitude, area.start_latitude, area.end_latitude
+
+
+def get_grid_spacing(values: np.ndarray) -> Optional[float]:
+    if len(values) < 2:
+        return None
+    spacing = abs(float(values[1] - values[0]))
+    return spacing if spacing > 0 else None
+
+
+def get_decimation_factors(
+        field: xr.DataArray,
+        area: Optional["AreaRange"] = None,
+        pixels_per_cell: float = 1.0,
+) -> tuple[int, int]:
+    """
+    Return (longitude factor, latitude factor) to reduce a field for the plot area.
+
+    Pixels per degree are estimated from width of the map and longitude span of the area,
+    the same value is used for latitude.
+    Factors are rounded down, so reduced grid cells are never larger than ``pixels_per_cell`` pixels.
+
+    Parameters
+    ----------
+    field
+        field with ``longitude`` and ``latitude`` coordinates.
+    area
+        plot area, default area of EastAsiaMapTemplate if None.
+    pixels_per_cell
+        min pixels for each grid cell after reduction.
+
+    Returns
+    -------
+    tuple[int, int]
+        (1, 1) if the field should not be reduced.
+    """
+    if "longitude" not in field.dims or "latitude" not in field.dims:
+        return 1, 1
+    start_longitude, end_longitude, _, _ = get_area_tuple(area)
+    pixels_per_degree = MAP_WIDTH_PIXELS / abs(end_longitude - start_longitude)
+
+    def get_factor(values: np.ndarray) -> int:
+        spacing = get_grid_spacing(values)
+        if spacing is None:
+            return 1
+        factor = math.floor(pixels_per_cell / (pixels_per_degree * spacing))
+        return max(1, min(factor, len(values)))
+
+    return get_factor(field["longitude"].values), get_factor(field["latitude"].values)
+
+
+def get_wind_decimation_factors(field: xr.DataArray, area: Optional["AreaRange"] = None) -> tuple[int, int]:
+    """
+    Return (longitude factor, latitude factor) to subsample a wind component,
+    keeping about ``WIND_POINTS_ACROSS`` grid points across the plot area in each direction.
+    """
+    if "longitude" not in field.dims or "latitude" not in field.dims:
+        return 1, 1
+    start_longitude, end_longitude, start_latitude, end_latitude = get_area_tuple(area)
+
+    def get_factor(values: np.ndarray, span: float) -> int:
+        spacing = get_grid_spacing(values)
+        if spacing is None:
+            return 1
+        factor = math.floor(abs(span) / spacing / WIND_POINTS_ACROSS)
+        return max(1, min(factor, len(values)))
+
+    return (
+        get_factor(field["longitude"].values, end_longitude - start_longitude),
+        get_factor(field["latitude"].values, end_latitude - start_latitude),
+    )
+
+
+def decimate_field(field: xr.DataArray, factors: tuple[int, int], method: str = "mean") -> xr.DataArray:
+    """
+    Reduce a field by factors of longitude and latitude.
+
+    Parameters
+    ----------
+    field
+        field with ``longitude`` and ``latitude`` coordinates.
+    factors
+        (longitude factor, latitude factor).
+    method
+        ``mean`` or ``subsample``. Coordinates of averaged blocks are the mean of their grid points.
+
+    Returns
+    -------
+    xr.DataArray
+        the same field if both factors are 1.
+    """
+    longitude_factor, latitude_factor = factors
+    if longitude_factor == 1 and latitude_factor == 1:
+        return field
+    if method == "subsample":
+        return field.isel(
+            longitude=slice(None, None, longitude_factor),
+            latitude=slice(None, None, latitude_factor),
+        )
+    return block_mean(field, longitude_factor=longitude_factor, latitude_factor=latitude_factor)
+
+
+def block_mean(field: xr.DataArray, longitude_factor: int, latitude_factor: int) -> xr.DataArray:
+    """
+    Average blocks of ``latitude_factor x longitude_factor`` grid points, ignoring NaN values.
+    Points at the end of each dimension which don't fill a block are dropped.
+
+    Blocks are summed using strided views, which is several times faster than ``xr.DataArray.coarsen``
+    for 2D fields with small factors.
+    """
+    longitude_axis = field.get_axis_num("longitude")
+    latitude_axis = field.get_axis_num("latitude")
+    longitude_size = field.sizes["longitude"] // longitude_factor * longitude_factor
+    latitude_size = field.sizes["latitude"] // latitude_factor * latitude_factor
+
+    values = field.values
+    dtype = np.result_type(values.dtype, np.float32)
+    has_nan = np.issubdtype(values.dtype, np.floating) and bool(np.isnan(values).any())
+
+    total = None
+    count = None
+    for i in range(latitude_factor):
+        for j in range(longitude_factor):
+            index = [slice(None)] * values.ndim
+            index[latitude_axis] = slice(i, latitude_size, latitude_factor)
+            index[longitude_axis] = slice(j, longitude_size, longitude_factor)
+            block = values[tuple(index)]
+            if has_nan:
+                finite = ~np.isnan(block)
+                block = np.where(finite, block, 0)
+                count = finite.astype(dtype) if count is None else count + finite
+            total = block.astype(dtype, copy=True) if total is None else total + block
+
+    if has_nan:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+    else:
+        mean = total / (latitude_factor * longitude_factor)
+
+    def get_block_coordinate(name: str, size: int, factor: int) -> np.ndarray:
+        return field[name].values[:size].reshape(-1, factor).mean(axis=1)
+
+    result = field.isel(
+        longitude=slice(0, longitude_size, longitude_factor),
+        latitude=slice(0, latitude_size, latitude_factor),
+    ).copy(data=mean)
+    return result.assign_coords(
+        longitude=get_block_coordinate("longitude", longitude_size, longitude_factor),
+        latitude=get_block_coordinate("latitude", latitude_size, latitude_factor),
+    )
+
+
+def decimate_plot_data(
+        plot_data,
+        area: Optional["AreaRange"] = None,
+        method: str = "mean",
+        pixels_per_cell: float = 1.0,
+        mean_fields: Optional[Collection[str]] = None,
+):
+    """
+    Reduce fields in plot data to resolution of the map for the plot area.
+
+    Parameters
+    ----------
+    plot_data
+        plot data returned by ``load`` of a plot module, a dataclass with ``xr.DataArray`` fields.
+    area
+        plot area, default area of EastAsiaMapTemplate if None.
+    method
+        method for scalar fields, ``mean`` or ``subsample``. Wind components are always subsampled.
+    pixels_per_cell
+        min pixels for each grid cell of scalar fields after reduction.
+    mean_fields
+        names of fields which may be averaged with ``mean`` method, other fields are subsampled.
+        ``MEAN_DECIMATION_FIELDS`` of plot module. If None, fields are checked by ``is_mean_field``.
+
+    Returns
+    -------
+    PlotData
+        a new plot data object if any field is reduced, otherwise ``plot_data`` itself.
+        ``plot_data`` is not changed, so it can be reduced again for other areas.
+    """
+    if not is_dataclass(plot_data):
+        return plot_data
+
+    changes = dict()
+    for data_field in fields(plot_data):
+        field = getattr(plot_data, data_field.name)
+        if not isinstance(field, xr.DataArray):
+            continue
+        if is_wind_field(data_field.name):
+            factors = get_wind_decimation_factors(field, area=area)
+            field_method = "subsample"
+        else:
+            factors = get_decimation_factors(field, area=area, pixels_per_cell=pixels_per_cell)
+            field_method = method
+            if method == "mean" and factors != (1, 1):
+                if mean_fields is None:
+                    is_mean = is_mean_field(field)
+                else:
+                    is_mean = data_field.name in mean_fields
+                if not is_mean:
+                    field_method = "subsample"
+        if factors != (1, 1):
+            changes[data_field.name] = decimate_field(field, factors=factors, method=field_method)
+
+    if len(changes) == 0:
+        return plot_data
+    return replace(plot_data, **changes)
@@ -5,7 +5,7 @@ import pandas as pd
 
 from cedarkit.maps.util import AreaRange
 from cemc_plots_kit.config import (
-    JobConfig, ExprConfig, RuntimeConfig, TimeConfig, PlotConfig,
+    JobConfig, ExprConfig, RuntimeConfig, TimeConfig, PlotConfig, NamedArea,
     get_default_data_file_name_template, get_default_data_dir
 )
 from cemc_plots_kit.job import run_job
@@ -20,6 +20,7 @@ def draw_plot(
         data_dir: Union[str, Path] = None,
         data_file_name_template: Optional[str] = None,
         area: Optional[AreaRange] = None,
+        areas: Optional[list[NamedArea]] = None,
 ) -> list[Path]:
     """
     Draw a figure and save in working directory
@@ -40,6 +41,9 @@ def draw_plot(
         data file name template
     area
         plot area, default is CN.
+    areas
+        named plot areas. If set, data is loaded once and a figure is plotted for each area,
+        and ``area`` is not used.
 
     Returns
     -------
@@ -65,6 +69,7 @@ def draw_plot(
         expr_config=ExprConfig(
             system_name=system_name,
             area=area,
+            areas=areas,
             data_dir=data_dir,
             data_file_name_template=data_file_name_template,
         ),
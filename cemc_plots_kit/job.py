@@ -1,17 +1,54 @@
 from pathlib import Path
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Optional, TYPE_CHECKING
+import importlib
 import os
 
 import pandas as pd
 import matplotlib.pyplot as plt
 
 from cemc_plots_kit.config import JobConfig
-from cemc_plots_kit.plots import get_plot_module
+from cemc_plots_kit.registry import get_plot_info
 from cemc_plots_kit.logger import get_logger
+from cemc_plots_kit.panel_pool import get_panel_pool, install_panel_pool
+from cemc_plots_kit.timing import timing_stage, get_job_timer
+from cemc_plots_kit.decimation import decimate_plot_data
+from cemc_plots_kit.output import (
+    render_panel, write_image, get_image_writer, get_output_image_dir, get_output_image_file_name,
+)
+
+if TYPE_CHECKING:
+    from cedarkit.maps.util import AreaRange
 
 
 job_logger = get_logger("job")
 
 
+@dataclass
+class JobContext:
+    """
+    Resources of a plot job prepared by ``prepare_job``, used by stages of the job.
+
+    Attributes
+    ----------
+    job_config
+    plot_module
+        plot module for the job's plot type.
+    work_dir
+        working directory of the job.
+    output_image_dir
+        directory for output images.
+    plot_areas
+        (area name, area range) for each figure, area name is None if ``areas`` is not set in experiment config.
+    """
+    job_config: JobConfig
+    plot_module: ModuleType
+    work_dir: Path
+    output_image_dir: Path
+    plot_areas: list[tuple[Optional[str], Optional["AreaRange"]]]
+
+
 def run_job(job_config: JobConfig) -> list[Path]:
     """
     Run a plot job, involves the following steps:
@@ -20,11 +57,20 @@ def run_job(job_config: JobConfig) -> list[Path]:
     * create a directory fore saving output figure
     * load plotting module
     * enter working directory
+    * load data
     * run plot function
     * save the result figure
     * clean memory
     * enter current directory
 
+    If ``areas`` is set in experiment config, data is loaded only once,
+    and a figure is plotted and saved for each area.
+
+    If image writer is enabled (see ``cemc_plots_kit.output.enable_image_writer``),
+    images are written in background and may not exist when this function returns.
+
+    Time of each stage is recorded if a job timer is set, see ``cemc_plots_kit.timing``.
+
     Parameters
     ----------
     job_config
@@ -35,57 +81,236 @@ def run_job(job_config: JobConfig) -> list[Path]:
     List[Path]
         path list for generated figures.
     """
+    context = prepare_job(job_config=job_config)
+
+    previous_dir = os.getcwd()
+
+    job_logger.info(f"entering work dir... {context.work_dir}")
+    os.chdir(context.work_dir)
+
+    try:
+        job_logger.info(f"running plot job...")
+        plot_data = load_job_data(context=context)
+
+        output_image_files = []
+        for area_name, area_range in context.plot_areas:
+            panel, output_image_file_path = render_job_area(
+                context=context,
+                plot_data=plot_data,
+                area_name=area_name,
+                area_range=area_range,
+            )
+            save_panel(
+                panel=panel,
+                output_image_file_path=output_image_file_path,
+                image_format=job_config.runtime_config.image_format,
+                compress_level=job_config.runtime_config.png_compress_level,
+            )
+            output_image_files.append(output_image_file_path)
+
+        del plot_data
+    finally:
+        # a failed job may leave a half-built figure, and following jobs should not run in its work dir.
+        close_figures()
+        del context
+
+        job_logger.info(f"exiting work dir... {previous_dir}")
+        os.chdir(previous_dir)
+
+    return output_image_files
+
+
+def prepare_job(job_config: JobConfig) -> JobContext:
+    """
+    Create working directory and output image directory, and load plot module. Recorded as ``setup`` and ``import`` stages.
+
+    Parameters
+    ----------
+    job_config
+        job configuration which represents a single plot job.
+
+    Returns
+    -------
+    JobContext
+    """
     runtime_config = job_config.runtime_config
     plot_config = job_config.plot_config
 
-    job_logger.info("creating work dir...")
-    work_dir = runtime_config.work_dir
-    if work_dir is None:
-        current_work_dir = create_work_dir(job_config=job_config)
+    with timing_stage("setup"):
+        job_logger.info("creating work dir...")
+        work_dir = runtime_config.work_dir
+        if work_dir is None:
+            current_work_dir = create_work_dir(job_config=job_config)
+        else:
+            current_work_dir = Path(work_dir).absolute()
+            current_work_dir.mkdir(exist_ok=True, parents=True)
+        job_logger.info(f"creating work dir... {current_work_dir}")
+
+        job_logger.info("creating output image dir...")
+        output_image_dir = runtime_config.output_dir
+        if output_image_dir is None:
+            output_image_dir = create_output_image_dir(job_config=job_config)
+        else:
+            output_image_dir = Path(output_image_dir).absolute()
+            output_image_dir.mkdir(exist_ok=True, parents=True)
+        job_logger.info(f"creating output image dir... {output_image_dir}")
+
+    with timing_stage("import"):
+        plot_name = plot_config.plot_name
+        job_logger.info(f"loading plot module...")
+        plot_module = importlib.import_module(get_plot_info(plot_name).module)
+        job_logger.info(f"get plot module: {plot_module.__name__}")
+        panel_pool = get_panel_pool()
+        if panel_pool is not None:
+            install_panel_pool(plot_module.plot)
+
+    expr_config = job_config.expr_config
+    if expr_config.areas is None:
+        plot_areas = [(None, expr_config.area)]
     else:
-        current_work_dir = Path(work_dir)
-        current_work_dir.mkdir(exist_ok=True, parents=True)
-    job_logger.info(f"creating work dir... {current_work_dir}")
-
-    job_logger.info("creating output image dir...")
-    output_image_dir = runtime_config.output_dir
-    if output_image_dir is None:
-        output_image_dir = create_output_image_dir(job_config=job_config)
-    else:
-        output_image_dir = Path(output_image_dir)
-        output_image_dir.mkdir(exist_ok=True, parents=True)
-    job_logger.info(f"creating output image dir... {output_image_dir}")
+        plot_areas = [(named_area.name, named_area.area) for named_area in expr_config.areas]
 
-    output_image_file_name = get_output_image_file_name(job_config=job_config)
-    output_image_file_path = Path(output_image_dir, output_image_file_name)
-    job_logger.info(f"output image file name: {output_image_file_name}")
+    return JobContext(
+        job_config=job_config,
+        plot_module=plot_module,
+        work_dir=current_work_dir,
+        output_image_dir=output_image_dir,
+        plot_areas=plot_areas,
+    )
 
-    plot_name = plot_config.plot_name
-    job_logger.info(f"loading plot module...")
-    plot_module = get_plot_module(plot_name=plot_name)
-    job_logger.info(f"get plot module: {plot_module.__name__}")
 
-    previous_dir = os.getcwd()
+def load_job_data(context: JobContext):
+    """
+    Load data for all figures of the job. Recorded as ``load`` stage.
 
-    job_logger.info(f"entering work dir... {current_work_dir}")
-    os.chdir(current_work_dir)
+    Returns
+    -------
+    PlotData
+        required fields for plotting, defined in cedar_graph package.
+    """
+    job_logger.info(f"loading data...")
+    with timing_stage("load"):
+        plot_data = context.plot_module.load(
+            expr_config=context.job_config.expr_config,
+            time_config=context.job_config.time_config,
+        )
+    job_logger.info(f"loading data...done")
+    return plot_data
+
+
+def render_job_area(
+        context: JobContext,
+        plot_data,
+        area_name: Optional[str] = None,
+        area_range: Optional["AreaRange"] = None,
+) -> tuple:
+    """
+    Plot figure of one area. Recorded as ``plot`` stage.
+
+    If ``decimation`` is set in runtime config, fields are reduced for the area before plotting,
+    recorded as ``decimate`` stage.
 
-    job_logger.info(f"running plot job...")
-    panel = plot_module.run_plot(job_config=job_config)
+    Returns
+    -------
+    tuple[Panel, Path]
+        plot panel and output image file path.
+    """
+    output_image_file_name = get_output_image_file_name(job_config=context.job_config, area_name=area_name)
+    output_image_file_path = Path(context.output_image_dir, output_image_file_name)
+    job_logger.info(f"output image file name: {output_image_file_name}")
 
+    runtime_config = context.job_config.runtime_config
+    if runtime_config.decimation is not None:
+        with timing_stage("decimate"):
+            plot_data = decimate_plot_data(
+                plot_data,
+                area=area_range,
+                method=runtime_config.decimation,
+                pixels_per_cell=runtime_config.decimation_pixels_per_cell,
+                mean_fields=getattr(context.plot_module, "MEAN_DECIMATION_FIELDS", None),
+            )
+
+    with timing_stage("plot"):
+        panel = context.plot_module.render_plot(
+            job_config=context.job_config,
+            plot_data=plot_data,
+            area_range=area_range,
+            area_name=area_name,
+        )
+    return panel, output_image_file_path
+
+
+def save_panel(
+        panel,
+        output_image_file_path: Path,
+        image_format: str = "png",
+        compress_level: Optional[int] = None,
+):
+    """
+    Draw figure of the panel into an image, clean memory used by matplotlib, and write the image to file.
+
+    The image is submitted to the process-wide image writer if it is enabled,
+    otherwise it is written in current thread.
+
+    Parameters
+    ----------
+    panel
+        plot panel object.
+    output_image_file_path
+        output image file path.
+    image_format
+        image format, ``png``, ``png8`` or ``webp``, see ``cemc_plots_kit.output.encode_image``.
+    compress_level
+        zlib compression level of PNG, see ``cemc_plots_kit.output.encode_image``.
+    """
     job_logger.info(f"saving output image... {output_image_file_path}")
-    panel.save(output_image_file_path)
+    with timing_stage("save"):
+        image = render_panel(panel)
+
+    release_panel(panel)
+
+    image_writer = get_image_writer()
+    if image_writer is not None:
+        image_writer.submit(
+            image,
+            output_image_file_path,
+            job_timer=get_job_timer(),
+            image_format=image_format,
+            compress_level=compress_level,
+        )
+    else:
+        with timing_stage("save"):
+            write_image(image, output_image_file_path, image_format=image_format, compress_level=compress_level)
+
+
+def release_panel(panel):
+    """
+    Clean memory used by matplotlib for the panel, unless the panel is kept in panel pool.
+    """
+    panel_pool = get_panel_pool()
+    if panel_pool is not None and panel_pool.contains(panel):
+        # keep figure for following plots
+        return
 
     # clear memory
-    plt.clf()
-    plt.close("all")
-    del panel
-    del plot_module
+    with timing_stage("cleanup"):
+        plt.clf()
+        plt.close("all")
+        del panel
 
-    job_logger.info(f"exiting work dir... {previous_dir}")
-    os.chdir(previous_dir)
 
-    return [output_image_file_path]
+def close_figures():
+    """
+    Close all matplotlib figures of current process, except figures kept in panel pool.
+    """
+    panel_pool = get_panel_pool()
+    if panel_pool is None:
+        plt.close("all")
+        return
+    for number in plt.get_fignums():
+        fig = plt.figure(number)
+        if not panel_pool.contains_figure(fig):
+            plt.close(fig)
 
 
 def create_work_dir(job_config: JobConfig) -> Path:
@@ -112,7 +337,7 @@ def create_work_dir(job_config: JobConfig) -> Path:
 
     plot_name = job_config.plot_config.plot_name
 
-    current_work_dir = Path(base_work_dir, start_time_label, plot_name, forecast_time_label)
+    current_work_dir = Path(base_work_dir, start_time_label, plot_name, forecast_time_label).absolute()
     current_work_dir.mkdir(parents=True, exist_ok=True)
     return current_work_dir
 
@@ -132,35 +357,6 @@ def create_output_image_dir(job_config: JobConfig) -> Path:
     Path
         output image directory.
     """
-    base_work_dir = job_config.runtime_config.base_work_dir
-    output_image_dir = Path(base_work_dir, "output")
+    output_image_dir = get_output_image_dir(job_config).absolute()
     output_image_dir.mkdir(parents=True, exist_ok=True)
-    return  output_image_dir
-
-
-def get_output_image_file_name(job_config: JobConfig) -> str:
-    """
-    Generate output image file name using job configuration.
-
-    Parameters
-    ----------
-    job_config
-        job configuration which represents a single plot job.
-
-    Returns
-    -------
-    str
-        output image file path.
-    """
-    time_config = job_config.time_config
-    plot_config = job_config.plot_config
-
-    plot_name = plot_config.plot_name
-
-    start_time = time_config.start_time
-    start_time_label = start_time.strftime("%Y%m%d%H")
-    forecast_time = time_config.forecast_time
-    forecast_time_label = f"{int(forecast_time / pd.Timedelta(hours=1)):03d}"
-
-    file_name = f"{plot_name}_{start_time_label}_{forecast_time_label}.png"
-    return file_name
+    return output_image_dir
@@ -0,0 +1,251 @@
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from importlib.metadata import version, PackageNotFoundError
+from typing import Optional, Union, Any
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from cemc_plots_kit.config import JobConfig, RuntimeConfig
+from cemc_plots_kit.schedule import get_job_input_files
+from cemc_plots_kit.output import get_output_image_file_paths
+from cemc_plots_kit.logger import get_logger
+
+
+manifest_logger = get_logger(__name__)
+
+MANIFEST_VERSION = 1
+MANIFEST_FILE_NAME = "manifest.jsonl"
+
+# packages whose versions are recorded in fingerprint.
+FINGERPRINT_PACKAGES = ["cemc-plots-kit", "cedar-graph", "cedarkit-maps"]
+
+
+@dataclass
+class ManifestEntry:
+    """
+    Completion record of one plot job.
+
+    Attributes
+    ----------
+    job_key
+        key of the job, see ``get_job_key``.
+    fingerprint
+        hash of all items which determine output images, see ``get_job_fingerprint``.
+    plot_name
+    start_time
+    forecast_time
+    areas
+        names of plot areas, None if ``areas`` is not set in experiment config.
+    input_files
+        path, size and modification time of data files.
+    versions
+        versions of packages.
+    output_files
+        path and sha256 hash of output images.
+    """
+    job_key: str
+    fingerprint: str
+    plot_name: str
+    start_time: str
+    forecast_time: str
+    areas: Optional[list[str]] = None
+    input_files: list[dict[str, Any]] = field(default_factory=list)
+    versions: dict[str, Optional[str]] = field(default_factory=dict)
+    output_files: list[dict[str, str]] = field(default_factory=list)
+
+    def outputs_exist(self) -> bool:
+        return len(self.output_files) > 0 and all(Path(f["path"]).exists() for f in self.output_files)
+
+
+class JobManifest:
+    """
+    Manifest of completed jobs in a task, saved as a JSON lines file.
+
+    Each completed job is appended as one line immediately, so records of finished jobs survive a crash.
+    If a job has several lines, the last one is used.
+
+    Attributes
+    ----------
+    file_path
+        manifest file path.
+    """
+    def __init__(self, file_path: Union[str, Path]):
+        self.file_path = Path(file_path)
+        self.entries: dict[str, ManifestEntry] = dict()
+
+    def load(self):
+        """
+        Load entries from manifest file. Broken lines, such as the last line written when crashed, are ignored.
+        """
+        self.entries = dict()
+        if not self.file_path.exists():
+            return
+        with open(self.file_path) as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                    if data.pop("version", None) != MANIFEST_VERSION:
+                        continue
+                    entry = ManifestEntry(**data)
+                except (ValueError, TypeError):
+                    manifest_logger.warning(f"skip broken line in manifest file: {self.file_path}")
+                    continue
+                self.entries[entry.job_key] = entry
+
+    def is_completed(self, job_config: JobConfig, fingerprint: str) -> bool:
+        """
+        Check whether the job is completed with the same fingerprint and all output images exist.
+        """
+        entry = self.entries.get(get_job_key(job_config), None)
+        return entry is not None and entry.fingerprint == fingerprint and entry.outputs_exist()
+
+    def add(self, job_config: JobConfig, output_image_files: list[Path]) -> ManifestEntry:
+        """
+        Record a completed job and append it to manifest file.
+        """
+        entry = create_manifest_entry(job_config=job_config, output_image_files=output_image_files)
+        self.entries[entry.job_key] = entry
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.file_path, "a") as f:
+            f.write(json.dumps({"version": MANIFEST_VERSION, **asdict(entry)}) + "\n")
+        return entry
+
+    def compact(self):
+        """
+        Rewrite manifest file with one line for each job.
+        """
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_file_path = Path(f"{self.file_path}.{os.getpid()}.tmp")
+        with open(temp_file_path, "w") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps({"version": MANIFEST_VERSION, **asdict(entry)}) + "\n")
+        os.replace(temp_file_path, self.file_path)
+
+
+def get_manifest_file_path(runtime_config: RuntimeConfig) -> Path:
+    """
+    Return manifest file path:
+
+    * ``manifest_file`` in runtime config if set
+    * ``{base_work_dir}/manifest.jsonl`` if ``base_work_dir`` is set
+    * ``{output_dir}/manifest.jsonl``
+    """
+    if runtime_config.manifest_file is not None:
+        return Path(runtime_config.manifest_file)
+    if runtime_config.base_work_dir is not None:
+        return Path(runtime_config.base_work_dir, MANIFEST_FILE_NAME)
+    if runtime_config.output_dir is not None:
+        return Path(runtime_config.output_dir, MANIFEST_FILE_NAME)
+    return Path(runtime_config.work_dir, MANIFEST_FILE_NAME)
+
+
+def get_job_key(job_config: JobConfig) -> str:
+    """
+    Return key of a job: ``{plot_name}/{start_time}/{forecast_hour}``.
+    """
+    time_config = job_config.time_config
+    start_time_label = time_config.start_time.strftime("%Y%m%d%H%M")
+    forecast_time_label = f"{int(time_config.forecast_time / pd.Timedelta(hours=1)):03d}"
+    return f"{job_config.plot_config.plot_name}/{start_time_label}/{forecast_time_label}"
+
+
+def get_input_file_status(job_config: JobConfig) -> list[dict[str, Any]]:
+    """
+    Return path, size and modification time of data files read by the job. Size and time are None if file is missing.
+    """
+    status = []
+    for file_path in get_job_input_files(job_config):
+        try:
+            stat = os.stat(file_path)
+            status.append({"path": str(file_path), "size": stat.st_size, "mtime": stat.st_mtime})
+        except FileNotFoundError:
+            status.append({"path": str(file_path), "size": None, "mtime": None})
+    return status
+
+
+def get_package_versions() -> dict[str, Optional[str]]:
+    versions = dict()
+    for package_name in FINGERPRINT_PACKAGES:
+        try:
+            versions[package_name] = version(package_name)
+        except PackageNotFoundError:
+            versions[package_name] = None
+    return versions
+
+
+def get_job_fingerprint(
+        job_config: JobConfig,
+        input_files: Optional[list[dict[str, Any]]] = None,
+        versions: Optional[dict[str, Optional[str]]] = None,
+) -> str:
+    """
+    Return hash of all items which determine output images of a job:
+    plot name, times, system name, plot areas, status of data files, package versions,
+    options changing fields or images (see ``get_output_options``) and paths of output images.
+    """
+    if input_files is None:
+        input_files = get_input_file_status(job_config)
+    if versions is None:
+        versions = get_package_versions()
+    expr_config = job_config.expr_config
+    items = {
+        "job_key": get_job_key(job_config),
+        "system_name": expr_config.system_name,
+        "area": repr(expr_config.area),
+        "areas": repr(expr_config.areas),
+        "input_files": input_files,
+        "versions": versions,
+        "options": get_output_options(job_config),
+        "output_files": [str(Path(f).absolute()) for f in get_output_image_file_paths(job_config)],
+    }
+    return hashlib.sha256(json.dumps(items, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_output_options(job_config: JobConfig) -> dict[str, Any]:
+    """
+    Return options in experiment config and runtime config which change loaded fields or output images.
+    Options added later which change output images should be added here, so completed jobs are redrawn.
+    """
+    expr_config = job_config.expr_config
+    runtime_config = job_config.runtime_config
+    return {
+        "crop_area": expr_config.crop_area,
+        "crop_margin": expr_config.crop_margin,
+        "image_format": runtime_config.image_format,
+        "png_compress_level": runtime_config.png_compress_level,
+        "decimation": runtime_config.decimation,
+        "decimation_pixels_per_cell": runtime_config.decimation_pixels_per_cell,
+        "transform_cache": runtime_config.transform_cache,
+        "transform_cache_contours": runtime_config.transform_cache_contours,
+    }
+
+
+def create_manifest_entry(job_config: JobConfig, output_image_files: list[Path]) -> ManifestEntry:
+    input_files = get_input_file_status(job_config)
+    versions = get_package_versions()
+    time_config = job_config.time_config
+    areas = job_config.expr_config.areas
+    return ManifestEntry(
+        job_key=get_job_key(job_config),
+        fingerprint=get_job_fingerprint(job_config, input_files=input_files, versions=versions),
+        plot_name=job_config.plot_config.plot_name,
+        start_time=time_config.start_time.isoformat(),
+        forecast_time=str(time_config.forecast_time),
+        areas=None if areas is None else [named_area.name for named_area in areas],
+        input_files=input_files,
+        versions=versions,
+        output_files=[
+            {"path": str(Path(f).absolute()), "sha256": get_file_hash(f)} for f in output_image_files
+        ],
+    )
+
+
+def get_file_hash(file_path: Union[str, Path]) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
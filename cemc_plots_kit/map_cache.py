@@ -0,0 +1,99 @@
+"""
+Map loader package which caches map features in current process.
+
+Map classes in cedarkit.maps read shapefiles and create new cartopy features for every figure.
+``CachedMap`` wraps map class of a base map loader package and returns the same feature objects
+for the same arguments, so shapefiles are read only once, and projected paths cached by cartopy
+for these geometries are reused by all figures with the same projection.
+
+Use ``enable_map_feature_cache`` to set this module as default map loader package.
+"""
+from typing import Optional, Hashable
+import importlib
+import threading
+
+from cedarkit.maps.map import set_default_map_loader_package
+
+from cemc_plots_kit.logger import get_logger
+
+
+map_cache_logger = get_logger(__name__)
+
+DEFAULT_BASE_MAP_PACKAGE = "cedarkit.maps.map.default"
+
+_base_map_package: str = DEFAULT_BASE_MAP_PACKAGE
+_feature_cache: dict[Hashable, list] = dict()
+_feature_cache_lock = threading.Lock()
+
+
+class CachedMap:
+    """
+    Map class which wraps map class of base map loader package and caches returned features.
+
+    Attributes
+    ----------
+    map_type
+        map type passed to base map class.
+    """
+    def __init__(self, map_type=None, **kwargs):
+        base_map_class = get_base_map_package().map_class
+        if map_type is None:
+            self._map = base_map_class(**kwargs)
+        else:
+            self._map = base_map_class(map_type=map_type, **kwargs)
+        self.map_type = getattr(self._map, "map_type", map_type)
+        self._key = (_base_map_package, repr(map_type), repr(sorted(kwargs.items())))
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._map, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def get_features(*args, **kwargs):
+            key = (self._key, name, repr(args), repr(sorted(kwargs.items())))
+            with _feature_cache_lock:
+                features = _feature_cache.get(key, None)
+            if features is None:
+                features = attr(*args, **kwargs)
+                with _feature_cache_lock:
+                    features = _feature_cache.setdefault(key, features)
+            return features
+
+        return get_features
+
+
+map_class = CachedMap
+
+
+def __getattr__(name: str):
+    # other functions of base map loader package, such as ``get_china_map``.
+    return getattr(get_base_map_package(), name)
+
+
+def get_base_map_package():
+    return importlib.import_module(_base_map_package)
+
+
+def enable_map_feature_cache(base_map_package: Optional[str] = None):
+    """
+    Cache map features in current process, by setting this module as default map loader package.
+
+    Parameters
+    ----------
+    base_map_package
+        map loader package to load features, default is ``cedarkit.maps.map.default``.
+    """
+    global _base_map_package
+    if base_map_package is None:
+        base_map_package = DEFAULT_BASE_MAP_PACKAGE
+    _base_map_package = base_map_package
+    map_cache_logger.debug(f"enable map feature cache with base map package: {base_map_package}")
+    set_default_map_loader_package(__name__)
+
+
+def clear_map_feature_cache():
+    """
+    Drop all cached features.
+    """
+    with _feature_cache_lock:
+        _feature_cache.clear()
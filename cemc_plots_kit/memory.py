@@ -0,0 +1,76 @@
+"""
+Memory usage of current process, used to record RSS of each job and to recycle worker processes.
+
+On Linux, values are read from ``/proc/self``, and peak RSS can be reset before each job.
+On other systems, only peak RSS of the whole process is available from ``resource`` module.
+"""
+from pathlib import Path
+from typing import Optional
+import os
+import sys
+
+
+_PROC_SELF = Path("/proc/self")
+
+
+def get_rss() -> Optional[int]:
+    """
+    Return current resident set size of current process in bytes, None if not available.
+    """
+    try:
+        with open(_PROC_SELF / "statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def get_peak_rss() -> Optional[int]:
+    """
+    Return peak resident set size of current process in bytes since last ``reset_peak_rss``, None if not available.
+    """
+    try:
+        with open(_PROC_SELF / "status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on other systems.
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset peak resident set size of current process to current RSS, only supported on Linux.
+
+    Returns
+    -------
+    bool
+        True if peak RSS is reset.
+    """
+    try:
+        with open(_PROC_SELF / "clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def format_size(size: Optional[int]) -> str:
+    """
+    Format bytes count into a short string, such as ``1.2GB``.
+    """
+    if size is None:
+        return "unknown"
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.1f}{unit}" if unit != "B" else f"{size}B"
+        size /= 1024
+    return f"{size:.1f}TB"
@@ -0,0 +1,370 @@
+"""
+Write rendered figures to image files, optionally in background threads.
+
+Drawing a figure uses matplotlib and must stay in the thread which creates the figure,
+but encoding and writing the rendered image don't touch the figure.
+``render_panel`` draws the figure into an RGBA array, and ``ImageWriter`` encodes and writes arrays in worker threads,
+so the next figure can be plotted while previous images are being written.
+
+Images are written to a temporary file in the same directory and renamed to the output file,
+so programs polling the output directory never see half-written images.
+
+Supported image formats:
+
+* png: RGBA PNG, the same as ``savefig`` in matplotlib.
+* png8: indexed-palette PNG with 8-bit pixels.
+  Images with at most 256 colors are kept exactly, other images are quantized to 256 colors.
+* webp: lossless WebP.
+"""
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from pathlib import Path
+from typing import Optional, Union, Iterable
+import io
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cemc_plots_kit.config import JobConfig
+from cemc_plots_kit.logger import get_logger
+from cemc_plots_kit.timing import JobTimer, set_job_timer, timing_stage
+
+
+output_logger = get_logger(__name__)
+
+
+IMAGE_FILE_SUFFIXES = {
+    "png": ".png",
+    "png8": ".png",
+    "webp": ".webp",
+}
+
+
+def get_image_file_suffix(image_format: str) -> str:
+    """
+    Return file suffix of an image format, such as ``.png``.
+
+    Raises
+    ------
+    ValueError
+        if image format is not supported.
+    """
+    if image_format not in IMAGE_FILE_SUFFIXES:
+        raise ValueError(f"image format is not supported: {image_format}")
+    return IMAGE_FILE_SUFFIXES[image_format]
+
+
+def get_output_image_dir(job_config: JobConfig) -> Path:
+    """
+    Return output image directory of a job: ``output_dir`` in runtime config, or ``{base_work_dir}/output``.
+    """
+    runtime_config = job_config.runtime_config
+    if runtime_config.output_dir is not None:
+        return Path(runtime_config.output_dir)
+    return Path(runtime_config.base_work_dir, "output")
+
+
+def get_output_image_file_name(job_config: JobConfig, area_name: Optional[str] = None) -> str:
+    """
+    Generate output image file name using job configuration.
+
+    * ``{plot_name}_{start_time_label}_{forecast_time_label}.png``
+    * ``{plot_name}_{area_name}_{start_time_label}_{forecast_time_label}.png`` if ``area_name`` is set.
+
+    Suffix is ``.webp`` if ``image_format`` in runtime config is ``webp``.
+
+    Parameters
+    ----------
+    job_config
+        job configuration which represents a single plot job.
+    area_name
+        name of plot area.
+
+    Returns
+    -------
+    str
+        output image file path.
+    """
+    time_config = job_config.time_config
+    plot_config = job_config.plot_config
+
+    plot_name = plot_config.plot_name
+
+    start_time = time_config.start_time
+    start_time_label = start_time.strftime("%Y%m%d%H")
+    forecast_time = time_config.forecast_time
+    forecast_time_label = f"{int(forecast_time / pd.Timedelta(hours=1)):03d}"
+
+    suffix = get_image_file_suffix(job_config.runtime_config.image_format)
+
+    if area_name is None:
+        file_name = f"{plot_name}_{start_time_label}_{forecast_time_label}{suffix}"
+    else:
+        file_name = f"{plot_name}_{area_name}_{start_time_label}_{forecast_time_label}{suffix}"
+    return file_name
+
+
+def get_output_image_file_paths(job_config: JobConfig) -> list[Path]:
+    """
+    Return paths of all images generated by a job, one for each plot area.
+    """
+    output_image_dir = get_output_image_dir(job_config)
+    areas = job_config.expr_config.areas
+    area_names = [None] if areas is None else [named_area.name for named_area in areas]
+    return [
+        Path(output_image_dir, get_output_image_file_name(job_config=job_config, area_name=area_name))
+        for area_name in area_names
+    ]
+
+
+def render_panel(panel) -> np.ndarray:
+    """
+    Draw figure of the panel using Agg canvas, and return a copy of the RGBA buffer.
+    The image has the same size as ``panel.save``, i.e. figure size and dpi in panel schema.
+
+    Parameters
+    ----------
+    panel
+        plot panel object.
+
+    Returns
+    -------
+    np.ndarray
+        RGBA array with shape (height, width, 4).
+    """
+    canvas = panel.fig.canvas
+    canvas.draw()
+    return np.array(canvas.buffer_rgba(), copy=True)
+
+
+def encode_image(image: np.ndarray, image_format: str = "png", compress_level: Optional[int] = None) -> bytes:
+    """
+    Encode an RGBA array into bytes of an image file.
+
+    Parameters
+    ----------
+    image
+        RGBA array with shape (height, width, 4).
+    image_format
+        image format, ``png``, ``png8`` or ``webp``.
+    compress_level
+        zlib compression level of PNG, 0-9. Default is 6, the same as ``savefig`` in matplotlib.
+        Lower levels encode faster and make larger files. Not used by ``webp``.
+
+    Returns
+    -------
+    bytes
+    """
+    from PIL import Image
+
+    get_image_file_suffix(image_format)
+    pil_image = Image.fromarray(image, mode="RGBA")
+    buffer = io.BytesIO()
+    if image_format == "webp":
+        # keep RGB values of transparent pixels, so decoded image is the same as input.
+        pil_image.save(buffer, format="WEBP", lossless=True, exact=True)
+        return buffer.getvalue()
+
+    options = dict()
+    if compress_level is not None:
+        options["compress_level"] = compress_level
+    if image_format == "png8":
+        pil_image = to_palette_image(image)
+    pil_image.save(buffer, format="PNG", **options)
+    return buffer.getvalue()
+
+
+def to_palette_image(image: np.ndarray):
+    """
+    Convert an RGBA array to a PIL image in ``P`` mode with an RGBA palette.
+
+    Filled contours produce a small number of colors, so images with at most 256 colors are converted exactly.
+    Otherwise, such as images with anti-aliased lines and text, colors are quantized to 256 colors.
+
+    Parameters
+    ----------
+    image
+        RGBA array with shape (height, width, 4).
+
+    Returns
+    -------
+    PIL.Image.Image
+    """
+    from PIL import Image
+
+    pil_image = Image.fromarray(image, mode="RGBA")
+    colors = pil_image.getcolors(maxcolors=256)
+    if colors is None:
+        return pil_image.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+
+    palette = np.array([color for _, color in colors], dtype=np.uint8)
+    # compare colors as uint32 values of RGBA bytes.
+    packed_palette = palette.view(np.uint32)[:, 0]
+    order = np.argsort(packed_palette)
+    packed_image = np.ascontiguousarray(image).view(np.uint32)[..., 0]
+    indexes = order[np.searchsorted(packed_palette[order], packed_image)].astype(np.uint8)
+    palette_image = Image.fromarray(indexes, mode="P")
+    palette_image.putpalette(palette.tobytes(), rawmode="RGBA")
+    return palette_image
+
+
+def write_image(
+        image: np.ndarray,
+        file_path: Union[str, Path],
+        image_format: str = "png",
+        compress_level: Optional[int] = None,
+):
+    """
+    Encode an RGBA array and write to file atomically.
+
+    Parameters
+    ----------
+    image
+        RGBA array with shape (height, width, 4).
+    file_path
+        output image file path.
+    image_format
+        image format, ``png``, ``png8`` or ``webp``. See ``encode_image``.
+    compress_level
+        zlib compression level of PNG. See ``encode_image``.
+    """
+    content = encode_image(image, image_format=image_format, compress_level=compress_level)
+
+    file_path = Path(file_path)
+    # hidden file in the same directory, so the rename is atomic and patterns such as ``*.png`` don't match it.
+    temp_file_path = Path(file_path.parent, f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        temp_file_path.write_bytes(content)
+        os.replace(temp_file_path, file_path)
+    except BaseException:
+        temp_file_path.unlink(missing_ok=True)
+        raise
+
+
+class ImageWriter:
+    """
+    Write images in a thread pool.
+
+    At most ``max_pending`` images are kept in memory.
+    ``submit`` blocks until a slot is available, so a fast renderer can't fill the memory with images.
+
+    Attributes
+    ----------
+    max_workers
+        number of writer threads.
+    max_pending
+        max number of images submitted but not written.
+    """
+    def __init__(self, max_workers: int = 2, max_pending: int = 4):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures: dict[Path, Future] = dict()
+        self._futures_lock = threading.Lock()
+
+    def submit(
+            self,
+            image: np.ndarray,
+            file_path: Union[str, Path],
+            job_timer: Optional[JobTimer] = None,
+            image_format: str = "png",
+            compress_level: Optional[int] = None,
+    ) -> Future:
+        """
+        Submit an image to write. Time of writing is added to ``save`` stage of ``job_timer`` if set.
+
+        Returns
+        -------
+        Future
+            result is ``file_path`` when the image is written.
+        """
+        file_path = Path(file_path)
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._write, image, file_path, job_timer, image_format, compress_level)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._futures_lock:
+            self._futures[file_path] = future
+        future.add_done_callback(lambda f: self._slots.release())
+        return future
+
+    def wait(self, file_paths: Iterable[Union[str, Path]]) -> Optional[BaseException]:
+        """
+        Wait until images of ``file_paths`` submitted to this writer are written.
+
+        Returns
+        -------
+        Optional[BaseException]
+            the first error raised when writing these images, or None if all are written.
+        """
+        with self._futures_lock:
+            futures = [self._futures.pop(Path(f), None) for f in file_paths]
+        futures = [f for f in futures if f is not None]
+        wait(futures)
+        for future in futures:
+            if future.exception() is not None:
+                return future.exception()
+        return None
+
+    def close(self):
+        """
+        Wait for all submitted images and stop writer threads.
+        """
+        self._executor.shutdown(wait=True)
+        with self._futures_lock:
+            self._futures.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def _write(
+            image: np.ndarray,
+            file_path: Path,
+            job_timer: Optional[JobTimer],
+            image_format: str,
+            compress_level: Optional[int],
+    ) -> Path:
+        set_job_timer(job_timer)
+        try:
+            with timing_stage("save"):
+                write_image(image, file_path, image_format=image_format, compress_level=compress_level)
+        finally:
+            set_job_timer(None)
+        output_logger.info(f"image is written: {file_path}")
+        return file_path
+
+
+_image_writer: Optional[ImageWriter] = None
+
+
+def enable_image_writer(max_workers: int = 1, max_pending: int = 4) -> ImageWriter:
+    """
+    Create a process-wide image writer, so ``run_job`` returns before its images are written.
+    Use ``ImageWriter.wait`` to wait for images of a job.
+    """
+    global _image_writer
+    disable_image_writer()
+    _image_writer = ImageWriter(max_workers=max_workers, max_pending=max_pending)
+    return _image_writer
+
+
+def disable_image_writer():
+    """
+    Wait for all pending images and remove the process-wide image writer.
+    """
+    global _image_writer
+    if _image_writer is not None:
+        _image_writer.close()
+    _image_writer = None
+
+
+def get_image_writer() -> Optional[ImageWriter]:
+    return _image_writer
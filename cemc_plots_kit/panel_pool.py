@@ -0,0 +1,198 @@
+"""
+Reuse plot panels between figures with the same map layout in current process.
+
+Plot functions in cedar_graph create a new ``Panel`` for each figure, which creates figure, axes and map features.
+``PanelPool`` keeps panels alive after saving. When a plot function creates a panel with the same domain and schema,
+data artists (contours, shading, barbs, labels, colorbars, titles) added since the map was rendered are removed,
+and the panel is returned instead of a new one.
+
+Use ``enable_panel_pool`` to enable panel reuse, and ``install_panel_pool`` for each cedar_graph plot function.
+"""
+from collections import OrderedDict
+from dataclasses import is_dataclass
+from typing import Optional, Hashable, Callable
+import sys
+import threading
+
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.axes import Axes
+
+from cedarkit.maps.chart import Panel
+
+from cemc_plots_kit.logger import get_logger
+
+
+panel_pool_logger = get_logger(__name__)
+
+DEFAULT_MAX_PANELS = 4
+
+
+class FigureState:
+    """
+    Artists and view limits of a figure after the map is rendered, used to remove data artists added later.
+    """
+    def __init__(self, fig: Figure):
+        self.fig = fig
+        self.axes = list(fig.axes)
+        self.texts = list(fig.texts)
+        self.artists = list(fig.artists)
+        self.axes_children = {id(ax): set(map(id, ax.get_children())) for ax in self.axes}
+        self.child_axes = {id(ax): list(ax.child_axes) for ax in self.axes}
+        self.limits = {id(ax): (ax.get_xlim(), ax.get_ylim()) for ax in self.axes}
+
+    def restore(self):
+        """
+        Remove artists added after the state is captured, and reset view limits.
+        """
+        fig = self.fig
+        for ax in list(fig.axes):
+            if ax not in self.axes and ax.figure is fig:
+                ax.remove()
+        for artist in fig.texts[:]:
+            if artist not in self.texts:
+                artist.remove()
+        for artist in fig.artists[:]:
+            if artist not in self.artists:
+                artist.remove()
+        for ax in self.axes:
+            self._restore_axes(ax)
+
+    def _restore_axes(self, ax: Axes):
+        for child_ax in ax.child_axes[:]:
+            if child_ax not in self.child_axes[id(ax)]:
+                child_ax.remove()
+        children = self.axes_children[id(ax)]
+        for artist in ax.get_children():
+            if id(artist) not in children:
+                artist.remove()
+        xlim, ylim = self.limits[id(ax)]
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+
+
+class PanelPool:
+    """
+    Keep panels alive by domain and schema, least recently used panels are closed if count exceeds ``max_panels``.
+
+    Attributes
+    ----------
+    max_panels
+        max count of panels, each panel holds a figure and its rendering buffer.
+    """
+    def __init__(self, max_panels: int = DEFAULT_MAX_PANELS):
+        self.max_panels = max_panels
+        self.reuses = 0
+        self.creations = 0
+        self._panels: OrderedDict[Hashable, tuple[Panel, FigureState]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create_panel(self, domain, schema=None) -> Panel:
+        """
+        Return a cleaned panel with the same domain and schema, or create a new panel.
+        Arguments are the same as ``Panel``.
+        """
+        key = get_panel_key(domain, schema)
+        with self._lock:
+            item = self._panels.get(key, None)
+            if item is not None:
+                self._panels.move_to_end(key)
+        if item is not None:
+            panel, state = item
+            try:
+                state.restore()
+                self.reuses += 1
+                return panel
+            except Exception as e:
+                panel_pool_logger.warning(f"can't clean panel, create a new one: {e}")
+                with self._lock:
+                    self._panels.pop(key, None)
+                plt.close(panel.fig)
+
+        panel = Panel(domain=domain, schema=schema)
+        state = FigureState(panel.fig)
+        self.creations += 1
+        with self._lock:
+            self._panels[key] = (panel, state)
+            while len(self._panels) > self.max_panels:
+                _, (old_panel, _) = self._panels.popitem(last=False)
+                plt.close(old_panel.fig)
+        return panel
+
+    def contains(self, panel: Panel) -> bool:
+        with self._lock:
+            return any(panel is p for p, _ in self._panels.values())
+
+    def contains_figure(self, fig) -> bool:
+        with self._lock:
+            return any(fig is p.fig for p, _ in self._panels.values())
+
+    def clear(self):
+        """
+        Close all panels in pool.
+        """
+        with self._lock:
+            for panel, _ in self._panels.values():
+                plt.close(panel.fig)
+            self._panels.clear()
+
+    def __len__(self):
+        return len(self._panels)
+
+
+def get_panel_key(domain, schema=None) -> Hashable:
+    """
+    Return key for panels with the same map layout: domain class, simple attributes of domain, and schema.
+    """
+    if isinstance(domain, str) or isinstance(domain, type):
+        return repr(domain), repr(schema)
+    attributes = {
+        name: value for name, value in sorted(vars(domain).items())
+        if isinstance(value, (str, int, float, bool, tuple, list, type(None))) or is_dataclass(value)
+    }
+    return f"{type(domain).__module__}.{type(domain).__qualname__}", repr(attributes), repr(schema)
+
+
+_panel_pool: Optional[PanelPool] = None
+
+
+def enable_panel_pool(max_panels: int = DEFAULT_MAX_PANELS):
+    """
+    Reuse panels between figures in current process.
+    """
+    global _panel_pool
+    _panel_pool = PanelPool(max_panels=max_panels)
+
+
+def disable_panel_pool():
+    """
+    Stop reusing panels and close all panels in pool.
+    """
+    global _panel_pool
+    if _panel_pool is not None:
+        _panel_pool.clear()
+    _panel_pool = None
+
+
+def get_panel_pool() -> Optional[PanelPool]:
+    return _panel_pool
+
+
+def create_panel(domain, schema=None) -> Panel:
+    """
+    Replacement of ``Panel`` in cedar_graph plot modules.
+    Use panel pool if enabled, or create a new panel.
+    """
+    panel_pool = _panel_pool
+    if panel_pool is None:
+        return Panel(domain=domain, schema=schema)
+    return panel_pool.create_panel(domain=domain, schema=schema)
+
+
+def install_panel_pool(plot_function: Callable):
+    """
+    Let the cedar_graph module of ``plot_function`` create panels using ``create_panel``.
+    """
+    module = sys.modules[plot_function.__module__]
+    if getattr(module, "Panel", None) is Panel:
+        module.Panel = create_panel
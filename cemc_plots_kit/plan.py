@@ -0,0 +1,168 @@
+"""
+Export planned jobs of a task to a plan file, and load jobs from it.
+
+A plan file is a JSON lines file, one self-contained job on each line,
+including configurations, expected input data files and output images,
+so an external workflow system can run any slice of a task with ``run-jobs`` command
+without parsing the task file again. A JSON file with a list of the same items is also supported.
+
+This module doesn't import plotting packages except ``cedarkit.maps`` for plot areas when loading jobs.
+"""
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Optional, Union, Any
+import json
+
+import pandas as pd
+
+from cemc_plots_kit.config import JobConfig, ExprConfig, RuntimeConfig, TimeConfig, PlotConfig, NamedArea
+from cemc_plots_kit.manifest import get_job_key
+from cemc_plots_kit.output import get_output_image_file_paths
+from cemc_plots_kit.schedule import get_job_input_files
+
+
+PLAN_VERSION = 1
+
+_AREA_KEYS = ["start_latitude", "end_latitude", "start_longitude", "end_longitude"]
+
+
+def job_config_to_dict(job_config: JobConfig) -> dict[str, Any]:
+    """
+    Convert a job to a JSON-serializable dict, with expected input data files and output images.
+    """
+    expr_config = job_config.expr_config
+    time_config = job_config.time_config
+    expr_items = {f.name: getattr(expr_config, f.name) for f in fields(expr_config)}
+    expr_items["area"] = _area_to_dict(expr_config.area)
+    if expr_config.areas is not None:
+        expr_items["areas"] = [
+            {"name": named_area.name, **_area_to_dict(named_area.area)} for named_area in expr_config.areas
+        ]
+    return {
+        "version": PLAN_VERSION,
+        "job_key": get_job_key(job_config),
+        "plot_name": job_config.plot_config.plot_name,
+        "start_time": time_config.start_time.isoformat(),
+        "forecast_time": str(time_config.forecast_time),
+        "expr_config": _to_json_values(expr_items),
+        "runtime_config": _to_json_values(asdict(job_config.runtime_config)),
+        "input_files": [str(f) for f in get_job_input_files(job_config)],
+        "output_files": [str(f) for f in get_output_image_file_paths(job_config)],
+    }
+
+
+def job_config_from_dict(item: dict[str, Any]) -> JobConfig:
+    """
+    Create a job from an item of plan file, see ``job_config_to_dict``.
+
+    Raises
+    ------
+    ValueError
+        if version of the item is not supported.
+    """
+    if item.get("version", None) != PLAN_VERSION:
+        raise ValueError(f"plan version is not supported: {item.get('version', None)}")
+    expr_items = dict(item["expr_config"])
+    if expr_items["area"] is not None:
+        expr_items["area"] = _area_from_dict(expr_items["area"])
+    if expr_items["areas"] is not None:
+        expr_items["areas"] = [
+            NamedArea(name=area_item["name"], area=_area_from_dict(area_item)) for area_item in expr_items["areas"]
+        ]
+    return JobConfig(
+        expr_config=ExprConfig(**expr_items),
+        time_config=TimeConfig(
+            start_time=pd.Timestamp(item["start_time"]),
+            forecast_time=pd.to_timedelta(item["forecast_time"]),
+        ),
+        runtime_config=RuntimeConfig(**item["runtime_config"]),
+        plot_config=PlotConfig(plot_name=item["plot_name"]),
+    )
+
+
+def write_plan(file_path: Union[str, Path], job_configs: list[JobConfig]):
+    """
+    Write jobs to a plan file. JSON list is written if suffix is ``.json``, otherwise JSON lines.
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    items = [job_config_to_dict(job_config) for job_config in job_configs]
+    with open(file_path, "w") as f:
+        if file_path.suffix == ".json":
+            json.dump(items, f, indent=2)
+        else:
+            for item in items:
+                f.write(json.dumps(item) + "\n")
+
+
+def load_plan(file_path: Union[str, Path], job_range: Optional[slice] = None) -> list[JobConfig]:
+    """
+    Load jobs from a plan file.
+
+    Parameters
+    ----------
+    file_path
+        plan file path, JSON list if suffix is ``.json``, otherwise JSON lines.
+    job_range
+        load only jobs in this range of job indexes, see ``parse_job_range``.
+
+    Returns
+    -------
+    list[JobConfig]
+    """
+    file_path = Path(file_path)
+    with open(file_path) as f:
+        if file_path.suffix == ".json":
+            items = json.load(f)
+        else:
+            items = [line for line in f if line.strip()]
+    if job_range is not None:
+        items = items[job_range]
+    return [job_config_from_dict(json.loads(item) if isinstance(item, str) else item) for item in items]
+
+
+def parse_job_range(job_range: str) -> slice:
+    """
+    Parse job range string ``a:b``, jobs with index from ``a`` to ``b - 1``. ``a`` or ``b`` can be omitted.
+
+    Raises
+    ------
+    ValueError
+        if job range string is not supported.
+    """
+    tokens = job_range.split(":")
+    try:
+        if len(tokens) != 2:
+            raise ValueError()
+        start, stop = [int(token) if token.strip() != "" else None for token in tokens]
+    except ValueError:
+        raise ValueError(f"job range string is not supported: {job_range}, format is a:b")
+    if (start is not None and start < 0) or (stop is not None and stop < 0):
+        raise ValueError(f"job range should not be negative: {job_range}")
+    return slice(start, stop)
+
+
+def get_range_file_path(file_path: Union[str, Path], job_range: slice) -> Path:
+    """
+    Return file path for a range of jobs, such as ``manifest.jobs-0-100.jsonl`` for ``manifest.jsonl``.
+    """
+    file_path = Path(file_path)
+    start = "" if job_range.start is None else job_range.start
+    stop = "" if job_range.stop is None else job_range.stop
+    return file_path.with_name(f"{file_path.stem}.jobs-{start}-{stop}{file_path.suffix}")
+
+
+def _area_to_dict(area) -> Optional[dict[str, float]]:
+    if area is None:
+        return None
+    return {key: getattr(area, key) for key in _AREA_KEYS}
+
+
+def _area_from_dict(item: dict[str, Any]):
+    from cedarkit.maps.util import AreaRange
+
+    return AreaRange(**{key: item[key] for key in _AREA_KEYS})
+
+
+def _to_json_values(items: dict[str, Any]) -> dict[str, Any]:
+    return {key: str(value) if isinstance(value, Path) else value for key, value in items.items()}
@@ -1,19 +1,28 @@
+from copy import copy
+from typing import Optional
+
 import pandas as pd
 
 from cedarkit.maps.chart import Panel
+from cedarkit.maps.util import AreaRange
 
 from cedar_graph.data import DataLoader
+from cedar_graph.data.field_info import apcp_info
 from cedar_graph.plots.cn.rain_wind_10m.default import PlotData, PlotMetadata, plot, load_data
 
-from cemc_plots_kit.source import ExprLocalDataSource
+from cemc_plots_kit.source import get_accumulated_data_source
 from cemc_plots_kit.config import PlotConfig, TimeConfig, ExprConfig, JobConfig
 from cemc_plots_kit.logger import get_logger
+from cemc_plots_kit.registry import get_plot_info
 
 
 # set_default_map_loader_package("cedarkit.maps.map.cemc")
 
 PLOT_NAME = "rain_12h_wind_10m"
-RAIN_FORECAST_TIME_INTERVAL = pd.Timedelta(hours=12)
+RAIN_FORECAST_TIME_INTERVAL = pd.Timedelta(get_plot_info(PLOT_NAME).accumulation_interval)
+
+# fields which may be averaged by ``mean`` decimation, other fields are subsampled.
+MEAN_DECIMATION_FIELDS = ("field_rain",)
 
 plot_logger = get_logger(PLOT_NAME)
 
@@ -21,7 +30,55 @@ plot_logger = get_logger(PLOT_NAME)
 def run_plot(job_config: JobConfig) -> Panel:
     expr_config = job_config.expr_config
     time_config = job_config.time_config
-    plot_config = job_config.plot_config
+
+    plot_logger.info("loading data...")
+    plot_data = load(
+        expr_config=expr_config,
+        time_config=time_config,
+    )
+    plot_logger.info("loading data...done")
+
+    # field -> plot
+    panel = render_plot(
+        job_config=job_config,
+        plot_data=plot_data,
+        area_range=expr_config.area,
+    )
+
+    del plot_data
+
+    # plot -> output
+    return panel
+
+
+def render_plot(
+        job_config: JobConfig,
+        plot_data: PlotData,
+        area_range: Optional[AreaRange] = None,
+        area_name: Optional[str] = None,
+) -> Panel:
+    """
+    Plot a figure for one area using loaded plot data.
+    ``plot_data`` is not changed, so data loaded once can be plotted for several areas.
+
+    Parameters
+    ----------
+    job_config
+        job configuration
+    plot_data
+        plot data returned by ``load``.
+    area_range
+        plot area, default is CN.
+    area_name
+        name of plot area.
+
+    Returns
+    -------
+    Panel
+        plot panel object
+    """
+    expr_config = job_config.expr_config
+    time_config = job_config.time_config
 
     system_name = expr_config.system_name
     start_time = time_config.start_time
@@ -31,33 +88,23 @@ def run_plot(job_config: JobConfig) -> Panel:
         start_time=start_time,
         forecast_time=forecast_time,
         system_name=system_name,
-        area_range=expr_config.area,
+        area_range=area_range,
+        area_name=area_name,
         interval=RAIN_FORECAST_TIME_INTERVAL,
     )
 
-    plot_logger.info("loading data...")
-    plot_data = load(
-        expr_config=expr_config,
-        time_config=time_config,
-    )
-    plot_logger.info("loading data...done")
-
-    # field -> plot
     plot_logger.info("plotting...")
+    # plot function replaces fields in plot data with extracted fields.
     panel = plot(
-        plot_data=plot_data,
+        plot_data=copy(plot_data),
         plot_metadata=metadata,
     )
     plot_logger.info("plotting...done")
-
-    del plot_data
-
-    # plot -> output
     return panel
 
 
 def check_available(time_config: TimeConfig, plot_config: PlotConfig) -> bool:
-    return time_config.forecast_time >= pd.Timedelta(hours=12)
+    return get_plot_info(PLOT_NAME).is_available(time_config.forecast_time)
 
 
 def load(expr_config: ExprConfig, time_config: TimeConfig) -> PlotData:
@@ -65,7 +112,12 @@ def load(expr_config: ExprConfig, time_config: TimeConfig) -> PlotData:
     start_time = time_config.start_time
     forecast_time = time_config.forecast_time
 
-    data_source = ExprLocalDataSource(expr_config=expr_config)
+    # accumulated precipitation is loaded from stores shared by all rain plots
+    data_source = get_accumulated_data_source(
+        expr_config=expr_config,
+        field_infos=[apcp_info],
+        start_time=start_time,
+    )
     data_loader = DataLoader(data_source=data_source)
 
     plot_data = load_data(
@@ -0,0 +1,121 @@
+"""
+Registry of supported plot types.
+
+Each plot type is described declaratively: module path, availability rule and required fields.
+This module doesn't import plot modules or plotting packages (cedar_graph, cedarkit.maps, cartopy),
+so it is cheap to use in command line and task planning.
+Plot modules are imported only when jobs run.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class PlotInfo:
+    """
+    Description of a plot type.
+
+    Attributes
+    ----------
+    name
+        plot name used in task file and ``draw`` command, such as ``height_500_mslp``.
+    description
+        short description of the plot.
+    module
+        module path of the plot, which has ``run_plot``, ``check_available`` and ``load`` functions.
+    fields
+        labels of required fields, ``{name}_{level_type}_{level}``, such as ``u_heightAboveGround_10``.
+    min_forecast_time
+        minimum forecast time of the plot.
+    accumulation_interval
+        interval of accumulated fields, such as 24h for 24h precipitation.
+        Data at ``forecast_time - accumulation_interval`` is also read by the plot.
+    cost
+        estimated relative time of one figure, ``t_2m`` is 1.0. Used to balance jobs between shards.
+    """
+    name: str
+    description: str
+    module: str
+    fields: tuple[str, ...] = ()
+    min_forecast_time: timedelta = timedelta(0)
+    accumulation_interval: Optional[timedelta] = None
+    cost: float = 1.0
+
+    def is_available(self, forecast_time: timedelta) -> bool:
+        """
+        Check whether the plot can be drawn at a forecast time.
+        """
+        return forecast_time >= self.min_forecast_time
+
+    def get_input_forecast_times(self, forecast_time: timedelta) -> list[timedelta]:
+        """
+        Return forecast times of data read by the plot, the first one is ``forecast_time``.
+        """
+        forecast_times = [forecast_time]
+        if self.accumulation_interval is not None:
+            forecast_times.append(forecast_time - self.accumulation_interval)
+        return forecast_times
+
+
+def _plot_info(
+        name: str,
+        description: str,
+        fields: tuple[str, ...],
+        cost: float,
+        accumulation_hours: Optional[int] = None,
+) -> PlotInfo:
+    if accumulation_hours is None:
+        return PlotInfo(
+            name=name, description=description, module=f"cemc_plots_kit.plots.{name}", fields=fields, cost=cost,
+        )
+    return PlotInfo(
+        name=name,
+        description=description,
+        module=f"cemc_plots_kit.plots.{name}",
+        fields=fields,
+        min_forecast_time=timedelta(hours=accumulation_hours),
+        accumulation_interval=timedelta(hours=accumulation_hours),
+        cost=cost,
+    )
+
+
+_WIND_10M_FIELDS = ("u_heightAboveGround_10", "v_heightAboveGround_10")
+
+
+# costs are rough estimates: filled contours plus line contours or wind barbs cost more than a single filled field,
+# and accumulated plots read fields of two forecast times.
+PLOT_REGISTRY: dict[str, PlotInfo] = {
+    info.name: info for info in [
+        _plot_info("height_500_mslp", "500hPa geopotential height and mean sea level pressure", ("h_pl_500", "mslp"), 1.2),
+        _plot_info("height_500_wind_850", "500hPa geopotential height and 850hPa wind", ("h_pl_500", "u_pl_850", "v_pl_850"), 1.5),
+        _plot_info("t_2m", "2m temperature", ("t2m",), 1.0),
+        _plot_info("wind_10m", "10m wind", _WIND_10M_FIELDS, 1.4),
+        _plot_info("radar_reflectivity", "composite radar reflectivity", ("cr",), 1.0),
+        _plot_info("rain_1h_wind_10m", "1h precipitation and 10m wind", ("apcp", *_WIND_10M_FIELDS), 1.8, 1),
+        _plot_info("rain_3h_wind_10m", "3h precipitation and 10m wind", ("apcp", *_WIND_10M_FIELDS), 1.8, 3),
+        _plot_info("rain_6h_wind_10m", "6h precipitation and 10m wind", ("apcp", *_WIND_10M_FIELDS), 1.8, 6),
+        _plot_info("rain_12h_wind_10m", "12h precipitation and 10m wind", ("apcp", *_WIND_10M_FIELDS), 1.8, 12),
+        _plot_info("rain_24h_wind_10m", "24h precipitation and 10m wind", ("apcp", *_WIND_10M_FIELDS), 1.8, 24),
+        _plot_info("rain_24h", "24h precipitation", ("apcp",), 1.3, 24),
+        _plot_info("prep_24h", "24h precipitation with rain and snow", ("apcp", "asnow"), 1.6, 24),
+    ]
+}
+
+
+def get_plot_names() -> list[str]:
+    return list(PLOT_REGISTRY.keys())
+
+
+def get_plot_info(plot_name: str) -> PlotInfo:
+    """
+    Return registered information of a plot type.
+
+    Raises
+    ------
+    ValueError
+        if plot type is not registered.
+    """
+    if plot_name not in PLOT_REGISTRY:
+        raise ValueError(f"plot type is not supported: {plot_name}")
+    return PLOT_REGISTRY[plot_name]
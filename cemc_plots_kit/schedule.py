@@ -0,0 +1,280 @@
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Optional, Union
+
+import pandas as pd
+
+from cemc_plots_kit.config import JobConfig
+from cemc_plots_kit.registry import get_plot_info
+from cemc_plots_kit.source import get_local_file_path
+
+
+@dataclass
+class JobGroup:
+    """
+    A group of jobs which read the same primary input file, i.e. data file of the job's forecast time.
+
+    Attributes
+    ----------
+    input_file
+        primary input file for all jobs in the group.
+    job_indexes
+        indexes of jobs in the job list.
+    input_files
+        all input files read by jobs in the group, including files of previous forecast times
+        used by accumulated precipitation plots.
+    """
+    input_file: Path
+    job_indexes: list[int] = field(default_factory=list)
+    input_files: set[Path] = field(default_factory=set)
+
+
+def get_job_input_forecast_times(job_config: JobConfig) -> list[pd.Timedelta]:
+    """
+    Return forecast times of data files read by a job.
+
+    Accumulated precipitation plots set ``accumulation_interval`` in plot registry,
+    and also read data at ``forecast_time - accumulation_interval``.
+
+    Parameters
+    ----------
+    job_config
+        job configuration which represents a single plot job.
+
+    Returns
+    -------
+    list[pd.Timedelta]
+        forecast times, the first one is the job's forecast time.
+    """
+    plot_info = get_plot_info(job_config.plot_config.plot_name)
+    return plot_info.get_input_forecast_times(job_config.time_config.forecast_time)
+
+
+def get_job_input_files(job_config: JobConfig) -> list[Path]:
+    """
+    Return data files read by a job.
+
+    Parameters
+    ----------
+    job_config
+        job configuration which represents a single plot job.
+
+    Returns
+    -------
+    list[Path]
+        data file paths, the first one is the primary input file for the job's forecast time.
+    """
+    expr_config = job_config.expr_config
+    start_time = job_config.time_config.start_time
+    return [
+        get_local_file_path(
+            data_dir=expr_config.data_dir,
+            data_file_name_template=expr_config.data_file_name_template,
+            start_time=start_time,
+            forecast_time=forecast_time,
+        )
+        for forecast_time in get_job_input_forecast_times(job_config)
+    ]
+
+
+def group_jobs_by_input_file(job_configs: list[JobConfig]) -> list[JobGroup]:
+    """
+    Group jobs by primary input file, so jobs plotting one forecast time can run in the same worker
+    while fields of its data file are hot in field cache and page cache.
+    Jobs reading the file only as a previous file, such as accumulated precipitation plots
+    of the next forecast times, belong to other groups.
+
+    Groups are ordered by first appearance in job list.
+    Jobs in one group are ordered by their other input files, so jobs reading the same previous file are adjacent.
+
+    Parameters
+    ----------
+    job_configs
+        job list
+
+    Returns
+    -------
+    list[JobGroup]
+    """
+    groups: dict[Path, JobGroup] = dict()
+    job_input_files = dict()
+    for i, job_config in enumerate(job_configs):
+        input_files = get_job_input_files(job_config)
+        job_input_files[i] = input_files
+        primary_file = input_files[0]
+        if primary_file not in groups:
+            groups[primary_file] = JobGroup(input_file=primary_file)
+        group = groups[primary_file]
+        group.job_indexes.append(i)
+        group.input_files.update(input_files)
+
+    for group in groups.values():
+        group.job_indexes.sort(key=lambda i: [str(f) for f in job_input_files[i][1:]])
+
+    return list(groups.values())
+
+
+def split_job_groups(
+        job_groups: list[JobGroup],
+        job_configs: list[JobConfig],
+        min_count: int,
+) -> list[JobGroup]:
+    """
+    Split the largest groups in halves until there are at least ``min_count`` groups or each group has one job,
+    so a task with a few forecast times still uses all workers or shards.
+
+    Halves of a group keep the job order, so jobs reading the same previous file mostly stay together.
+
+    Parameters
+    ----------
+    job_groups
+        groups returned by ``group_jobs_by_input_file``.
+    job_configs
+        job list used to create ``job_groups``.
+    min_count
+        min number of groups, such as number of worker processes.
+
+    Returns
+    -------
+    list[JobGroup]
+        ``job_groups`` itself if no group is split. Parts of a group stay at the position of the group.
+    """
+    if len(job_groups) == 0 or len(job_groups) >= min_count:
+        return job_groups
+
+    parts = [[group.job_indexes] for group in job_groups]
+    count = len(job_groups)
+    while count < min_count:
+        group_index, part_index = max(
+            ((g, p) for g in range(len(parts)) for p in range(len(parts[g]))),
+            key=lambda item: (len(parts[item[0]][item[1]]), -item[0], -item[1]),
+        )
+        job_indexes = parts[group_index][part_index]
+        if len(job_indexes) < 2:
+            break
+        middle = len(job_indexes) // 2
+        parts[group_index][part_index:part_index + 1] = [job_indexes[:middle], job_indexes[middle:]]
+        count += 1
+
+    if count == len(job_groups):
+        return job_groups
+    result = []
+    for group, group_parts in zip(job_groups, parts):
+        for job_indexes in group_parts:
+            result.append(JobGroup(
+                input_file=group.input_file,
+                job_indexes=job_indexes,
+                input_files={f for i in job_indexes for f in get_job_input_files(job_configs[i])},
+            ))
+    return result
+
+
+def count_file_opens(job_groups: list[JobGroup]) -> int:
+    """
+    Estimate count of file opens when each group runs in one worker and reads each file once.
+    """
+    return sum(len(group.input_files) for group in job_groups)
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    One of ``count`` shards of a task, used to split jobs of a task between nodes or processes.
+
+    Attributes
+    ----------
+    index
+        shard index, from 0 to ``count - 1``.
+    count
+        number of shards.
+    """
+    index: int
+    count: int
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+
+def parse_shard(shard: str) -> Shard:
+    """
+    Parse shard string ``i/N``, such as ``0/4`` for the first of four shards.
+
+    Raises
+    ------
+    ValueError
+        if shard string is not supported.
+    """
+    tokens = shard.split("/")
+    try:
+        index, count = [int(token) for token in tokens]
+    except ValueError:
+        raise ValueError(f"shard string is not supported: {shard}, format is i/N")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"shard index should be in [0, {count}): {shard}")
+    return Shard(index=index, count=count)
+
+
+def get_job_cost(job_config: JobConfig) -> float:
+    """
+    Estimate relative cost of a job: ``cost`` of the plot type in plot registry times number of figures.
+    """
+    plot_info = get_plot_info(job_config.plot_config.plot_name)
+    areas = job_config.expr_config.areas
+    figure_count = 1 if areas is None else len(areas)
+    return plot_info.cost * figure_count
+
+
+def shard_jobs(
+        job_configs: list[JobConfig],
+        shard: Shard,
+        job_groups: Optional[list[JobGroup]] = None,
+) -> list[int]:
+    """
+    Return indexes of jobs belonging to a shard.
+
+    Jobs are split by estimated cost (see ``get_job_cost``) instead of job count:
+    units are assigned from the most expensive to the least expensive one,
+    each to the shard with the least total cost.
+    The result only depends on the job list, so all shards of a task can be run independently.
+
+    Parameters
+    ----------
+    job_configs
+        job list of the whole task.
+    shard
+        shard to select.
+    job_groups
+        if set, each group is assigned to one shard as a whole, so a data file is read by as few shards as possible.
+        Groups are split if there are fewer groups than shards, see ``split_job_groups``.
+        Otherwise, each job is assigned separately.
+
+    Returns
+    -------
+    list[int]
+        job indexes in ascending order.
+    """
+    if job_groups is None:
+        units = [[i] for i in range(len(job_configs))]
+    else:
+        job_groups = split_job_groups(job_groups, job_configs=job_configs, min_count=shard.count)
+        units = [group.job_indexes for group in job_groups]
+    job_costs = [get_job_cost(job_config) for job_config in job_configs]
+    unit_costs = [sum(job_costs[i] for i in unit) for unit in units]
+
+    shard_costs = [0.0] * shard.count
+    indexes = []
+    # stable order for units with the same cost.
+    for unit_index in sorted(range(len(units)), key=lambda u: (-unit_costs[u], u)):
+        target = min(range(shard.count), key=lambda s: (shard_costs[s], s))
+        shard_costs[target] += unit_costs[unit_index]
+        if target == shard.index:
+            indexes.extend(units[unit_index])
+    return sorted(indexes)
+
+
+def get_shard_file_path(file_path: Union[str, Path], shard: Shard) -> Path:
+    """
+    Return file path for one shard, such as ``manifest.0-of-4.jsonl`` for ``manifest.jsonl``.
+    """
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.stem}.{shard.index}-of-{shard.count}{file_path.suffix}")
@@ -1,5 +1,6 @@
 from pathlib import Path
 from typing import Union
+import time
 
 import pandas as pd
 import xarray as xr
@@ -8,6 +9,23 @@ from cedar_graph.data import DataSource, FieldInfo
 from cedar_graph.data.source import get_field_from_file
 
 from cemc_plots_kit.config import ExprConfig
+from cemc_plots_kit.timing import record_field_time
+
+from .index import get_field_from_file_with_index
+from .crop import get_crop_bounds, crop_field
+from .mapped import get_field_from_file_with_mmap, close_mapped_files
+from .accumulation import (
+    AccumulatedFieldStore, AccumulatedDataSource, get_accumulated_field_store,
+    enable_accumulated_field_stores, disable_accumulated_field_stores,
+)
+from .cache import (
+    FieldCache, FieldCacheStats, CachedDataSource,
+    set_field_cache, get_field_cache, enable_field_cache,
+)
+from .shared import (
+    SharedFieldStore, SharedFieldStoreServer, SharedFieldStoreHandle, SharedDataSource,
+    enable_shared_field_store, disable_shared_field_store, get_shared_field_store, release_shared_fields,
+)
 
 
 class ExprLocalDataSource(DataSource):
@@ -25,10 +43,15 @@ class ExprLocalDataSource(DataSource):
 
         * `grib2_dir`: GRIB2 数据目录
         * `grib2_file_name_template`: GRIB2 数据文件名模板
+        * `grib_index`: 是否使用 GRIB2 消息索引直接定位要素场
+        * `grib_index_dir`: GRIB2 消息索引文件目录
+        * `grib_mmap`: 是否使用内存映射读取 GRIB2 文件，总是使用消息索引
+        * `crop_area`: 是否在加载后将要素场裁剪到绘图区域
     """
     def __init__(self, expr_config: ExprConfig):
         super().__init__()
         self.expr_config = expr_config
+        self.crop_bounds = get_crop_bounds(expr_config)
 
     def retrieve(
             self, field_info: FieldInfo, start_time: pd.Timestamp, forecast_time: pd.Timedelta
@@ -62,10 +85,150 @@ class ExprLocalDataSource(DataSource):
         )
 
         # data file -> data field
-        field = get_field_from_file(field_info=field_info, file_path=file_path)
+        load_start_time = time.perf_counter()
+        single_level = not isinstance(field_info.level, (list, str))
+        if self.expr_config.grib_mmap and single_level:
+            field = get_field_from_file_with_mmap(
+                field_info=field_info,
+                file_path=file_path,
+                index_dir=self.expr_config.grib_index_dir,
+            )
+        elif self.expr_config.grib_index and single_level:
+            field = get_field_from_file_with_index(
+                field_info=field_info,
+                file_path=file_path,
+                index_dir=self.expr_config.grib_index_dir,
+            )
+        else:
+            field = get_field_from_file(field_info=field_info, file_path=file_path)
+        if field is not None and self.crop_bounds is not None:
+            field = crop_field(field, self.crop_bounds)
+        record_field_time(get_field_label(field_info, forecast_time), time.perf_counter() - load_start_time)
         return field
 
 
+def get_data_source(expr_config: ExprConfig) -> DataSource:
+    """
+    Return data source for plot modules.
+
+    If process-wide field cache is enabled, ``ExprLocalDataSource`` is wrapped by ``CachedDataSource``
+    so that fields are shared between jobs in one task.
+    If shared field store is enabled, ``ExprLocalDataSource`` is wrapped by ``SharedDataSource`` instead,
+    so that fields are shared between all worker processes.
+    Fields cropped to different areas are cached separately.
+
+    Parameters
+    ----------
+    expr_config
+        experiment configuration
+
+    Returns
+    -------
+    DataSource
+    """
+    data_source = ExprLocalDataSource(expr_config=expr_config)
+    shared_field_store = get_shared_field_store()
+    if shared_field_store is not None:
+        return SharedDataSource(
+            data_source=data_source,
+            store=shared_field_store,
+            source_key=get_source_key(expr_config),
+        )
+    field_cache = get_field_cache()
+    if field_cache is not None:
+        data_source = CachedDataSource(
+            data_source=data_source,
+            field_cache=field_cache,
+            source_key=get_source_key(expr_config),
+        )
+    return data_source
+
+
+def get_accumulation_store(
+        expr_config: ExprConfig, field_info: FieldInfo, start_time: pd.Timestamp
+) -> AccumulatedFieldStore:
+    """
+    Return store of an accumulated field for plot modules.
+    The store is shared by all jobs in one process if ``enable_accumulated_field_stores`` is called.
+    Fields are loaded from shared field store if it is enabled.
+
+    Parameters
+    ----------
+    expr_config
+        experiment configuration
+    field_info
+        accumulated field, such as APCP.
+    start_time
+        start time
+
+    Returns
+    -------
+    AccumulatedFieldStore
+    """
+    data_source = ExprLocalDataSource(expr_config=expr_config)
+    shared_field_store = get_shared_field_store()
+    if shared_field_store is not None:
+        data_source = SharedDataSource(
+            data_source=data_source,
+            store=shared_field_store,
+            source_key=get_source_key(expr_config),
+        )
+    return get_accumulated_field_store(
+        data_source=data_source,
+        field_info=field_info,
+        start_time=start_time,
+        source_key=get_source_key(expr_config),
+    )
+
+
+def get_accumulated_data_source(
+        expr_config: ExprConfig, field_infos: list[FieldInfo], start_time: pd.Timestamp
+) -> DataSource:
+    """
+    Return data source for plot modules using accumulated fields, such as rain plots.
+    Accumulated fields in ``field_infos`` are loaded from stores returned by ``get_accumulation_store``,
+    and other fields are loaded from data source returned by ``get_data_source``.
+
+    Parameters
+    ----------
+    expr_config
+        experiment configuration
+    field_infos
+        accumulated fields, such as APCP and ASNOW.
+    start_time
+        start time
+
+    Returns
+    -------
+    DataSource
+    """
+    return AccumulatedDataSource(
+        data_source=get_data_source(expr_config=expr_config),
+        stores=[
+            get_accumulation_store(expr_config=expr_config, field_info=field_info, start_time=start_time)
+            for field_info in field_infos
+        ],
+    )
+
+
+def get_source_key(expr_config: ExprConfig) -> tuple:
+    """
+    Return key of data loaded by ``ExprLocalDataSource``, used by field cache and accumulated field stores.
+    """
+    return str(expr_config.data_dir), expr_config.data_file_name_template, get_crop_bounds(expr_config)
+
+
+def get_field_label(field_info: FieldInfo, forecast_time: pd.Timedelta) -> str:
+    """
+    Return a short label of field used in timing records, such as ``u_heightAboveGround_10_024h``.
+    """
+    label = field_info.name
+    if isinstance(field_info.level_type, str):
+        label = f"{label}_{field_info.level_type}"
+    if field_info.level is not None:
+        label = f"{label}_{field_info.level}"
+    return f"{label}_{int(forecast_time / pd.Timedelta(hours=1)):03d}h"
+
 
 def get_local_file_path(
         data_dir: Union[str, Path],
@@ -0,0 +1,329 @@
+from collections import OrderedDict
+from typing import Optional, Iterable, Hashable
+import threading
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from cedar_graph.data import DataSource, FieldInfo
+
+from .cache import get_field_info_key
+
+
+class AccumulatedFieldStore:
+    """
+    Stacked (time, latitude, longitude) array of an accumulated field, such as APCP and ASNOW,
+    for one start time. Each forecast time is loaded only once while it is kept in the store,
+    and accumulations for any interval are calculated by differencing the stacked array.
+
+    If ``max_bytes`` is set, least recently used forecast times are dropped when the stacked array reaches the budget,
+    and are loaded again if they are used later. Forecast times used by one call are always kept,
+    so at least two forecast times are kept. Jobs usually run in forecast time order,
+    so forecast times within the longest accumulation interval are kept.
+
+    Attributes
+    ----------
+    data_source
+        data source to load fields.
+    field_info
+        accumulated field.
+    start_time
+        start time of all fields.
+    max_bytes
+        memory budget in bytes of the stacked array, not limited if None.
+    """
+    def __init__(
+            self,
+            data_source: DataSource,
+            field_info: FieldInfo,
+            start_time: pd.Timestamp,
+            max_bytes: Optional[int] = None,
+    ):
+        self.data_source = data_source
+        self.field_info = field_info
+        self.start_time = start_time
+        self.max_bytes = max_bytes
+
+        self._values: Optional[np.ndarray] = None
+        # forecast time -> index in stacked array, in least recently used order.
+        self._time_index: OrderedDict[pd.Timedelta, int] = OrderedDict()
+        # forecast time -> attributes and non-dimension coordinates of loaded field.
+        self._metadata: dict[pd.Timedelta, tuple[dict, dict]] = dict()
+        # dimensions, dimension coordinates and name of fields, data of loaded fields are not kept.
+        self._dims: tuple[str, ...] = tuple()
+        self._dim_coords: dict[str, xr.DataArray] = dict()
+        self._name: Optional[str] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def forecast_times(self) -> list[pd.Timedelta]:
+        """
+        loaded forecast times, sorted.
+        """
+        with self._lock:
+            return sorted(self._time_index.keys())
+
+    @property
+    def nbytes(self) -> int:
+        """
+        memory used by the stacked array.
+        """
+        return 0 if self._values is None else self._values.nbytes
+
+    def load(self, forecast_times: Iterable[pd.Timedelta]):
+        """
+        Load fields for forecast times which are not loaded.
+
+        Parameters
+        ----------
+        forecast_times
+        """
+        with self._lock:
+            self._load(forecast_times)
+
+    def get_field(self, forecast_time: pd.Timedelta) -> xr.DataArray:
+        """
+        Return accumulated field from start time to ``forecast_time``,
+        with the same coordinates and attributes as the loaded field.
+        """
+        with self._lock:
+            self._load([forecast_time])
+            return self._create_field(forecast_time).copy()
+
+    def get_accumulation(self, forecast_time: pd.Timedelta, interval: pd.Timedelta) -> xr.DataArray:
+        """
+        Return accumulation from ``forecast_time - interval`` to ``forecast_time``,
+        the same as difference of the two loaded fields.
+        """
+        previous_forecast_time = forecast_time - interval
+        with self._lock:
+            self._load([forecast_time, previous_forecast_time])
+            return self._create_field(forecast_time) - self._create_field(previous_forecast_time)
+
+    def get_accumulations(self, forecast_times: Iterable[pd.Timedelta], interval: pd.Timedelta) -> xr.DataArray:
+        """
+        Return accumulations over ``interval`` ending at each of ``forecast_times``,
+        calculated by one vectorized difference of the stacked array.
+
+        Parameters
+        ----------
+        forecast_times
+            end of accumulation periods.
+        interval
+            length of accumulation periods, such as 1h, 3h, 24h.
+
+        Returns
+        -------
+        xr.DataArray
+            accumulations with dims (forecast_time, latitude, longitude), only dimension coordinates are kept.
+        """
+        forecast_times = list(forecast_times)
+        previous_forecast_times = [t - interval for t in forecast_times]
+        with self._lock:
+            self._load(forecast_times + previous_forecast_times)
+            current_indexes = [self._time_index[t] for t in forecast_times]
+            previous_indexes = [self._time_index[t] for t in previous_forecast_times]
+            values = self._values[current_indexes] - self._values[previous_indexes]
+
+        return xr.DataArray(
+            values,
+            dims=("forecast_time", *self._dims),
+            coords={
+                "forecast_time": forecast_times,
+                **self._dim_coords,
+            },
+            name=self._name,
+        )
+
+    def _load(self, forecast_times: Iterable[pd.Timedelta]):
+        forecast_times = list(forecast_times)
+        for forecast_time in forecast_times:
+            if forecast_time in self._time_index:
+                self._time_index.move_to_end(forecast_time)
+                continue
+            field = self.data_source.retrieve(
+                field_info=self.field_info,
+                start_time=self.start_time,
+                forecast_time=forecast_time,
+            )
+            if field is None:
+                raise ValueError(f"field is not found: {self.field_info.name} "
+                                 f"[{self.start_time}] [{forecast_time}]")
+            self.loads += 1
+            self._append(forecast_time, field, keep_forecast_times=forecast_times)
+
+    def _append(self, forecast_time: pd.Timedelta, field: xr.DataArray, keep_forecast_times: list[pd.Timedelta]):
+        count = len(self._time_index)
+        if self._values is None:
+            self._dims = field.dims
+            self._dim_coords = {name: field.coords[name].copy() for name in field.dims if name in field.coords}
+            self._name = field.name
+            max_count = self._get_max_count(field.nbytes)
+            initial_count = 4 if max_count is None else min(4, max_count)
+            self._values = np.empty((initial_count, *field.shape), dtype=field.dtype)
+        if field.shape != self._values.shape[1:]:
+            raise ValueError(f"field shape {field.shape} is not consistent with {self._values.shape[1:]}")
+
+        if count < self._values.shape[0]:
+            index = count
+        else:
+            index = self._evict(keep_forecast_times)
+            if index is None:
+                self._grow()
+                index = count
+
+        self._values[index] = field.values
+        self._time_index[forecast_time] = index
+        self._metadata[forecast_time] = (
+            dict(field.attrs),
+            {name: coord for name, coord in field.coords.items() if name not in field.dims},
+        )
+
+    def _get_max_count(self, field_bytes: int) -> Optional[int]:
+        if self.max_bytes is None:
+            return None
+        return max(2, self.max_bytes // max(field_bytes, 1))
+
+    def _evict(self, keep_forecast_times: list[pd.Timedelta]) -> Optional[int]:
+        """
+        Drop least recently used forecast time if the stacked array can't grow, and return its index.
+        """
+        max_count = self._get_max_count(self._values[0].nbytes)
+        if max_count is None or self._values.shape[0] < max_count:
+            return None
+        for forecast_time in self._time_index:
+            if forecast_time in keep_forecast_times:
+                continue
+            index = self._time_index.pop(forecast_time)
+            del self._metadata[forecast_time]
+            self.evictions += 1
+            return index
+        return None
+
+    def _grow(self):
+        count = self._values.shape[0]
+        new_count = count * 2
+        max_count = self._get_max_count(self._values[0].nbytes)
+        if max_count is not None:
+            new_count = max(min(new_count, max_count), count + 1)
+        values = np.empty((new_count, *self._values.shape[1:]), dtype=self._values.dtype)
+        values[:count] = self._values
+        self._values = values
+
+    def _create_field(self, forecast_time: pd.Timedelta) -> xr.DataArray:
+        """
+        Return field of a forecast time using a view of the stacked array, only used with lock held.
+        """
+        attrs, coords = self._metadata[forecast_time]
+        return xr.DataArray(
+            self._values[self._time_index[forecast_time]],
+            dims=self._dims,
+            coords={
+                **self._dim_coords,
+                **coords,
+            },
+            attrs=attrs,
+            name=self._name,
+        )
+
+
+class AccumulatedDataSource(DataSource):
+    """
+    Data source wrapper which returns accumulated fields from ``AccumulatedFieldStore`` objects,
+    and loads other fields from ``data_source``.
+
+    Plot modules pass it to ``load_data`` functions of cedar_graph,
+    so each forecast time of accumulated fields is loaded once, and accumulations are calculated by cedar_graph.
+
+    Attributes
+    ----------
+    data_source
+        data source to load other fields.
+    stores
+        stores of accumulated fields.
+    """
+    def __init__(self, data_source: DataSource, stores: list[AccumulatedFieldStore]):
+        super().__init__()
+        self.data_source = data_source
+        self.stores = stores
+
+    def retrieve(
+            self, field_info: FieldInfo, start_time: pd.Timestamp, forecast_time: pd.Timedelta
+    ) -> xr.DataArray or None:
+        field_info_key = get_field_info_key(field_info)
+        for store in self.stores:
+            if store.start_time == start_time and get_field_info_key(store.field_info) == field_info_key:
+                return store.get_field(forecast_time)
+        return self.data_source.retrieve(
+            field_info=field_info,
+            start_time=start_time,
+            forecast_time=forecast_time,
+        )
+
+
+_shared_stores: Optional[dict[Hashable, AccumulatedFieldStore]] = None
+_shared_stores_max_bytes: Optional[int] = None
+_shared_stores_lock = threading.Lock()
+
+
+def enable_accumulated_field_stores(max_bytes: Optional[int] = None):
+    """
+    Share ``AccumulatedFieldStore`` objects between all jobs in current process.
+
+    Parameters
+    ----------
+    max_bytes
+        memory budget in bytes of each shared store, not limited if None.
+    """
+    global _shared_stores, _shared_stores_max_bytes
+    _shared_stores = dict()
+    _shared_stores_max_bytes = max_bytes
+
+
+def disable_accumulated_field_stores():
+    """
+    Stop sharing ``AccumulatedFieldStore`` objects and release all shared stores.
+    """
+    global _shared_stores
+    _shared_stores = None
+
+
+def get_accumulated_field_store(
+        data_source: DataSource,
+        field_info: FieldInfo,
+        start_time: pd.Timestamp,
+        source_key: Hashable = None,
+) -> AccumulatedFieldStore:
+    """
+    Return shared store for the accumulated field if sharing is enabled, or a new store for a single job.
+
+    Parameters
+    ----------
+    data_source
+        data source to load fields when creating a new store.
+    field_info
+    start_time
+    source_key
+        key to distinguish stores from different data sources.
+
+    Returns
+    -------
+    AccumulatedFieldStore
+    """
+    with _shared_stores_lock:
+        if _shared_stores is None:
+            return AccumulatedFieldStore(data_source=data_source, field_info=field_info, start_time=start_time)
+        key = (source_key, get_field_info_key(field_info), start_time)
+        store = _shared_stores.get(key, None)
+        if store is None:
+            store = AccumulatedFieldStore(
+                data_source=data_source,
+                field_info=field_info,
+                start_time=start_time,
+                max_bytes=_shared_stores_max_bytes,
+            )
+            _shared_stores[key] = store
+        return store
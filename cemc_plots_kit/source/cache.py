@@ -0,0 +1,167 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Hashable
+import threading
+
+import pandas as pd
+import xarray as xr
+
+from cedar_graph.data import DataSource, FieldInfo
+
+
+@dataclass
+class FieldCacheStats:
+    """
+    Statistics of a ``FieldCache``.
+
+    Attributes
+    ----------
+    hits
+        count of fields returned from cache.
+    misses
+        count of fields not found in cache.
+    evictions
+        count of fields removed from cache because of memory budget.
+    current_bytes
+        memory used by cached fields.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    current_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+
+class FieldCache:
+    """
+    LRU cache for decoded fields with a memory budget.
+
+    Least recently used fields are evicted when total size of cached fields exceeds ``max_bytes``.
+    A field larger than ``max_bytes`` is never cached.
+
+    Attributes
+    ----------
+    max_bytes
+        memory budget in bytes.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._fields: OrderedDict[Hashable, xr.DataArray] = OrderedDict()
+        self._stats = FieldCacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[xr.DataArray]:
+        with self._lock:
+            field = self._fields.get(key, None)
+            if field is None:
+                self._stats.misses += 1
+                return None
+            self._fields.move_to_end(key)
+            self._stats.hits += 1
+            return field
+
+    def put(self, key: Hashable, field: xr.DataArray):
+        field_bytes = field.nbytes
+        if field_bytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._fields:
+                self._stats.current_bytes -= self._fields.pop(key).nbytes
+            while self._fields and self._stats.current_bytes + field_bytes > self.max_bytes:
+                _, evicted_field = self._fields.popitem(last=False)
+                self._stats.current_bytes -= evicted_field.nbytes
+                self._stats.evictions += 1
+            self._fields[key] = field
+            self._stats.current_bytes += field_bytes
+
+    def clear(self):
+        with self._lock:
+            self._fields.clear()
+            self._stats.current_bytes = 0
+
+    @property
+    def stats(self) -> FieldCacheStats:
+        with self._lock:
+            return FieldCacheStats(**vars(self._stats))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._fields)
+
+
+class CachedDataSource(DataSource):
+    """
+    Data source wrapper which returns fields from a ``FieldCache`` if possible.
+
+    Cache key is (``source_key``, ``field_info``, ``start_time``, ``forecast_time``).
+    Returned fields are copies of cached ones, so plot modules can modify them freely.
+
+    Attributes
+    ----------
+    data_source
+        data source which is used to load fields not in cache.
+    field_cache
+        shared field cache.
+    source_key
+        key to distinguish fields from different data sources sharing one cache.
+    """
+    def __init__(self, data_source: DataSource, field_cache: FieldCache, source_key: Hashable = None):
+        super().__init__()
+        self.data_source = data_source
+        self.field_cache = field_cache
+        self.source_key = source_key
+
+    def retrieve(
+            self, field_info: FieldInfo, start_time: pd.Timestamp, forecast_time: pd.Timedelta
+    ) -> xr.DataArray or None:
+        key = (self.source_key, get_field_info_key(field_info), start_time, forecast_time)
+        field = self.field_cache.get(key)
+        if field is None:
+            field = self.data_source.retrieve(
+                field_info=field_info,
+                start_time=start_time,
+                forecast_time=forecast_time,
+            )
+            if field is None:
+                return None
+            self.field_cache.put(key, field)
+        return field.copy()
+
+
+def get_field_info_key(field_info: FieldInfo) -> str:
+    """
+    Return a hashable key for ``FieldInfo``, which contains unhashable dict attributes.
+    """
+    return repr(field_info)
+
+
+_field_cache: Optional[FieldCache] = None
+
+
+def set_field_cache(field_cache: Optional[FieldCache]):
+    """
+    Set process-wide field cache shared by all jobs. Use ``None`` to disable field cache.
+    """
+    global _field_cache
+    _field_cache = field_cache
+
+
+def get_field_cache() -> Optional[FieldCache]:
+    """
+    Return process-wide field cache, or None if it is disabled.
+    """
+    return _field_cache
+
+
+def enable_field_cache(max_bytes: int):
+    """
+    Create a process-wide field cache with memory budget ``max_bytes``.
+    Used as initializer of worker processes.
+    """
+    set_field_cache(FieldCache(max_bytes=max_bytes))
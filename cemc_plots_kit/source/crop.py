@@ -0,0 +1,118 @@
+"""
+Crop decoded fields to plot areas right after loading.
+
+Plot functions in cedar_graph extract the plot area from full fields when plotting,
+so fields of the whole model grid are kept in memory and field cache until then.
+If ``crop_area`` is set in experiment config, fields are cropped to the plot areas plus a margin when loaded.
+
+Index ranges are computed once for each pair of grid and crop bounds, and reused by all fields in the process.
+"""
+from typing import Optional
+import threading
+
+import numpy as np
+import xarray as xr
+
+from cemc_plots_kit.config import ExprConfig
+
+
+# (start_longitude, end_longitude, start_latitude, end_latitude)
+CropBounds = tuple[float, float, float, float]
+
+# grid is described by first value, last value and size of longitude and latitude coordinates.
+GridKey = tuple[float, float, int, float, float, int]
+
+_crop_slices: dict[tuple[GridKey, CropBounds], Optional[tuple[slice, slice]]] = dict()
+_crop_slices_lock = threading.Lock()
+
+
+def get_crop_bounds(expr_config: ExprConfig) -> Optional[CropBounds]:
+    """
+    Return bounds to crop fields for an experiment: bounding box of ``area`` or all ``areas``, plus ``crop_margin``.
+
+    Returns None if ``crop_area`` is not set, or no plot area is set so the default domain is used.
+    """
+    if not expr_config.crop_area:
+        return None
+    if expr_config.areas is not None:
+        areas = [named_area.area for named_area in expr_config.areas]
+    elif expr_config.area is not None:
+        areas = [expr_config.area]
+    else:
+        return None
+    margin = expr_config.crop_margin
+    return (
+        min(area.start_longitude for area in areas) - margin,
+        max(area.end_longitude for area in areas) + margin,
+        min(area.start_latitude for area in areas) - margin,
+        max(area.end_latitude for area in areas) + margin,
+    )
+
+
+def crop_field(field: xr.DataArray, bounds: CropBounds) -> xr.DataArray:
+    """
+    Crop field with ``latitude`` and ``longitude`` coordinates to bounds.
+
+    The field is returned unchanged if it has no such coordinates,
+    or bounds are not inside longitude range of the grid, such as an area across the grid's start meridian.
+    Cropped data is copied, so the full field can be released.
+
+    Parameters
+    ----------
+    field
+        field loaded from data file.
+    bounds
+        crop bounds, see ``get_crop_bounds``.
+
+    Returns
+    -------
+    xr.DataArray
+    """
+    if "latitude" not in field.dims or "longitude" not in field.dims:
+        return field
+    longitudes = field["longitude"].values
+    latitudes = field["latitude"].values
+    grid_key = (
+        float(longitudes[0]), float(longitudes[-1]), len(longitudes),
+        float(latitudes[0]), float(latitudes[-1]), len(latitudes),
+    )
+    key = (grid_key, bounds)
+    with _crop_slices_lock:
+        found = key in _crop_slices
+        slices = _crop_slices.get(key, None)
+    if not found:
+        slices = get_crop_slices(longitudes, latitudes, bounds)
+        with _crop_slices_lock:
+            _crop_slices[key] = slices
+    if slices is None:
+        return field
+    longitude_slice, latitude_slice = slices
+    return field.isel(longitude=longitude_slice, latitude=latitude_slice).copy()
+
+
+def get_crop_slices(
+        longitudes: np.ndarray,
+        latitudes: np.ndarray,
+        bounds: CropBounds,
+) -> Optional[tuple[slice, slice]]:
+    """
+    Return index slices of longitude and latitude covering bounds. Coordinates may be ascending or descending.
+
+    Returns None if the field should not be cropped.
+    """
+    start_longitude, end_longitude, start_latitude, end_latitude = bounds
+    if start_longitude < longitudes.min() or end_longitude > longitudes.max():
+        return None
+
+    def get_slice(values: np.ndarray, start: float, end: float) -> Optional[slice]:
+        indexes = np.nonzero((values >= start) & (values <= end))[0]
+        if len(indexes) == 0:
+            return None
+        # keep one more point on each side, so the area is fully covered by grid cells.
+        return slice(max(indexes[0] - 1, 0), min(indexes[-1] + 2, len(values)))
+
+    longitude_slice = get_slice(longitudes, start_longitude, end_longitude)
+    latitude_slice = get_slice(latitudes, start_latitude, end_latitude)
+    if longitude_slice is None or latitude_slice is None:
+        return None
+    return longitude_slice, latitude_slice
@@ -0,0 +1,382 @@
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from typing import Optional, Union, Any
+import hashlib
+import json
+import math
+import os
+import threading
+import typing
+
+import eccodes
+import xarray as xr
+
+from reki.format.grib.common._parameter import convert_parameter
+from reki.format.grib.eccodes._level import _fix_level
+from reki.format.grib.eccodes._util import _check_message
+from reki.format.grib.eccodes import create_data_array_from_message
+
+from cedar_graph.data import FieldInfo
+
+from cemc_plots_kit.logger import get_logger
+
+
+index_logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+INDEX_FILE_SUFFIX = ".index.json"
+
+# GRIB keys stored in index entry, with value type.
+INDEX_KEYS = {
+    "shortName": str,
+    "discipline": int,
+    "parameterCategory": int,
+    "parameterNumber": int,
+    "typeOfLevel": str,
+    "typeOfFirstFixedSurface": int,
+    "level": float,
+    "stepRange": str,
+}
+
+
+@dataclass
+class GribMessageEntry:
+    """
+    Index entry for one GRIB2 message.
+
+    Attributes
+    ----------
+    offset
+        byte offset of the message in file.
+    length
+        byte length of the message.
+    keys
+        GRIB keys defined in ``INDEX_KEYS``, value is None if key is not available.
+    first_level
+        value of first fixed surface, used to check level for ``pl`` level type.
+    """
+    offset: int
+    length: int
+    keys: dict[str, Any] = field(default_factory=dict)
+    first_level: Optional[float] = None
+
+
+@dataclass
+class GribIndex:
+    """
+    Message index for one GRIB2 file.
+
+    Attributes
+    ----------
+    file_size
+        size of GRIB2 file when index is built.
+    file_mtime
+        modification time of GRIB2 file when index is built.
+    entries
+        message entries by order in file.
+    """
+    file_size: int
+    file_mtime: float
+    entries: list[GribMessageEntry] = field(default_factory=list)
+
+    def is_valid_for(self, file_path: Union[str, Path]) -> bool:
+        """
+        Check whether the index matches current status of the GRIB2 file.
+        """
+        stat = os.stat(file_path)
+        return stat.st_size == self.file_size and stat.st_mtime == self.file_mtime
+
+    def find_candidates(
+            self,
+            parameter: Optional[Union[str, dict]],
+            level_type: Optional[Union[str, dict, list]],
+            level: Optional[Union[int, float, dict]],
+    ) -> list[GribMessageEntry]:
+        """
+        Return entries which may fit the conditions.
+        Parameters should be converted by ``convert_parameter`` and ``_fix_level`` in reki.
+
+        Candidates should be checked again after decoding, because not all conditions are recorded in index.
+        """
+        return [
+            entry for entry in self.entries
+            if _match_parameter(entry, parameter)
+            and _match_level_type(entry, level_type)
+            and _match_level(entry, level, level_type)
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "version": INDEX_VERSION,
+            "file_size": self.file_size,
+            "file_mtime": self.file_mtime,
+            "entries": [asdict(entry) for entry in self.entries],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GribIndex":
+        return cls(
+            file_size=data["file_size"],
+            file_mtime=data["file_mtime"],
+            entries=[GribMessageEntry(**entry) for entry in data["entries"]],
+        )
+
+
+def build_grib_index(file_path: Union[str, Path]) -> GribIndex:
+    """
+    Scan a GRIB2 file and build message index. Only headers are decoded.
+
+    Parameters
+    ----------
+    file_path
+        GRIB2 file path
+
+    Returns
+    -------
+    GribIndex
+    """
+    stat = os.stat(file_path)
+    entries = []
+    with open(file_path, "rb") as f:
+        while True:
+            message_id = eccodes.codes_grib_new_from_file(f)
+            if message_id is None:
+                break
+            try:
+                entries.append(create_message_entry(message_id))
+            finally:
+                eccodes.codes_release(message_id)
+    return GribIndex(file_size=stat.st_size, file_mtime=stat.st_mtime, entries=entries)
+
+
+def create_message_entry(message_id) -> GribMessageEntry:
+    """
+    Create index entry from a GRIB message handle.
+    """
+    keys = dict()
+    for key, key_type in INDEX_KEYS.items():
+        try:
+            keys[key] = eccodes.codes_get(message_id, key, ktype=key_type)
+        except eccodes.CodesInternalError:
+            keys[key] = None
+
+    try:
+        scale_factor = eccodes.codes_get(message_id, "scaleFactorOfFirstFixedSurface")
+        scaled_value = eccodes.codes_get(message_id, "scaledValueOfFirstFixedSurface")
+        first_level = math.pow(10, -1 * scale_factor) * scaled_value
+    except eccodes.CodesInternalError:
+        first_level = None
+
+    return GribMessageEntry(
+        offset=int(eccodes.codes_get(message_id, "offset")),
+        length=eccodes.codes_get(message_id, "totalLength"),
+        keys=keys,
+        first_level=first_level,
+    )
+
+
+def get_index_file_path(file_path: Union[str, Path], index_dir: Optional[Union[str, Path]] = None) -> Path:
+    """
+    Return index file path for a GRIB2 file.
+
+    * If ``index_dir`` is None, index file is saved next to the GRIB2 file: ``{file_path}.index.json``
+    * Or index file is saved in ``index_dir``, using hash of absolute file path to avoid name conflicts:
+      ``{index_dir}/{file_name}.{hash}.index.json``
+    """
+    file_path = Path(file_path)
+    if index_dir is None:
+        return Path(f"{file_path}{INDEX_FILE_SUFFIX}")
+    path_hash = hashlib.md5(str(file_path.absolute()).encode("utf-8")).hexdigest()[:12]
+    return Path(index_dir, f"{file_path.name}.{path_hash}{INDEX_FILE_SUFFIX}")
+
+
+def load_grib_index_file(index_file_path: Union[str, Path]) -> Optional[GribIndex]:
+    """
+    Load index from file. Return None if index file doesn't exist or is broken.
+    """
+    try:
+        with open(index_file_path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version", None) != INDEX_VERSION:
+        return None
+    try:
+        return GribIndex.from_dict(data)
+    except (KeyError, TypeError):
+        return None
+
+
+def save_grib_index_file(grib_index: GribIndex, index_file_path: Union[str, Path]):
+    """
+    Save index to file. Use temporary file and rename, so other processes never read a half-written index.
+    """
+    index_file_path = Path(index_file_path)
+    index_file_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file_path = Path(f"{index_file_path}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temp_file_path, "w") as f:
+        json.dump(grib_index.to_dict(), f)
+    os.replace(temp_file_path, index_file_path)
+
+
+_index_cache: dict[str, GribIndex] = dict()
+_index_cache_lock = threading.Lock()
+
+
+def get_grib_index(file_path: Union[str, Path], index_dir: Optional[Union[str, Path]] = None) -> GribIndex:
+    """
+    Return a valid index for GRIB2 file, following steps:
+
+    * return index in process cache if valid
+    * load index file if valid
+    * build index and save to index file. If index file can't be written, index is only cached in process.
+
+    Parameters
+    ----------
+    file_path
+        GRIB2 file path
+    index_dir
+        directory to save index files, default is the same directory of the GRIB2 file.
+
+    Returns
+    -------
+    GribIndex
+    """
+    cache_key = str(Path(file_path).absolute())
+    with _index_cache_lock:
+        grib_index = _index_cache.get(cache_key, None)
+    if grib_index is not None and grib_index.is_valid_for(file_path):
+        return grib_index
+
+    index_file_path = get_index_file_path(file_path=file_path, index_dir=index_dir)
+    grib_index = load_grib_index_file(index_file_path)
+    if grib_index is None or not grib_index.is_valid_for(file_path):
+        index_logger.debug(f"building grib index... {file_path}")
+        grib_index = build_grib_index(file_path)
+        try:
+            save_grib_index_file(grib_index, index_file_path)
+        except OSError as e:
+            index_logger.warning(f"can't save grib index file {index_file_path}: {e}")
+
+    with _index_cache_lock:
+        _index_cache[cache_key] = grib_index
+    return grib_index
+
+
+def get_field_from_file_with_index(
+        field_info: FieldInfo,
+        file_path: Union[str, Path],
+        index_dir: Optional[Union[str, Path]] = None,
+) -> Optional[xr.DataArray]:
+    """
+    Load field from local GRIB2 file according to field info, using message index to seek the message directly.
+    Same as ``get_field_from_file`` in cedar_graph, which scans the file from beginning.
+
+    Only one message is loaded, so ``level`` should not be a list or ``all``.
+
+    Parameters
+    ----------
+    field_info
+        Field info.
+    file_path
+        local file path.
+    index_dir
+        directory of index files.
+
+    Returns
+    -------
+    Optional[xr.DataArray]
+    """
+    grib_index = get_grib_index(file_path=file_path, index_dir=index_dir)
+    with open(file_path, "rb") as f:
+        def read_message(entry: GribMessageEntry) -> bytes:
+            f.seek(entry.offset)
+            return f.read(entry.length)
+
+        return _load_field_from_entries(
+            field_info=field_info,
+            grib_index=grib_index,
+            read_message=read_message,
+        )
+
+
+def _load_field_from_entries(
+        field_info: FieldInfo,
+        grib_index: GribIndex,
+        read_message: typing.Callable[[GribMessageEntry], bytes],
+) -> Optional[xr.DataArray]:
+    raw_parameter = field_info.parameter.get_parameter()
+    field_name = raw_parameter if isinstance(raw_parameter, str) else None
+    parameter = convert_parameter(raw_parameter)
+    level = field_info.level
+    fixed_level_type, fixed_level_dim = _fix_level(field_info.level_type, None)
+    additional_keys = field_info.additional_keys
+    if additional_keys is None:
+        additional_keys = dict()
+
+    for entry in grib_index.find_candidates(parameter, fixed_level_type, level):
+        message_id = eccodes.codes_new_from_message(read_message(entry))
+        try:
+            if not _check_message(message_id, parameter, fixed_level_type, level, **additional_keys):
+                continue
+            field = create_data_array_from_message(
+                message_id,
+                level_dim_name=fixed_level_dim,
+                field_name=field_name,
+            )
+            if "GRIB_count" in field.attrs:
+                # a message decoded from bytes is always the first one, use its number in file as a full scan does.
+                field.attrs["GRIB_count"] = next(i for i, e in enumerate(grib_index.entries) if e is entry) + 1
+            return field
+        finally:
+            eccodes.codes_release(message_id)
+    return None
+
+
+def _match_parameter(entry: GribMessageEntry, parameter: Optional[Union[str, dict]]) -> bool:
+    if parameter is None:
+        return True
+    if isinstance(parameter, str):
+        return entry.keys.get("shortName", None) == parameter
+    return _match_keys(entry, parameter)
+
+
+def _match_level_type(entry: GribMessageEntry, level_type: Optional[Union[str, dict, list]]) -> bool:
+    if level_type is None:
+        return True
+    if isinstance(level_type, str):
+        return entry.keys.get("typeOfLevel", None) == level_type
+    if isinstance(level_type, dict):
+        return _match_keys(entry, level_type)
+    if isinstance(level_type, list):
+        return any(_match_level_type(entry, t) for t in level_type)
+    return True
+
+
+def _match_level(
+        entry: GribMessageEntry,
+        level: Optional[Union[int, float, dict]],
+        level_type: Optional[Union[str, dict, list]]
+) -> bool:
+    if not isinstance(level, (int, float)):
+        return True
+    if isinstance(level_type, dict) and level_type.get("typeOfFirstFixedSurface", None) == 100:
+        if entry.first_level is None:
+            return True
+        return entry.first_level / 100.0 == level
+    message_level = entry.keys.get("level", None)
+    if message_level is None:
+        return True
+    return message_level == level
+
+
+def _match_keys(entry: GribMessageEntry, keys: dict) -> bool:
+    """
+    Compare keys recorded in index. Keys not in index are checked after decoding.
+    """
+    for key, value in keys.items():
+        if key not in entry.keys or entry.keys[key] is None:
+            continue
+        if entry.keys[key] != value:
+            return False
+    return True
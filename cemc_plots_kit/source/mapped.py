@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+import mmap
+import os
+import threading
+
+import xarray as xr
+
+from cedar_graph.data import FieldInfo
+
+from cemc_plots_kit.logger import get_logger
+from .index import GribMessageEntry, get_grib_index, _load_field_from_entries
+
+
+mapped_logger = get_logger(__name__)
+
+# max count of mapped files kept in one process. Each mapped file holds a file descriptor,
+# and its pages read by decoder are counted in RSS of the process.
+MAX_MAPPED_FILES = 8
+
+
+class MappedGribFile:
+    """
+    A GRIB2 file mapped into memory. Message bytes are passed to decoder as ``memoryview`` slices
+    without copying into Python buffers, and file pages are shared in page cache by all jobs in the process.
+
+    Attributes
+    ----------
+    file_path
+        GRIB2 file path
+    file_size
+        size of file when mapped.
+    file_mtime
+        modification time of file when mapped.
+    """
+    def __init__(self, file_path: Union[str, Path]):
+        self.file_path = Path(file_path)
+        with open(self.file_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.file_size = stat.st_size
+            self.file_mtime = stat.st_mtime
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+    def is_valid(self) -> bool:
+        """
+        Check whether the mapped file matches current status of the file.
+        """
+        stat = os.stat(self.file_path)
+        return stat.st_size == self.file_size and stat.st_mtime == self.file_mtime
+
+    def read_message(self, entry: GribMessageEntry) -> memoryview:
+        return self._view[entry.offset:entry.offset + entry.length]
+
+    def close(self):
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            # some message slices are still in use, leave it to garbage collector.
+            mapped_logger.warning(f"mapped file is still in use: {self.file_path}")
+
+
+_mapped_files: OrderedDict[str, MappedGribFile] = OrderedDict()
+_mapped_files_lock = threading.Lock()
+
+
+def get_mapped_file(file_path: Union[str, Path]) -> MappedGribFile:
+    """
+    Return a mapped file from process cache, or map the file if not mapped or changed.
+    Least recently used files are closed if more than ``MAX_MAPPED_FILES`` files are mapped.
+    """
+    key = str(Path(file_path).absolute())
+    with _mapped_files_lock:
+        mapped_file = _mapped_files.get(key, None)
+        if mapped_file is not None and mapped_file.is_valid():
+            _mapped_files.move_to_end(key)
+            return mapped_file
+        if mapped_file is not None:
+            del _mapped_files[key]
+            mapped_file.close()
+        mapped_file = MappedGribFile(file_path)
+        _mapped_files[key] = mapped_file
+        while len(_mapped_files) > MAX_MAPPED_FILES:
+            _, old_mapped_file = _mapped_files.popitem(last=False)
+            old_mapped_file.close()
+        return mapped_file
+
+
+def close_mapped_files():
+    """
+    Close all mapped files in current process, called after a job group or at the end of a task,
+    so file descriptors and mapped pages are not kept by long-running processes.
+    """
+    with _mapped_files_lock:
+        for mapped_file in _mapped_files.values():
+            mapped_file.close()
+        _mapped_files.clear()
+
+
+def get_field_from_file_with_mmap(
+        field_info: FieldInfo,
+        file_path: Union[str, Path],
+        index_dir: Optional[Union[str, Path]] = None,
+) -> Optional[xr.DataArray]:
+    """
+    Load field from a memory-mapped GRIB2 file according to field info, using message index to locate the message.
+
+    Only one message is loaded, so ``level`` should not be a list or ``all``.
+
+    Parameters
+    ----------
+    field_info
+        Field info.
+    file_path
+        local file path.
+    index_dir
+        directory of index files.
+
+    Returns
+    -------
+    Optional[xr.DataArray]
+    """
+    grib_index = get_grib_index(file_path=file_path, index_dir=index_dir)
+    mapped_file = get_mapped_file(file_path)
+    return _load_field_from_entries(
+        field_info=field_info,
+        grib_index=grib_index,
+        read_message=mapped_file.read_message,
+    )
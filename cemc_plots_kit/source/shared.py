@@ -0,0 +1,476 @@
+"""
+Share decoded fields between worker processes on one node using shared memory.
+
+With ``parallel`` executor, workers plotting different plot types of the same forecast time
+decode the same GRIB2 messages, and each worker keeps its own copy of the fields.
+``SharedFieldStore`` puts each decoded field, with its coordinates, into a ``multiprocessing.shared_memory`` block:
+
+* The first worker requesting a field decodes it and writes it into a new block.
+  Other workers requesting the field at the same time wait for it, so each message is decoded once per node.
+* Workers get fields as read-only numpy views of the block, without copying data.
+* Each field has a reference count of jobs using it. Blocks of fields not used by any job
+  are removed, least recently used first, when total size of blocks exceeds the memory budget.
+  All blocks are removed when the task ends.
+
+Metadata of blocks (state, shape, coordinates, reference count) is kept in a ``multiprocessing.Manager`` dict,
+which is created by the task process using ``SharedFieldStoreServer`` and passed to workers.
+Workers waiting for a field are woken by a ``Condition`` of the manager when the field is ready.
+If the process decoding the field exits, such as a crashed worker, a waiting worker decodes it instead.
+"""
+from dataclasses import dataclass
+from multiprocessing import shared_memory, resource_tracker
+from typing import Optional, Hashable, Any
+import hashlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from cedar_graph.data import DataSource, FieldInfo
+
+from cemc_plots_kit.logger import get_logger
+from .cache import get_field_info_key
+
+
+shared_logger = get_logger(__name__)
+
+# offsets of arrays in a block are aligned to this number of bytes.
+_ALIGNMENT = 64
+
+# states of a field in store.
+_LOADING = "loading"
+_READY = "ready"
+_MISSING = "missing"
+
+# seconds between checks of the process decoding a field, while waiting for the field.
+_LOADER_CHECK_INTERVAL = 1.0
+
+
+@dataclass
+class SharedFieldStoreHandle:
+    """
+    Objects to connect to a shared field store from worker processes, passed to ``enable_shared_field_store``.
+
+    Attributes
+    ----------
+    entries
+        proxy of dict in manager process, block name -> metadata dict.
+    condition
+        proxy of condition in manager process, protecting ``entries``.
+        Notified when a field being decoded is ready, missing or failed.
+    prefix
+        prefix of block names, unique for each task.
+    max_bytes
+        memory budget of all blocks.
+    """
+    entries: Any
+    condition: Any
+    prefix: str
+    max_bytes: int
+
+
+class SharedFieldStoreServer:
+    """
+    Create a shared field store in the task process, and remove all its blocks when closed.
+
+    Attributes
+    ----------
+    handle
+        handle passed to worker processes.
+    """
+    def __init__(self, max_bytes: int):
+        self._manager = multiprocessing.Manager()
+        self.handle = SharedFieldStoreHandle(
+            entries=self._manager.dict(),
+            condition=self._manager.Condition(),
+            prefix=f"cpk_{os.getpid()}_{uuid.uuid4().hex[:8]}_",
+            max_bytes=max_bytes,
+        )
+
+    def close(self):
+        """
+        Remove all blocks and stop the manager process. Workers should be stopped before.
+        Blocks of fields still loading, such as fields of crashed workers, are also removed.
+        """
+        entries = dict(self.handle.entries)
+        field_bytes = sum(entry.get("nbytes", 0) for entry in entries.values())
+        shared_logger.info(f"shared field store: {len(entries)} fields, {field_bytes / 1024 / 1024:.1f}MB")
+        for name, entry in entries.items():
+            if entry["state"] != _MISSING:
+                unlink_block(name)
+        self._manager.shutdown()
+
+
+class SharedFieldStore:
+    """
+    Process-local access to a shared field store.
+
+    Attributes
+    ----------
+    handle
+        handle created by ``SharedFieldStoreServer``.
+    wait_timeout
+        seconds to wait for a field being decoded by another process.
+        The field is decoded in current process if timeout is reached, such as when the other process hangs.
+        If the other process exits, the field is decoded in current process without waiting for timeout.
+    """
+    def __init__(self, handle: SharedFieldStoreHandle, wait_timeout: float = 60):
+        self.handle = handle
+        self.wait_timeout = wait_timeout
+        self._blocks: dict[str, shared_memory.SharedMemory] = dict()
+        # block names used by current job, one item for each reference.
+        self._job_names: list[str] = []
+        self._lock = threading.Lock()
+
+    def get_block_name(self, key: Hashable) -> str:
+        return self.handle.prefix + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+
+    def get_or_load(self, key: Hashable, load) -> Optional[xr.DataArray]:
+        """
+        Return field of ``key`` from store. If not found, call ``load`` to decode it, and put it into store.
+
+        Parameters
+        ----------
+        key
+            key of the field.
+        load
+            function without arguments returning the decoded field or None.
+
+        Returns
+        -------
+        xr.DataArray or None
+            field backed by shared memory, read-only. A field decoded in current process is returned directly
+            if it can't be put into store.
+        """
+        name = self.get_block_name(key)
+        entries = self.handle.entries
+        condition = self.handle.condition
+        deadline = time.monotonic() + self.wait_timeout
+        with condition:
+            while True:
+                entry = entries.get(name, None)
+                if entry is not None and entry["state"] == _LOADING and not is_process_alive(entry["pid"]):
+                    shared_logger.warning(f"process {entry['pid']} decoding shared field {name} exited, "
+                                          f"decode in current process")
+                    # block may be partly created by the exited process.
+                    unlink_block(name)
+                    entry = None
+                if entry is None:
+                    entries[name] = dict(state=_LOADING, pid=os.getpid())
+                    break
+                if entry["state"] == _MISSING:
+                    return None
+                if entry["state"] == _READY:
+                    entry["refs"] += 1
+                    entry["last_used"] = time.time()
+                    entries[name] = entry
+                    break
+                remaining_time = deadline - time.monotonic()
+                if remaining_time <= 0:
+                    break
+                condition.wait(min(remaining_time, _LOADER_CHECK_INTERVAL))
+
+        if entry is not None:
+            if entry["state"] == _READY:
+                return self._attach(name, entry)
+            shared_logger.warning(f"timeout waiting for shared field {name}, decode in current process")
+            return load()
+
+        # current process decodes the field.
+        try:
+            field = load()
+        except Exception:
+            self._finish_loading(name, None)
+            raise
+
+        if field is None:
+            self._finish_loading(name, dict(state=_MISSING))
+            return None
+
+        entry = self._create_block(name, field)
+        if entry is None:
+            self._finish_loading(name, None)
+            return field
+        self._finish_loading(name, entry)
+        return self._attach(name, entry)
+
+    def _finish_loading(self, name: str, entry: Optional[dict]):
+        """
+        Replace loading entry of current process with ``entry``, or remove it if ``entry`` is None,
+        and wake up processes waiting for the field.
+        """
+        entries = self.handle.entries
+        with self.handle.condition:
+            if entry is None:
+                entries.pop(name, None)
+            else:
+                entries[name] = entry
+            self.handle.condition.notify_all()
+
+    def release_job_fields(self):
+        """
+        Decrease reference counts of fields used by current job, called when a job ends.
+        """
+        with self._lock:
+            names = self._job_names
+            self._job_names = []
+        if len(names) == 0:
+            return
+        entries = self.handle.entries
+        with self.handle.condition:
+            for name in names:
+                entry = entries.get(name, None)
+                if entry is None or entry["state"] != _READY:
+                    continue
+                entry["refs"] = max(entry["refs"] - 1, 0)
+                entries[name] = entry
+        self._close_unused_blocks()
+
+    def close(self):
+        """
+        Release fields of current job and close all blocks mapped in current process.
+        """
+        self.release_job_fields()
+        with self._lock:
+            blocks = list(self._blocks.items())
+            self._blocks.clear()
+        for name, block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass
+
+    def _create_block(self, name: str, field: xr.DataArray) -> Optional[dict]:
+        arrays = [("data", None, field.dims, field.values)]
+        small_coords = dict()
+        for coord_name, coord in field.coords.items():
+            if coord.ndim > 0 and coord.dtype.kind in "biuf":
+                arrays.append(("coord", coord_name, coord.dims, coord.values))
+            else:
+                small_coords[coord_name] = (coord.dims, coord.values)
+
+        specs = []
+        offset = 0
+        for kind, array_name, dims, values in arrays:
+            specs.append(dict(
+                kind=kind, name=array_name, dims=dims,
+                dtype=values.dtype.str, shape=values.shape, offset=offset,
+            ))
+            offset += (values.nbytes + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+        nbytes = max(offset, 1)
+
+        if not self._reserve(name, nbytes):
+            return None
+
+        try:
+            block = open_block(name=name, create=True, size=nbytes)
+        except OSError as e:
+            shared_logger.warning(f"failed to create shared memory block {name}: {e}")
+            return None
+        for spec, (_, _, _, values) in zip(specs, arrays):
+            view = np.ndarray(spec["shape"], dtype=spec["dtype"], buffer=block.buf, offset=spec["offset"])
+            view[...] = values
+            del view
+        block.close()
+
+        # referenced by current job.
+        return dict(
+            state=_READY,
+            nbytes=nbytes,
+            refs=1,
+            last_used=time.time(),
+            dims=field.dims,
+            field_name=field.name,
+            attrs=field.attrs,
+            arrays=specs,
+            small_coords=small_coords,
+        )
+
+    def _reserve(self, name: str, nbytes: int) -> bool:
+        """
+        Remove unused blocks until a new block of ``nbytes`` fits in memory budget,
+        and record ``nbytes`` in the loading entry, so blocks being created by other processes are counted.
+        Return False if the budget can't be met.
+        """
+        max_bytes = self.handle.max_bytes
+        if nbytes > max_bytes:
+            return False
+        entries = self.handle.entries
+        with self.handle.condition:
+            current_entries = dict(entries)
+            # ready blocks and blocks reserved by loading entries.
+            current_bytes = sum(v.get("nbytes", 0) for v in current_entries.values())
+            unused_names = sorted(
+                (k for k, v in current_entries.items() if v["state"] == _READY and v["refs"] == 0),
+                key=lambda k: current_entries[k]["last_used"],
+            )
+            while current_bytes + nbytes > max_bytes and len(unused_names) > 0:
+                evicted_name = unused_names.pop(0)
+                current_bytes -= current_entries[evicted_name]["nbytes"]
+                del entries[evicted_name]
+                unlink_block(evicted_name)
+            if current_bytes + nbytes > max_bytes:
+                return False
+            entries[name] = dict(state=_LOADING, pid=os.getpid(), nbytes=nbytes)
+            return True
+
+    def _attach(self, name: str, entry: dict) -> xr.DataArray:
+        with self._lock:
+            block = self._blocks.get(name, None)
+            if block is None:
+                block = open_block(name=name)
+                self._blocks[name] = block
+            self._job_names.append(name)
+
+        data = None
+        coords = dict()
+        for spec in entry["arrays"]:
+            view = np.ndarray(spec["shape"], dtype=spec["dtype"], buffer=block.buf, offset=spec["offset"])
+            view.flags.writeable = False
+            if spec["kind"] == "data":
+                data = view
+            else:
+                coords[spec["name"]] = (spec["dims"], view)
+        coords.update(entry["small_coords"])
+        return xr.DataArray(data, dims=entry["dims"], coords=coords, attrs=entry["attrs"], name=entry["field_name"])
+
+    def _close_unused_blocks(self):
+        """
+        Close mapped blocks not used by current job. Blocks still referenced by numpy arrays are kept.
+        """
+        with self._lock:
+            used_names = set(self._job_names)
+            for name in list(self._blocks):
+                if name in used_names:
+                    continue
+                try:
+                    self._blocks[name].close()
+                except BufferError:
+                    # arrays of the block are still alive in current process.
+                    continue
+                del self._blocks[name]
+
+
+def is_process_alive(pid: int) -> bool:
+    """
+    Return True if process ``pid`` on current node is running. Exited processes not yet reaped (zombies) are not alive.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            # state follows the command name in parentheses.
+            state = f.read().rsplit(b")", 1)[1].split()[0]
+    except (OSError, IndexError):
+        return True
+    return state not in (b"Z", b"X")
+
+
+def open_block(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    Create or attach a shared memory block which is not tracked by ``multiprocessing.resource_tracker``.
+
+    Blocks are removed by ``SharedFieldStoreServer`` or when evicted.
+    Before Python 3.13, every process attaching a block registers it in resource tracker,
+    which warns about leaked blocks and removes blocks still used by other workers when the process exits.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    block = shared_memory.SharedMemory(name=name, create=create, size=size)
+    resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+def unlink_block(name: str):
+    """
+    Remove a shared memory block. Processes which have mapped the block can still use it until they close it.
+    """
+    try:
+        block = open_block(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    if sys.version_info >= (3, 13):
+        block.unlink()
+    else:
+        # unlink() also unregisters the block from resource tracker, remove the file directly instead.
+        shared_memory._posixshmem.shm_unlink(block._name)
+
+
+class SharedDataSource(DataSource):
+    """
+    Data source wrapper which shares decoded fields between processes using a ``SharedFieldStore``.
+
+    Store key is (``source_key``, ``field_info``, ``start_time``, ``forecast_time``).
+    Returned fields are read-only views of shared memory, plot modules should not modify them in place.
+
+    Attributes
+    ----------
+    data_source
+        data source which is used to decode fields not in store.
+    store
+        process-local shared field store.
+    source_key
+        key to distinguish fields from different data sources sharing one store.
+    """
+    def __init__(self, data_source: DataSource, store: SharedFieldStore, source_key: Hashable = None):
+        super().__init__()
+        self.data_source = data_source
+        self.store = store
+        self.source_key = source_key
+
+    def retrieve(
+            self, field_info: FieldInfo, start_time: pd.Timestamp, forecast_time: pd.Timedelta
+    ) -> xr.DataArray or None:
+        key = (self.source_key, get_field_info_key(field_info), start_time, forecast_time)
+        return self.store.get_or_load(
+            key,
+            lambda: self.data_source.retrieve(
+                field_info=field_info,
+                start_time=start_time,
+                forecast_time=forecast_time,
+            ),
+        )
+
+
+_shared_field_store: Optional[SharedFieldStore] = None
+
+
+def enable_shared_field_store(handle: SharedFieldStoreHandle):
+    """
+    Connect current process to a shared field store. Used as initializer of worker processes.
+    """
+    global _shared_field_store
+    _shared_field_store = SharedFieldStore(handle=handle)
+
+
+def disable_shared_field_store():
+    global _shared_field_store
+    if _shared_field_store is not None:
+        _shared_field_store.close()
+    _shared_field_store = None
+
+
+def get_shared_field_store() -> Optional[SharedFieldStore]:
+    """
+    Return shared field store of current process, or None if it is disabled.
+    """
+    return _shared_field_store
+
+
+def release_shared_fields():
+    """
+    Release fields used by current job, do nothing if shared field store is disabled.
+    """
+    if _shared_field_store is not None:
+        _shared_field_store.release_job_fields()
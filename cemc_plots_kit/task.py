@@ -1,49 +1,179 @@
 from pathlib import Path
+from dataclasses import dataclass, field, replace
+from typing import Optional, Callable, TYPE_CHECKING
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future, as_completed, wait, FIRST_COMPLETED
+from collections import deque
+import traceback
+import time
+import os
 
 import yaml
 import pandas as pd
 
-from cedarkit.maps.util import AreaRange
-
 from cemc_plots_kit.logger import get_logger
 from cemc_plots_kit.config import (
-    ExprConfig, PlotConfig, TimeConfig, JobConfig, parse_start_time, RuntimeConfig,
-    get_default_data_file_name_template,
+    ExprConfig, PlotConfig, TimeConfig, JobConfig, parse_start_time, RuntimeConfig, NamedArea,
+    get_default_data_file_name_template, parse_size,
+)
+from cemc_plots_kit.registry import get_plot_info
+from cemc_plots_kit.source import (
+    get_field_cache, set_field_cache, enable_field_cache,
+    enable_accumulated_field_stores, disable_accumulated_field_stores, close_mapped_files,
+    SharedFieldStoreServer, SharedFieldStoreHandle, enable_shared_field_store, release_shared_fields,
+)
+from cemc_plots_kit.schedule import (
+    JobGroup, group_jobs_by_input_file, split_job_groups, get_job_input_files, count_file_opens,
+    Shard, shard_jobs, get_job_cost, get_shard_file_path,
 )
-from cemc_plots_kit.job import run_job
-from cemc_plots_kit.plots import get_plot_module
+from cemc_plots_kit.watch import DataFileWatcher
+from cemc_plots_kit.manifest import JobManifest, get_manifest_file_path, get_job_fingerprint
+from cemc_plots_kit.timing import (
+    JobTimer, JOB_STAGES, set_job_timer, timing_stage, write_timing_record, summarize_stage_times,
+)
+from cemc_plots_kit.memory import get_rss, get_peak_rss, reset_peak_rss, format_size
+from cemc_plots_kit.output import enable_image_writer, disable_image_writer, get_image_writer, get_image_file_suffix
+from cemc_plots_kit.decimation import check_decimation_method
+
+if TYPE_CHECKING:
+    from cedarkit.maps.util import AreaRange
+
+# Modules of plotting stack (job, map_cache, panel_pool, plot modules) are imported in functions running jobs,
+# so planning jobs and the main process of parallel executor don't import matplotlib, cartopy and cedar_graph plots.
 
 
 task_logger = get_logger(__name__)
 
 
-def run_task(task_file_path: Path):
+@dataclass
+class JobResult:
+    """
+    Result of a plot job executed by ``run_by_serial`` or ``run_by_parallel``.
+
+    Attributes
+    ----------
+    job_config
+        job configuration.
+    output_image_files
+        path list for generated figures, empty if job is failed.
+    error
+        error message with traceback if job is failed, None if job is succeeded.
+    elapsed_time
+        time used by the job.
+    field_cache_hits
+        count of fields loaded from field cache in the job.
+    field_cache_misses
+        count of fields not found in field cache in the job.
+    stage_times
+        seconds of each stage in the job, see ``JOB_STAGES``.
+    field_times
+        seconds of loading each field from data files.
+    rss
+        resident set size in bytes of the process running the job, after the job.
+    peak_rss
+        peak resident set size in bytes of the process during the job.
+        On systems other than Linux, it is the peak of the whole process.
+    """
+    job_config: JobConfig
+    output_image_files: list[Path] = field(default_factory=list)
+    error: Optional[str] = None
+    elapsed_time: Optional[pd.Timedelta] = None
+    field_cache_hits: int = 0
+    field_cache_misses: int = 0
+    stage_times: dict[str, float] = field(default_factory=dict)
+    field_times: dict[str, float] = field(default_factory=dict)
+    rss: Optional[int] = None
+    peak_rss: Optional[int] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    def to_timing_record(self) -> dict:
+        """
+        Return timing record written to timing file.
+        """
+        time_config = self.job_config.time_config
+        return {
+            "plot_name": self.job_config.plot_config.plot_name,
+            "start_time": time_config.start_time.isoformat(),
+            "forecast_time": str(time_config.forecast_time),
+            "succeeded": self.succeeded,
+            "elapsed_time": self.elapsed_time.total_seconds(),
+            "stages": self.stage_times,
+            "fields": self.field_times,
+            "rss": self.rss,
+            "peak_rss": self.peak_rss,
+        }
+
+
+def run_task(
+        task_file_path: Path,
+        watch: bool = False,
+        force: bool = False,
+        shard: Optional[Shard] = None,
+) -> list[JobResult]:
     """
     Run plot tasks defined in task file. Execute the following steps:
 
+    * plan jobs from task file, see ``plan_task``.
+    * run jobs, see ``run_job_configs``.
+
+    Parameters
+    ----------
+    task_file_path
+        task file path
+    watch
+        wait for data files written by the model, and run jobs as soon as their data files are complete.
+    force
+        run all jobs even if they are completed in previous runs.
+    shard
+        run only one shard of jobs, so N shards of a task can run on N nodes without coordination.
+        Each shard uses its own manifest file and timing file, see ``get_shard_file_path``.
+
+    Returns
+    -------
+    list[JobResult]
+        result list, one item for each job.
+    """
+    runtime_config, job_configs = plan_task(task_file_path=task_file_path, shard=shard)
+    return run_job_configs(job_configs=job_configs, runtime_config=runtime_config, watch=watch, force=force)
+
+
+def plan_task(task_file_path: Path, shard: Optional[Shard] = None) -> tuple[RuntimeConfig, list[JobConfig]]:
+    """
+    Create job list from task file without running any job. Execute the following steps:
+
     * load task file
     * generate experiment configuration object and runtime configuration object
-    * generate plot list from the task file, and load plotting module for each plot type
-    * generate plot job list according to time configuration,
-      and use ``check_available`` function in plot module to filter out invalid time combinations.
-    * call ``run_by_serial`` to run all plot jobs in serial
+    * generate plot job list according to time configuration, see ``create_job_configs``.
+    * select jobs of ``shard`` if set, see ``shard_job_configs``.
+
+    Plot modules are not imported.
 
     Parameters
     ----------
     task_file_path
         task file path
+    shard
+        select only one shard of jobs.
+        Manifest file and timing file in runtime config are replaced by files of the shard, see ``get_shard_file_path``.
+
+    Returns
+    -------
+    tuple[RuntimeConfig, list[JobConfig]]
+        runtime config of the task, and job list.
     """
     task_config = load_task_config(task_file_path=task_file_path)
 
     area = None
     if "area" in task_config:
-        area_config = task_config["area"]
-        area = AreaRange(
-            start_latitude=area_config["start_latitude"],
-            end_latitude=area_config["end_latitude"],
-            start_longitude=area_config["start_longitude"],
-            end_longitude=area_config["end_longitude"],
-        )
+        area = parse_area_config(task_config["area"])
+    areas = None
+    if "areas" in task_config:
+        areas = [
+            NamedArea(name=area_config["name"], area=parse_area_config(area_config))
+            for area_config in task_config["areas"]
+        ]
     system_name = task_config["system_name"]
     data_file_name_template = task_config["source"].get("data_file_name_template", None)
     if data_file_name_template is None:
@@ -54,8 +184,14 @@ def run_task(task_file_path: Path):
     expr_config = ExprConfig(
         system_name=system_name,
         area=area,
+        areas=areas,
         data_dir=task_config["source"]["data_dir"],
         data_file_name_template=data_file_name_template,
+        grib_index=task_config["source"].get("grib_index", False),
+        grib_index_dir=task_config["source"].get("grib_index_dir", None),
+        grib_mmap=task_config["source"].get("grib_mmap", False),
+        crop_area=task_config["source"].get("crop_area", False),
+        crop_margin=task_config["source"].get("crop_margin", 2.0),
     )
 
     task_runtime_config = task_config["runtime"]
@@ -64,6 +200,22 @@ def run_task(task_file_path: Path):
     runtime_config = RuntimeConfig(
         **task_runtime_config,
     )
+    png_compress_level = runtime_config.png_compress_level
+    if png_compress_level is not None and not 0 <= png_compress_level <= 9:
+        raise ValueError(f"png_compress_level should be in 0-9: {png_compress_level}")
+    get_image_file_suffix(runtime_config.image_format)
+    check_decimation_method(runtime_config.decimation)
+    if runtime_config.decimation_pixels_per_cell <= 0:
+        raise ValueError(f"decimation_pixels_per_cell should be positive: {runtime_config.decimation_pixels_per_cell}")
+    if shard is not None:
+        runtime_config = replace(
+            runtime_config,
+            manifest_file=get_shard_file_path(get_manifest_file_path(runtime_config), shard),
+            timing_file=(
+                None if runtime_config.timing_file is None
+                else get_shard_file_path(runtime_config.timing_file, shard)
+            ),
+        )
 
     time_config = task_config["time"]
     start_time = parse_start_time(str(time_config["start_time"]))
@@ -72,46 +224,203 @@ def run_task(task_file_path: Path):
     forecast_times = pd.timedelta_range("0h", total_forecast_time, freq=forecast_interval)
 
     plots_config = task_config["plots"]
-    selected_plots = []
-    for plot_name,v in plots_config.items():
-        if not v:
-            continue
-        plot_module = get_plot_module(plot_name=plot_name)
-        selected_plots.append({
-            "plot_name": plot_name,
-            "plot_module": plot_module,
-        })
-
-    task_logger.info(f"selected plots: {selected_plots}")
+    plot_names = [plot_name for plot_name, v in plots_config.items() if v]
+    task_logger.info(f"selected plots: {plot_names}")
 
-    job_configs = []
-    for forecast_time in forecast_times:
-        time_config = TimeConfig(
-            start_time=start_time,
-            forecast_time=forecast_time,
+    job_configs = create_job_configs(
+        expr_config=expr_config,
+        runtime_config=runtime_config,
+        start_time=start_time,
+        forecast_times=forecast_times,
+        plot_names=plot_names,
+    )
+
+    task_logger.info(f"get {len(job_configs)} jobs")
+
+    if shard is not None:
+        job_configs = shard_job_configs(
+            job_configs=job_configs,
+            shard=shard,
+            group_jobs_by_file=runtime_config.group_jobs_by_file,
         )
-        for current_plot in selected_plots:
-            plot_module = current_plot["plot_module"]
-            plot_name = current_plot["plot_name"]
-            plot_config = PlotConfig(plot_name=plot_name)
+        task_logger.info(f"shard {shard}: {len(job_configs)} jobs, "
+                         f"estimated cost {sum(get_job_cost(j) for j in job_configs):.1f}")
 
-            if not plot_module.check_available(time_config=time_config, plot_config=plot_config):
-                task_logger.debug(f"skip job because of time: [{plot_name}] [{start_time}] [{forecast_time}]")
-                continue
+    return runtime_config, job_configs
 
-            job_config = JobConfig(
-                expr_config=expr_config,
-                time_config=time_config,
-                runtime_config=runtime_config,
-                plot_config=plot_config,
-            )
-            job_configs.append(job_config)
 
-    task_logger.info(f"get {len(job_configs)} jobs")
+def run_job_configs(
+        job_configs: list[JobConfig],
+        runtime_config: RuntimeConfig,
+        watch: bool = False,
+        force: bool = False,
+) -> list[JobResult]:
+    """
+    Run planned jobs. Execute the following steps:
+
+    * skip jobs completed in previous runs with the same inputs, according to manifest file.
+    * call ``run_by_serial``, ``run_by_parallel`` or ``run_by_pipeline`` to run all plot jobs
+      according to ``executor`` in runtime config.
+      If ``watch`` is set, call ``run_by_watch`` to run jobs when their data files are ready.
+
+    Parameters
+    ----------
+    job_configs
+        job list, such as the result of ``plan_task`` or jobs loaded from a plan file.
+    runtime_config
+        runtime config of the task, used for executor, manifest file and timing file.
+    watch
+        wait for data files written by the model, and run jobs as soon as their data files are complete.
+    force
+        run all jobs even if they are completed in previous runs.
+
+    Returns
+    -------
+    list[JobResult]
+        result list, one item for each job.
+    """
+
+    if runtime_config.executor == "pipeline" and not watch:
+        # pipeline executor runs all jobs in current process and always writes images in background threads.
+        unsupported_options = [
+            name for name in ("shared_field_store_size", "max_jobs_per_worker", "max_worker_rss", "async_save")
+            if getattr(runtime_config, name) not in (None, False)
+        ]
+        if len(unsupported_options) > 0:
+            raise ValueError(f"options are not supported by pipeline executor: {', '.join(unsupported_options)}")
+
+    manifest = JobManifest(get_manifest_file_path(runtime_config))
+    manifest.load()
+    if not force:
+        total_count = len(job_configs)
+        job_configs = [
+            job_config for job_config in job_configs
+            if not manifest.is_completed(job_config, get_job_fingerprint(job_config))
+        ]
+        if len(job_configs) < total_count:
+            task_logger.info(f"skip {total_count - len(job_configs)} jobs completed in previous runs, "
+                             f"use force option to run them again. manifest: {manifest.file_path}")
+
+    def on_job_result(job_result: JobResult):
+        if job_result.succeeded:
+            manifest.add(job_config=job_result.job_config, output_image_files=job_result.output_image_files)
+        if runtime_config.timing_file is not None and job_result.elapsed_time is not None:
+            write_timing_record(runtime_config.timing_file, job_result.to_timing_record())
+
+    field_cache_size = None
+    if runtime_config.field_cache_size is not None:
+        field_cache_size = parse_size(runtime_config.field_cache_size)
+
+    shared_field_store_size = None
+    if runtime_config.shared_field_store_size is not None:
+        shared_field_store_size = parse_size(runtime_config.shared_field_store_size)
+
+    accumulated_field_store_size = None
+    if runtime_config.accumulated_field_store_size is not None:
+        accumulated_field_store_size = parse_size(runtime_config.accumulated_field_store_size)
+
+    max_worker_rss = None
+    if runtime_config.max_worker_rss is not None:
+        max_worker_rss = parse_size(runtime_config.max_worker_rss)
+    if runtime_config.max_jobs_per_worker is not None and runtime_config.max_jobs_per_worker < 1:
+        raise ValueError(f"max_jobs_per_worker should be positive: {runtime_config.max_jobs_per_worker}")
+
+    job_groups = None
+    if runtime_config.group_jobs_by_file:
+        job_groups = group_jobs_by_input_file(job_configs)
+        task_logger.info(f"get {len(job_groups)} job groups by input file, "
+                         f"estimated file opens: {count_file_opens(job_groups)} "
+                         f"(ungrouped: {sum(len(get_job_input_files(j)) for j in job_configs)})")
 
     task_logger.info("begin to run jobs...")
-    run_by_serial(job_configs=job_configs)
+    executor = runtime_config.executor
+    if watch:
+        job_results = run_by_watch(
+            job_configs=job_configs,
+            runtime_config=runtime_config,
+            field_cache_size=field_cache_size,
+            shared_field_store_size=shared_field_store_size,
+            accumulated_field_store_size=accumulated_field_store_size,
+            max_worker_rss=max_worker_rss,
+            on_job_result=on_job_result,
+        )
+    elif executor == "serial":
+        job_results = run_by_serial(
+            job_configs=job_configs,
+            field_cache_size=field_cache_size,
+            job_groups=job_groups,
+            share_accumulated_fields=runtime_config.share_accumulated_fields,
+            accumulated_field_store_size=accumulated_field_store_size,
+            map_feature_cache=runtime_config.map_feature_cache,
+            transform_cache=runtime_config.transform_cache,
+            transform_cache_dir=runtime_config.transform_cache_dir,
+            transform_cache_contours=runtime_config.transform_cache_contours,
+            reuse_panels=runtime_config.reuse_panels,
+            async_save=runtime_config.async_save,
+            max_jobs_per_worker=runtime_config.max_jobs_per_worker,
+            max_worker_rss=max_worker_rss,
+            on_job_result=on_job_result,
+        )
+    elif executor == "parallel":
+        job_results = run_by_parallel(
+            job_configs=job_configs,
+            max_workers=runtime_config.max_workers,
+            field_cache_size=field_cache_size,
+            shared_field_store_size=shared_field_store_size,
+            job_groups=job_groups,
+            share_accumulated_fields=runtime_config.share_accumulated_fields,
+            accumulated_field_store_size=accumulated_field_store_size,
+            map_feature_cache=runtime_config.map_feature_cache,
+            transform_cache=runtime_config.transform_cache,
+            transform_cache_dir=runtime_config.transform_cache_dir,
+            transform_cache_contours=runtime_config.transform_cache_contours,
+            reuse_panels=runtime_config.reuse_panels,
+            async_save=runtime_config.async_save,
+            max_jobs_per_worker=runtime_config.max_jobs_per_worker,
+            max_worker_rss=max_worker_rss,
+            on_job_result=on_job_result,
+        )
+    elif executor == "pipeline":
+        job_results = run_by_pipeline(
+            job_configs=job_configs,
+            load_workers=runtime_config.pipeline_load_workers,
+            save_workers=runtime_config.pipeline_save_workers,
+            queue_size=runtime_config.pipeline_queue_size,
+            image_format=runtime_config.image_format,
+            png_compress_level=runtime_config.png_compress_level,
+            field_cache_size=field_cache_size,
+            job_groups=job_groups,
+            share_accumulated_fields=runtime_config.share_accumulated_fields,
+            accumulated_field_store_size=accumulated_field_store_size,
+            map_feature_cache=runtime_config.map_feature_cache,
+            transform_cache=runtime_config.transform_cache,
+            transform_cache_dir=runtime_config.transform_cache_dir,
+            transform_cache_contours=runtime_config.transform_cache_contours,
+            reuse_panels=runtime_config.reuse_panels,
+            on_job_result=on_job_result,
+        )
+    else:
+        raise ValueError(f"executor is not supported: {executor}")
     task_logger.info("end jobs")
+    manifest.compact()
+
+    failed_results = [r for r in job_results if not r.succeeded]
+    task_logger.info(f"jobs: {len(job_results) - len(failed_results)} succeeded, {len(failed_results)} failed")
+    for result in failed_results:
+        task_logger.error(f"job failed: [{result.job_config.plot_config.plot_name}] "
+                          f"[{result.job_config.time_config.start_time}] "
+                          f"[{result.job_config.time_config.forecast_time}]")
+
+    if field_cache_size is not None:
+        cache_hits = sum(r.field_cache_hits for r in job_results)
+        cache_misses = sum(r.field_cache_misses for r in job_results)
+        cache_total = cache_hits + cache_misses
+        hit_rate = cache_hits / cache_total if cache_total > 0 else 0.0
+        task_logger.info(f"field cache: {cache_hits} hits, {cache_misses} misses, hit rate {hit_rate:.1%}")
+
+    log_timing_summary(job_results)
+
+    return job_results
 
 
 def load_task_config(task_file_path: Path) -> dict:
@@ -133,22 +442,1130 @@ def load_task_config(task_file_path: Path) -> dict:
         return task_config
 
 
-def run_by_serial(job_configs: list[JobConfig]):
+def create_job_configs(
+        expr_config: ExprConfig,
+        runtime_config: RuntimeConfig,
+        start_time: pd.Timestamp,
+        forecast_times: list[pd.Timedelta],
+        plot_names: list[str],
+) -> list[JobConfig]:
+    """
+    Generate plot job list ordered by forecast time.
+    Availability of each plot is checked using plot registry, without importing plot modules.
+
+    Parameters
+    ----------
+    expr_config
+    runtime_config
+    start_time
+    forecast_times
+    plot_names
+        plot types, see ``cemc_plots_kit.registry``.
+
+    Returns
+    -------
+    list[JobConfig]
+    """
+    plot_infos = [get_plot_info(plot_name) for plot_name in plot_names]
+
+    job_configs = []
+    for forecast_time in forecast_times:
+        time_config = TimeConfig(
+            start_time=start_time,
+            forecast_time=forecast_time,
+        )
+        for plot_info in plot_infos:
+            if not plot_info.is_available(forecast_time):
+                task_logger.debug(f"skip job because of time: [{plot_info.name}] [{start_time}] [{forecast_time}]")
+                continue
+
+            job_config = JobConfig(
+                expr_config=expr_config,
+                time_config=time_config,
+                runtime_config=runtime_config,
+                plot_config=PlotConfig(plot_name=plot_info.name),
+            )
+            job_configs.append(job_config)
+    return job_configs
+
+
+def shard_job_configs(
+        job_configs: list[JobConfig],
+        shard: Shard,
+        group_jobs_by_file: bool = True,
+) -> list[JobConfig]:
     """
-    Execute all jobs in job list.
+    Select jobs of one shard from job list of a task. Shards are balanced by estimated cost of each plot type,
+    and the same job list is always split in the same way. See ``cemc_plots_kit.schedule.shard_jobs``.
+
+    Parameters
+    ----------
+    job_configs
+        job list of the whole task, such as the result of ``create_job_configs``.
+    shard
+        shard to select, such as ``parse_shard("0/4")``.
+    group_jobs_by_file
+        if True, jobs plotting the same forecast time are kept in one shard,
+        unless there are fewer forecast times than shards.
+
+    Returns
+    -------
+    list[JobConfig]
+        jobs of the shard, in the order of ``job_configs``.
+    """
+    job_groups = group_jobs_by_input_file(job_configs) if group_jobs_by_file else None
+    job_indexes = shard_jobs(job_configs, shard=shard, job_groups=job_groups)
+    return [job_configs[i] for i in job_indexes]
+
+
+def parse_area_config(area_config: dict) -> "AreaRange":
+    """
+    Create area range from an area item in task file.
+
+    Parameters
+    ----------
+    area_config
+        dict with keys: start_latitude, end_latitude, start_longitude, end_longitude
+
+    Returns
+    -------
+    AreaRange
+    """
+    from cedarkit.maps.util import AreaRange
+
+    return AreaRange(
+        start_latitude=area_config["start_latitude"],
+        end_latitude=area_config["end_latitude"],
+        start_longitude=area_config["start_longitude"],
+        end_longitude=area_config["end_longitude"],
+    )
+
+
+def run_by_serial(
+        job_configs: list[JobConfig],
+        field_cache_size: Optional[int] = None,
+        job_groups: Optional[list[JobGroup]] = None,
+        share_accumulated_fields: bool = False,
+        accumulated_field_store_size: Optional[int] = None,
+        map_feature_cache: bool = False,
+        transform_cache: bool = False,
+        transform_cache_dir: Optional[str] = None,
+        transform_cache_contours: bool = False,
+        reuse_panels: bool = False,
+        async_save: bool = False,
+        max_jobs_per_worker: Optional[int] = None,
+        max_worker_rss: Optional[int] = None,
+        on_job_result: Optional[Callable[[JobResult], None]] = None,
+) -> list[JobResult]:
+    """
+    Execute all jobs in job list one by one.
+
+    A failed job is recorded in its ``JobResult`` and doesn't stop other jobs.
+
+    Jobs run in current process, unless ``max_jobs_per_worker`` or ``max_worker_rss`` is set.
+    Then jobs run in one worker process which is replaced when it reaches the limits, see ``run_by_parallel``.
 
     Parameters
     ----------
     job_configs
         job list, one item represents one job.
+    field_cache_size
+        memory budget in bytes of field cache shared by all jobs, field cache is disabled if None.
+    job_groups
+        if set, jobs are executed group by group. See ``group_jobs_by_input_file``.
+    share_accumulated_fields
+        if True, accumulated fields such as APCP are loaded once and shared by all rain plots.
+    accumulated_field_store_size
+        memory budget in bytes of each accumulated field store, not limited if None.
+    map_feature_cache
+        if True, map features are loaded once and reused by all figures.
+    transform_cache
+        if True, projected grids and barb positions are computed once and reused by all figures.
+    transform_cache_dir
+        directory to save projected grids and barb positions, so they are reused by later tasks.
+    transform_cache_contours
+        if True, contours are plotted on projected grids of transform cache, see ``enable_transform_cache``.
+    reuse_panels
+        if True, figures with the same map layout are reused, only data artists are replaced.
+    async_save
+        if True, images of a job are written in a background thread while the next job runs,
+        and result of the job is reported after its images are written.
+    max_jobs_per_worker
+        replace the worker process after it runs this number of jobs.
+    max_worker_rss
+        replace the worker process after a job if its resident set size in bytes is larger than this value.
+    on_job_result
+        called in current process when each job is finished.
+
+    Returns
+    -------
+    list[JobResult]
+        result list in the same order of ``job_configs``.
     """
+    if max_jobs_per_worker is not None or max_worker_rss is not None:
+        return run_by_parallel(
+            job_configs=job_configs,
+            max_workers=1,
+            field_cache_size=field_cache_size,
+            job_groups=job_groups,
+            share_accumulated_fields=share_accumulated_fields,
+            accumulated_field_store_size=accumulated_field_store_size,
+            map_feature_cache=map_feature_cache,
+            transform_cache=transform_cache,
+            transform_cache_dir=transform_cache_dir,
+            transform_cache_contours=transform_cache_contours,
+            reuse_panels=reuse_panels,
+            async_save=async_save,
+            max_jobs_per_worker=max_jobs_per_worker,
+            max_worker_rss=max_worker_rss,
+            on_job_result=on_job_result,
+        )
+
     count = len(job_configs)
-    for i, job_config in enumerate(job_configs):
+    job_results: list[Optional[JobResult]] = [None] * count
+    init_job_process(
+        field_cache_size=field_cache_size,
+        share_accumulated_fields=share_accumulated_fields,
+        accumulated_field_store_size=accumulated_field_store_size,
+        map_feature_cache=map_feature_cache,
+        transform_cache=transform_cache,
+        transform_cache_dir=transform_cache_dir,
+        transform_cache_contours=transform_cache_contours,
+        reuse_panels=reuse_panels,
+        async_save=async_save,
+    )
+
+    def set_result(index: int, job_result: JobResult):
+        job_result = wait_job_output(job_result)
+        log_job_result(job_result=job_result, index=index, count=count)
+        job_results[index] = job_result
+        if on_job_result is not None:
+            on_job_result(job_result)
+
+    # job whose images may be still being written.
+    previous_job: Optional[tuple[int, JobResult]] = None
+    for i in get_job_order(count=count, job_groups=job_groups):
+        job_config = job_configs[i]
         task_logger.info(f"job {i+1}/{count} start...")
         task_logger.info(f"  [{job_config.plot_config.plot_name}] "
                          f"[{job_config.time_config.start_time}] "
                          f"[{job_config.time_config.forecast_time}]")
-        job_start_time = pd.Timestamp.now()
-        output_image_file_path = run_job(job_config=job_config)
-        job_end_time = pd.Timestamp.now()
-        task_logger.info(f"job {i+1}/{count} done. time: {job_end_time - job_start_time}")
+        job_result = run_job_with_result(job_config=job_config, wait_output=False)
+        if previous_job is not None:
+            set_result(*previous_job)
+        previous_job = (i, job_result)
+    if previous_job is not None:
+        set_result(*previous_job)
+    set_field_cache(None)
+    disable_accumulated_field_stores()
+    close_mapped_files()
+    if async_save:
+        disable_image_writer()
+    if transform_cache:
+        from cemc_plots_kit.transform_cache import disable_transform_cache
+        disable_transform_cache()
+    if reuse_panels:
+        from cemc_plots_kit.panel_pool import disable_panel_pool
+        disable_panel_pool()
+    return job_results
+
+
+def run_by_parallel(
+        job_configs: list[JobConfig],
+        max_workers: Optional[int] = None,
+        field_cache_size: Optional[int] = None,
+        shared_field_store_size: Optional[int] = None,
+        job_groups: Optional[list[JobGroup]] = None,
+        share_accumulated_fields: bool = False,
+        accumulated_field_store_size: Optional[int] = None,
+        map_feature_cache: bool = False,
+        transform_cache: bool = False,
+        transform_cache_dir: Optional[str] = None,
+        transform_cache_contours: bool = False,
+        reuse_panels: bool = False,
+        async_save: bool = False,
+        max_jobs_per_worker: Optional[int] = None,
+        max_worker_rss: Optional[int] = None,
+        on_job_result: Optional[Callable[[JobResult], None]] = None,
+) -> list[JobResult]:
+    """
+    Execute all jobs in job list using a process pool.
+
+    A failed job is recorded in its ``JobResult`` and doesn't stop other jobs.
+
+    If ``max_jobs_per_worker`` or ``max_worker_rss`` is set, each worker process runs one job group at a time,
+    and is replaced by a new process when it reaches the limits, so memory leaked by plotting packages is released.
+    Limits are checked after each job group.
+
+    Parameters
+    ----------
+    job_configs
+        job list, one item represents one job.
+    max_workers
+        number of worker processes, default is the number of CPUs.
+    field_cache_size
+        memory budget in bytes of field cache in each worker process, field cache is disabled if None.
+    shared_field_store_size
+        memory budget in bytes of shared field store used by all worker processes, disabled if None.
+        Fields are decoded once and shared between workers through shared memory, see ``SharedFieldStore``.
+    job_groups
+        if set, all jobs in one group are submitted together and run in one worker.
+        Groups are split if there are fewer groups than workers, see ``split_job_groups``.
+        Otherwise, each job is submitted separately. See ``group_jobs_by_input_file``.
+    share_accumulated_fields
+        if True, accumulated fields such as APCP are loaded once in each worker process and shared by all rain plots.
+    accumulated_field_store_size
+        memory budget in bytes of each accumulated field store in each worker process, not limited if None.
+    map_feature_cache
+        if True, map features are loaded once in each worker process and reused by all figures.
+    transform_cache
+        if True, projected grids and barb positions are computed once in each worker process.
+    transform_cache_dir
+        directory to save projected grids and barb positions, shared by worker processes and later tasks.
+    transform_cache_contours
+        if True, contours are plotted on projected grids of transform cache, see ``enable_transform_cache``.
+    reuse_panels
+        if True, figures with the same map layout are reused in each worker process.
+    async_save
+        if True, images are written in a background thread of each worker process while the next job in the same group runs.
+    max_jobs_per_worker
+        replace a worker process after it runs this number of jobs.
+    max_worker_rss
+        replace a worker process if its resident set size in bytes is larger than this value after a job group.
+    on_job_result
+        called in current process when each job is finished.
+
+    Returns
+    -------
+    list[JobResult]
+        result list in the same order of ``job_configs``.
+    """
+    count = len(job_configs)
+    job_results: list[Optional[JobResult]] = [None] * count
+    if max_workers is None:
+        max_workers = os.cpu_count()
+    if job_groups is None:
+        job_index_groups = [[i] for i in range(count)]
+    else:
+        job_groups = split_job_groups(job_groups, job_configs=job_configs, min_count=max_workers)
+        job_index_groups = [group.job_indexes for group in job_groups]
+    shared_field_store_server = None
+    if shared_field_store_size is not None:
+        shared_field_store_server = SharedFieldStoreServer(max_bytes=shared_field_store_size)
+    init_args = (
+        field_cache_size,
+        share_accumulated_fields,
+        accumulated_field_store_size,
+        map_feature_cache,
+        transform_cache,
+        transform_cache_dir,
+        transform_cache_contours,
+        reuse_panels,
+        async_save,
+        None if shared_field_store_server is None else shared_field_store_server.handle,
+    )
+
+    def set_result(index: int, job_result: JobResult):
+        log_job_result(job_result=job_result, index=index, count=count)
+        job_results[index] = job_result
+        if on_job_result is not None:
+            on_job_result(job_result)
+
+    try:
+        if max_jobs_per_worker is not None or max_worker_rss is not None:
+            run_by_recycled_workers(
+                job_configs=job_configs,
+                job_index_groups=job_index_groups,
+                max_workers=max_workers,
+                init_args=init_args,
+                max_jobs_per_worker=max_jobs_per_worker,
+                max_worker_rss=max_worker_rss,
+                on_job_result=set_result,
+            )
+        else:
+            with ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=init_job_process,
+                    initargs=init_args,
+            ) as executor:
+                task_logger.info(f"submitting {count} jobs in {len(job_index_groups)} groups to {max_workers} workers...")
+                futures = {
+                    executor.submit(run_jobs_with_result, [job_configs[i] for i in job_indexes]): job_indexes
+                    for job_indexes in job_index_groups
+                }
+                for future in as_completed(futures):
+                    job_indexes = futures[future]
+                    try:
+                        group_results = future.result()
+                    except Exception:
+                        # worker process is broken, such as killed by OOM killer.
+                        error = traceback.format_exc()
+                        group_results = [JobResult(job_config=job_configs[i], error=error) for i in job_indexes]
+                    for i, job_result in zip(job_indexes, group_results):
+                        set_result(i, job_result)
+    finally:
+        # workers are stopped, remove all shared memory blocks.
+        if shared_field_store_server is not None:
+            shared_field_store_server.close()
+    return job_results
+
+
+class _RecycledWorker:
+    """
+    A worker process used by ``_RecycledWorkerPool``, which runs one job group at a time.
+    The process is a single-process ``ProcessPoolExecutor``, so it can be replaced without affecting other workers.
+    """
+    def __init__(self, init_args: tuple):
+        self.init_args = init_args
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.job_count = 0
+        self.start()
+
+    def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=1, initializer=init_job_process, initargs=self.init_args)
+        self.job_count = 0
+
+    def restart(self):
+        self.executor.shutdown(wait=True)
+        self.start()
+
+
+class _RecycledWorkerPool:
+    """
+    Worker processes which run submitted job groups and are replaced when they reach limits of job count or memory.
+    Groups can be submitted while other groups are running, such as in watch mode.
+
+    Attributes
+    ----------
+    job_configs
+        job list, job groups are indexes of this list.
+    max_workers
+        number of worker processes, workers are started when groups are submitted.
+    init_args
+        arguments of ``init_job_process`` in each worker process.
+    max_jobs_per_worker
+        replace a worker process after it runs this number of jobs.
+    max_worker_rss
+        replace a worker process if its resident set size in bytes after a job group is larger than this value.
+    """
+    def __init__(
+            self,
+            job_configs: list[JobConfig],
+            max_workers: int,
+            init_args: tuple,
+            max_jobs_per_worker: Optional[int] = None,
+            max_worker_rss: Optional[int] = None,
+    ):
+        self.job_configs = job_configs
+        self.max_workers = max_workers
+        self.init_args = init_args
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_worker_rss = max_worker_rss
+        self.workers: list[_RecycledWorker] = []
+        self._idle_workers: deque[_RecycledWorker] = deque()
+        self._pending_groups: deque[list[int]] = deque()
+        self._running_futures: dict[Future, tuple[_RecycledWorker, list[int]]] = dict()
+
+    def __len__(self):
+        """
+        Return count of pending and running job groups.
+        """
+        return len(self._pending_groups) + len(self._running_futures)
+
+    def submit(self, job_indexes: list[int]):
+        self._pending_groups.append(job_indexes)
+        self._submit_pending_groups()
+
+    def wait(self, timeout: Optional[float] = None) -> list[tuple[list[int], list[JobResult]]]:
+        """
+        Wait until some running groups are finished or timeout is reached.
+
+        Returns
+        -------
+        list[tuple[list[int], list[JobResult]]]
+            job indexes and results of finished groups, empty if no group is finished before timeout.
+        """
+        if len(self._running_futures) == 0:
+            return []
+        done_futures, _ = wait(self._running_futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        finished_groups = []
+        for future in done_futures:
+            worker, job_indexes = self._running_futures.pop(future)
+            try:
+                group_results = future.result()
+            except Exception:
+                # worker process is broken, such as killed by OOM killer.
+                error = traceback.format_exc()
+                group_results = [JobResult(job_config=self.job_configs[i], error=error) for i in job_indexes]
+                worker.restart()
+            else:
+                worker.job_count += len(group_results)
+                rss = group_results[-1].rss if len(group_results) > 0 else None
+                if self.max_jobs_per_worker is not None and worker.job_count >= self.max_jobs_per_worker:
+                    task_logger.info(f"restart worker after {worker.job_count} jobs")
+                    worker.restart()
+                elif self.max_worker_rss is not None and rss is not None and rss > self.max_worker_rss:
+                    task_logger.info(f"restart worker after {worker.job_count} jobs, rss: {format_size(rss)}")
+                    worker.restart()
+            self._idle_workers.append(worker)
+            finished_groups.append((job_indexes, group_results))
+        self._submit_pending_groups()
+        return finished_groups
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.executor.shutdown()
+
+    def _submit_pending_groups(self):
+        while len(self._pending_groups) > 0:
+            if len(self._idle_workers) == 0:
+                if len(self.workers) >= self.max_workers:
+                    return
+                worker = _RecycledWorker(self.init_args)
+                self.workers.append(worker)
+            else:
+                worker = self._idle_workers.popleft()
+            job_indexes = self._pending_groups.popleft()
+            future = worker.executor.submit(run_jobs_with_result, [self.job_configs[i] for i in job_indexes])
+            self._running_futures[future] = (worker, job_indexes)
+
+
+def run_by_recycled_workers(
+        job_configs: list[JobConfig],
+        job_index_groups: list[list[int]],
+        max_workers: int,
+        init_args: tuple,
+        max_jobs_per_worker: Optional[int] = None,
+        max_worker_rss: Optional[int] = None,
+        on_job_result: Optional[Callable[[int, JobResult], None]] = None,
+):
+    """
+    Run job groups in worker processes which are replaced when they reach limits of job count or memory.
+    Used by ``run_by_parallel`` and ``run_by_serial``. See ``_RecycledWorkerPool``.
+
+    Parameters
+    ----------
+    job_configs
+        job list, one item represents one job.
+    job_index_groups
+        job indexes of each group, groups are submitted in this order.
+    max_workers
+        number of worker processes.
+    init_args
+        arguments of ``init_job_process`` in each worker process.
+    max_jobs_per_worker
+        replace a worker process after it runs this number of jobs.
+    max_worker_rss
+        replace a worker process if its resident set size in bytes after a job group is larger than this value.
+    on_job_result
+        called with job index and result in current process when each job is finished.
+    """
+    pool = _RecycledWorkerPool(
+        job_configs=job_configs,
+        max_workers=max_workers,
+        init_args=init_args,
+        max_jobs_per_worker=max_jobs_per_worker,
+        max_worker_rss=max_worker_rss,
+    )
+    task_logger.info(f"submitting {len(job_configs)} jobs in {len(job_index_groups)} groups "
+                     f"to {min(max_workers, len(job_index_groups))} workers, "
+                     f"max jobs per worker: {max_jobs_per_worker}, max worker rss: {format_size(max_worker_rss)}")
+    try:
+        for job_indexes in job_index_groups:
+            pool.submit(job_indexes)
+        while len(pool) > 0:
+            for job_indexes, group_results in pool.wait():
+                for i, job_result in zip(job_indexes, group_results):
+                    if on_job_result is not None:
+                        on_job_result(i, job_result)
+    finally:
+        pool.shutdown()
+
+
+@dataclass
+class _PipelineJob:
+    """
+    State of a job in ``run_by_pipeline``.
+    """
+    index: int
+    job_timer: JobTimer = field(default_factory=JobTimer)
+    start_time: pd.Timestamp = field(default_factory=pd.Timestamp.now)
+    output_image_files: list[Path] = field(default_factory=list)
+    write_futures: list[Future] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def is_done(self) -> bool:
+        return all(f.done() for f in self.write_futures)
+
+
+def run_by_pipeline(
+        job_configs: list[JobConfig],
+        load_workers: int = 2,
+        save_workers: int = 2,
+        queue_size: int = 4,
+        image_format: str = "png",
+        png_compress_level: Optional[int] = None,
+        field_cache_size: Optional[int] = None,
+        job_groups: Optional[list[JobGroup]] = None,
+        share_accumulated_fields: bool = False,
+        accumulated_field_store_size: Optional[int] = None,
+        map_feature_cache: bool = False,
+        transform_cache: bool = False,
+        transform_cache_dir: Optional[str] = None,
+        transform_cache_contours: bool = False,
+        reuse_panels: bool = False,
+        on_job_result: Optional[Callable[[JobResult], None]] = None,
+) -> list[JobResult]:
+    """
+    Execute all jobs in current process with three overlapping stages:
+
+    * load: ``load_workers`` threads prepare jobs and load data of following jobs.
+    * plot: current thread plots figures and draws them into images, because matplotlib figures are not thread-safe.
+    * save: ``save_workers`` threads encode and write images, see ``ImageWriter``.
+
+    At most ``queue_size`` jobs are loaded ahead of plotting, and at most ``queue_size`` images wait to be written,
+    so memory is bounded.
+
+    Working directory of the process is shared by all threads, so jobs run in current directory.
+    Field cache hits are not counted for each job because loading of jobs overlaps.
+    A failed job is recorded in its ``JobResult`` and doesn't stop other jobs.
+
+    Parameters
+    ----------
+    job_configs
+        job list, one item represents one job.
+    load_workers
+        number of threads loading data.
+    save_workers
+        number of threads writing images.
+    queue_size
+        max number of loaded jobs waiting for plotting, and max number of images waiting for writing.
+    image_format
+        format of output images, see ``cemc_plots_kit.output.encode_image``.
+    png_compress_level
+        zlib compression level of output PNG images, see ``cemc_plots_kit.output.encode_image``.
+    field_cache_size
+        memory budget in bytes of field cache shared by all jobs, field cache is disabled if None.
+    job_groups
+        if set, jobs are executed group by group. See ``group_jobs_by_input_file``.
+    share_accumulated_fields
+        if True, accumulated fields such as APCP are loaded once and shared by all rain plots.
+    accumulated_field_store_size
+        memory budget in bytes of each accumulated field store, not limited if None.
+    map_feature_cache
+        if True, map features are loaded once and reused by all figures.
+    transform_cache
+        if True, projected grids and barb positions are computed once and reused by all figures.
+    transform_cache_dir
+        directory to save projected grids and barb positions, so they are reused by later tasks.
+    transform_cache_contours
+        if True, contours are plotted on projected grids of transform cache, see ``enable_transform_cache``.
+    reuse_panels
+        if True, figures with the same map layout are reused, only data artists are replaced.
+    on_job_result
+        called in current thread when each job is finished.
+
+    Returns
+    -------
+    list[JobResult]
+        result list in the same order of ``job_configs``.
+    """
+    from cemc_plots_kit.job import prepare_job, load_job_data, render_job_area, release_panel, close_figures
+    from cemc_plots_kit.output import ImageWriter, render_panel
+
+    count = len(job_configs)
+    job_results: list[Optional[JobResult]] = [None] * count
+    init_job_process(
+        field_cache_size=field_cache_size,
+        share_accumulated_fields=share_accumulated_fields,
+        accumulated_field_store_size=accumulated_field_store_size,
+        map_feature_cache=map_feature_cache,
+        transform_cache=transform_cache,
+        transform_cache_dir=transform_cache_dir,
+        transform_cache_contours=transform_cache_contours,
+        reuse_panels=reuse_panels,
+    )
+
+    def load_job(job: _PipelineJob):
+        set_job_timer(job.job_timer)
+        try:
+            context = prepare_job(job_config=job_configs[job.index])
+            plot_data = load_job_data(context=context)
+        finally:
+            set_job_timer(None)
+        return context, plot_data
+
+    rendered_jobs: list[_PipelineJob] = []
+
+    def finish_jobs(wait_all: bool):
+        for job in list(rendered_jobs):
+            if wait_all:
+                wait(job.write_futures)
+            elif not job.is_done():
+                continue
+            rendered_jobs.remove(job)
+            error = job.error
+            if error is None:
+                for future in job.write_futures:
+                    exception = future.exception()
+                    if exception is not None:
+                        error = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+                        break
+            job_result = JobResult(
+                job_config=job_configs[job.index],
+                output_image_files=job.output_image_files if error is None else [],
+                error=error,
+                elapsed_time=pd.Timestamp.now() - job.start_time,
+                stage_times=job.job_timer.stages,
+                field_times=job.job_timer.fields,
+            )
+            log_job_result(job_result=job_result, index=job.index, count=count)
+            job_results[job.index] = job_result
+            if on_job_result is not None:
+                on_job_result(job_result)
+
+    job_order = iter(get_job_order(count=count, job_groups=job_groups))
+    with ThreadPoolExecutor(max_workers=load_workers, thread_name_prefix="job-loader") as load_executor, \
+            ImageWriter(max_workers=save_workers, max_pending=queue_size) as image_writer:
+        # bounded queue of jobs being loaded or waiting for plotting, in execution order.
+        loading_jobs: deque[tuple[_PipelineJob, Future]] = deque()
+
+        def submit_next_job():
+            index = next(job_order, None)
+            if index is None:
+                return
+            job = _PipelineJob(index=index)
+            loading_jobs.append((job, load_executor.submit(load_job, job)))
+
+        for _ in range(queue_size):
+            submit_next_job()
+
+        while len(loading_jobs) > 0:
+            job, load_future = loading_jobs.popleft()
+            task_logger.info(f"job {job.index+1}/{count} start plotting...")
+            rendered_jobs.append(job)
+            try:
+                context, plot_data = load_future.result()
+            except Exception:
+                job.error = traceback.format_exc()
+                submit_next_job()
+                finish_jobs(wait_all=False)
+                continue
+            submit_next_job()
+
+            set_job_timer(job.job_timer)
+            try:
+                for area_name, area_range in context.plot_areas:
+                    panel, output_image_file_path = render_job_area(
+                        context=context,
+                        plot_data=plot_data,
+                        area_name=area_name,
+                        area_range=area_range,
+                    )
+                    try:
+                        with timing_stage("save"):
+                            image = render_panel(panel)
+                    finally:
+                        release_panel(panel)
+                    job.write_futures.append(
+                        image_writer.submit(
+                            image,
+                            output_image_file_path,
+                            job_timer=job.job_timer,
+                            image_format=image_format,
+                            compress_level=png_compress_level,
+                        )
+                    )
+                    job.output_image_files.append(output_image_file_path)
+            except Exception:
+                job.error = traceback.format_exc()
+                # plot function may fail after its figure is created.
+                close_figures()
+            finally:
+                set_job_timer(None)
+            del context, plot_data
+
+            finish_jobs(wait_all=False)
+
+        finish_jobs(wait_all=True)
+
+    set_field_cache(None)
+    disable_accumulated_field_stores()
+    close_mapped_files()
+    if transform_cache:
+        from cemc_plots_kit.transform_cache import disable_transform_cache
+        disable_transform_cache()
+    if reuse_panels:
+        from cemc_plots_kit.panel_pool import disable_panel_pool
+        disable_panel_pool()
+    return job_results
+
+
+def init_job_process(
+        field_cache_size: Optional[int] = None,
+        share_accumulated_fields: bool = False,
+        accumulated_field_store_size: Optional[int] = None,
+        map_feature_cache: bool = False,
+        transform_cache: bool = False,
+        transform_cache_dir: Optional[str] = None,
+        transform_cache_contours: bool = False,
+        reuse_panels: bool = False,
+        async_save: bool = False,
+        shared_field_store: Optional[SharedFieldStoreHandle] = None,
+):
+    """
+    Set up process-wide resources shared by jobs in current process, used as initializer of worker processes.
+
+    Parameters
+    ----------
+    field_cache_size
+        memory budget in bytes of field cache, field cache is disabled if None.
+    share_accumulated_fields
+        share accumulated field stores between jobs.
+    accumulated_field_store_size
+        memory budget in bytes of each accumulated field store, not limited if None.
+    map_feature_cache
+        reuse map features between jobs.
+    transform_cache
+        reuse projected grids and barb positions between jobs.
+    transform_cache_dir
+        directory to save projected grids and barb positions.
+    transform_cache_contours
+        plot contours on projected grids of transform cache.
+    reuse_panels
+        reuse figures between jobs.
+    async_save
+        write images in a background thread.
+    shared_field_store
+        handle of shared field store created by the task process, fields are loaded from it if set.
+    """
+    if field_cache_size is not None:
+        enable_field_cache(max_bytes=field_cache_size)
+    if shared_field_store is not None:
+        enable_shared_field_store(handle=shared_field_store)
+    if share_accumulated_fields:
+        enable_accumulated_field_stores(max_bytes=accumulated_field_store_size)
+    if map_feature_cache:
+        from cemc_plots_kit.map_cache import enable_map_feature_cache
+        enable_map_feature_cache()
+    if transform_cache:
+        from cemc_plots_kit.transform_cache import enable_transform_cache
+        enable_transform_cache(cache_dir=transform_cache_dir, contours=transform_cache_contours)
+    if reuse_panels:
+        from cemc_plots_kit.panel_pool import enable_panel_pool
+        enable_panel_pool()
+    if async_save:
+        enable_image_writer()
+
+
+def run_by_watch(
+        job_configs: list[JobConfig],
+        runtime_config: RuntimeConfig,
+        field_cache_size: Optional[int] = None,
+        shared_field_store_size: Optional[int] = None,
+        accumulated_field_store_size: Optional[int] = None,
+        max_worker_rss: Optional[int] = None,
+        on_job_result: Optional[Callable[[JobResult], None]] = None,
+) -> list[JobResult]:
+    """
+    Poll data files and run jobs as soon as all their data files are complete,
+    including files of previous forecast times for accumulated precipitation plots.
+    See ``DataFileWatcher`` for how a file is considered complete.
+
+    Ready jobs reading the same data file are run together,
+    and split into smaller groups if there are fewer groups than workers of ``parallel`` executor.
+    Jobs still waiting when ``watch_timeout`` in runtime config is reached are marked as failed.
+
+    With ``parallel`` executor, job groups run in worker processes of ``_RecycledWorkerPool``,
+    which are replaced according to ``max_jobs_per_worker`` in runtime config and ``max_worker_rss``.
+    With ``serial`` executor, jobs run in current process,
+    or in one worker process if ``max_jobs_per_worker`` or ``max_worker_rss`` is set.
+
+    Parameters
+    ----------
+    job_configs
+        job list, one item represents one job.
+    runtime_config
+        runtime configuration, ``executor`` and ``watch_*`` options are used.
+    field_cache_size
+        memory budget in bytes of field cache in each process, field cache is disabled if None.
+    shared_field_store_size
+        memory budget in bytes of shared field store used by worker processes of ``parallel`` executor,
+        disabled if None.
+    accumulated_field_store_size
+        memory budget in bytes of each accumulated field store, not limited if None.
+    max_worker_rss
+        replace a worker process if its resident set size in bytes is larger than this value after a job group.
+    on_job_result
+        called in current process when each job is finished.
+
+    Returns
+    -------
+    list[JobResult]
+        result list in the same order of ``job_configs``.
+    """
+    count = len(job_configs)
+    job_results: list[Optional[JobResult]] = [None] * count
+    job_input_files = [get_job_input_files(job_config) for job_config in job_configs]
+
+    watcher = DataFileWatcher(
+        stable_time=runtime_config.watch_stable_time,
+        marker_suffix=runtime_config.watch_marker_suffix,
+    )
+    watch_interval = runtime_config.watch_interval
+    watch_timeout = None
+    if runtime_config.watch_timeout is not None:
+        watch_timeout = pd.to_timedelta(runtime_config.watch_timeout)
+    watch_start_time = pd.Timestamp.now()
+
+    if runtime_config.executor not in ("parallel", "serial"):
+        raise ValueError(f"executor is not supported: {runtime_config.executor}")
+
+    shared_field_store_server = None
+    if runtime_config.executor == "parallel" and shared_field_store_size is not None:
+        shared_field_store_server = SharedFieldStoreServer(max_bytes=shared_field_store_size)
+    init_args = (
+        field_cache_size,
+        runtime_config.share_accumulated_fields,
+        accumulated_field_store_size,
+        runtime_config.map_feature_cache,
+        runtime_config.transform_cache,
+        runtime_config.transform_cache_dir,
+        runtime_config.transform_cache_contours,
+        runtime_config.reuse_panels,
+        runtime_config.async_save,
+        None if shared_field_store_server is None else shared_field_store_server.handle,
+    )
+    max_jobs_per_worker = runtime_config.max_jobs_per_worker
+    pool = None
+    if runtime_config.executor == "parallel":
+        max_workers = runtime_config.max_workers
+        if max_workers is None:
+            max_workers = os.cpu_count()
+    else:
+        max_workers = 1
+    if runtime_config.executor == "parallel" or max_jobs_per_worker is not None or max_worker_rss is not None:
+        pool = _RecycledWorkerPool(
+            job_configs=job_configs,
+            max_workers=max_workers,
+            init_args=init_args,
+            max_jobs_per_worker=max_jobs_per_worker,
+            max_worker_rss=max_worker_rss,
+        )
+    else:
+        init_job_process(*init_args)
+
+    def set_result(index: int, job_result: JobResult):
+        log_job_result(job_result=job_result, index=index, count=count)
+        job_results[index] = job_result
+        if on_job_result is not None:
+            on_job_result(job_result)
+
+    # pending job index -> data files which are not ready.
+    pending_files: dict[int, set[Path]] = {i: set(job_input_files[i]) for i in range(count)}
+    # data file which is not ready -> pending job indexes reading it.
+    file_jobs: dict[Path, set[int]] = dict()
+    for i in range(count):
+        for file_path in job_input_files[i]:
+            file_jobs.setdefault(file_path, set()).add(i)
+    try:
+        while len(pending_files) > 0 or (pool is not None and len(pool) > 0):
+            ready_indexes = []
+            for file_path in watcher.check(list(file_jobs.keys())):
+                for i in file_jobs.pop(file_path):
+                    missing_files = pending_files[i]
+                    missing_files.discard(file_path)
+                    if len(missing_files) == 0:
+                        del pending_files[i]
+                        ready_indexes.append(i)
+            ready_indexes.sort()
+            if len(ready_indexes) > 0:
+                task_logger.info(f"{len(ready_indexes)} jobs are ready, {len(pending_files)} jobs are waiting")
+
+            ready_groups: dict[Path, JobGroup] = dict()
+            for i in ready_indexes:
+                group = ready_groups.setdefault(job_input_files[i][0], JobGroup(input_file=job_input_files[i][0]))
+                group.job_indexes.append(i)
+                group.input_files.update(job_input_files[i])
+            job_groups = list(ready_groups.values())
+            if pool is not None:
+                job_groups = split_job_groups(job_groups, job_configs=job_configs, min_count=max_workers)
+            for group in job_groups:
+                job_indexes = group.job_indexes
+                if pool is None:
+                    group_results = run_jobs_with_result([job_configs[i] for i in job_indexes])
+                    for i, job_result in zip(job_indexes, group_results):
+                        set_result(i, job_result)
+                else:
+                    pool.submit(job_indexes)
+
+            if (
+                watch_timeout is not None
+                and len(pending_files) > 0
+                and pd.Timestamp.now() - watch_start_time > watch_timeout
+            ):
+                task_logger.error(f"watch timeout, {len(pending_files)} jobs are not ready")
+                for i in sorted(pending_files):
+                    missing_files = [str(f) for f in job_input_files[i] if f in pending_files[i]]
+                    set_result(i, JobResult(
+                        job_config=job_configs[i],
+                        error=f"data files are not ready before timeout: {missing_files}",
+                    ))
+                pending_files.clear()
+                file_jobs.clear()
+
+            if pool is not None and len(pool) > 0:
+                for job_indexes, group_results in pool.wait(timeout=watch_interval):
+                    for i, job_result in zip(job_indexes, group_results):
+                        set_result(i, job_result)
+            elif len(pending_files) > 0:
+                time.sleep(watch_interval)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            if shared_field_store_server is not None:
+                shared_field_store_server.close()
+        else:
+            set_field_cache(None)
+            disable_accumulated_field_stores()
+            close_mapped_files()
+            if runtime_config.transform_cache:
+                from cemc_plots_kit.transform_cache import disable_transform_cache
+                disable_transform_cache()
+            if runtime_config.reuse_panels:
+                from cemc_plots_kit.panel_pool import disable_panel_pool
+                disable_panel_pool()
+            if runtime_config.async_save:
+                disable_image_writer()
+
+    return job_results
+
+
+def get_job_order(count: int, job_groups: Optional[list[JobGroup]] = None) -> list[int]:
+    """
+    Return job indexes in execution order. Jobs are ordered group by group if ``job_groups`` is set.
+    """
+    if job_groups is None:
+        return list(range(count))
+    return [i for group in job_groups for i in group.job_indexes]
+
+
+def run_jobs_with_result(job_configs: list[JobConfig]) -> list[JobResult]:
+    """
+    Run plot jobs one by one in current process, used to run a job group in a worker process.
+    All images of the jobs are written when this function returns.
+    """
+    job_results = []
+    for job_config in job_configs:
+        job_result = run_job_with_result(job_config=job_config, wait_output=False)
+        if len(job_results) > 0:
+            wait_job_output(job_results[-1])
+        job_results.append(job_result)
+    if len(job_results) > 0:
+        wait_job_output(job_results[-1])
+    # don't keep file descriptors and mapped pages of data files used by the group, see ``max_worker_rss``.
+    close_mapped_files()
+    return job_results
+
+
+def run_job_with_result(job_config: JobConfig, wait_output: bool = True) -> JobResult:
+    """
+    Run a plot job and catch any exception into ``JobResult``.
+
+    Parameters
+    ----------
+    job_config
+        job configuration which represents a single plot job.
+    wait_output
+        if False and image writer is enabled, return before images are written,
+        and call ``wait_job_output`` later to check the images.
+
+    Returns
+    -------
+    JobResult
+    """
+    field_cache = get_field_cache()
+    if field_cache is not None:
+        previous_cache_stats = field_cache.stats
+
+    from cemc_plots_kit.job import run_job
+
+    job_timer = JobTimer()
+    set_job_timer(job_timer)
+    reset_peak_rss()
+    job_start_time = pd.Timestamp.now()
+    try:
+        output_image_files = run_job(job_config=job_config)
+        error = None
+    except Exception:
+        output_image_files = []
+        error = traceback.format_exc()
+    job_end_time = pd.Timestamp.now()
+    set_job_timer(None)
+    release_shared_fields()
+
+    job_result = JobResult(
+        job_config=job_config,
+        output_image_files=output_image_files,
+        error=error,
+        elapsed_time=job_end_time - job_start_time,
+        stage_times=job_timer.stages,
+        field_times=job_timer.fields,
+        rss=get_rss(),
+        peak_rss=get_peak_rss(),
+    )
+    if field_cache is not None:
+        cache_stats = field_cache.stats
+        job_result.field_cache_hits = cache_stats.hits - previous_cache_stats.hits
+        job_result.field_cache_misses = cache_stats.misses - previous_cache_stats.misses
+    if wait_output:
+        job_result = wait_job_output(job_result)
+    return job_result
+
+
+def wait_job_output(job_result: JobResult) -> JobResult:
+    """
+    Wait until images of the job submitted to image writer are written.
+    The job is marked as failed if any image can't be written.
+    """
+    image_writer = get_image_writer()
+    if image_writer is None or not job_result.succeeded:
+        return job_result
+    exception = image_writer.wait(job_result.output_image_files)
+    if exception is not None:
+        job_result.output_image_files = []
+        job_result.error = "".join(traceback.format_exception(type(exception), exception, exception.__traceback__))
+    return job_result
+
+
+def log_timing_summary(job_results: list[JobResult]):
+    """
+    Log p50/p95/max time of each stage for each plot type, using succeeded jobs.
+    """
+    records = [r.to_timing_record() for r in job_results if r.succeeded and r.elapsed_time is not None]
+    if len(records) == 0:
+        return
+    summary = summarize_stage_times(records)
+    lines = [f"{'plot':<24}{'stage':<10}{'count':>6}{'p50 (s)':>10}{'p95 (s)':>10}{'max (s)':>10}"]
+    for plot_name, stage_summary in summary.items():
+        for stage in JOB_STAGES + ["total"]:
+            if stage not in stage_summary:
+                continue
+            item = stage_summary[stage]
+            lines.append(f"{plot_name:<24}{stage:<10}{item['count']:>6}"
+                         f"{item['p50']:>10.3f}{item['p95']:>10.3f}{item['max']:>10.3f}")
+    task_logger.info("stage times:\n" + "\n".join(lines))
+
+
+def log_job_result(job_result: JobResult, index: int, count: int):
+    if job_result.succeeded:
+        memory_info = ""
+        if job_result.rss is not None:
+            memory_info = f", rss: {format_size(job_result.rss)}, peak rss: {format_size(job_result.peak_rss)}"
+        task_logger.info(f"job {index+1}/{count} done. time: {job_result.elapsed_time}{memory_info}")
+    else:
+        task_logger.error(f"job {index+1}/{count} failed. "
+                          f"[{job_result.job_config.plot_config.plot_name}] "
+                          f"[{job_result.job_config.time_config.start_time}] "
+                          f"[{job_result.job_config.time_config.forecast_time}]\n"
+                          f"{job_result.error}")
@@ -0,0 +1,128 @@
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Optional, Union, Iterator
+import json
+import threading
+import time
+
+import numpy as np
+
+
+# stages of a plot job, by running order.
+JOB_STAGES = ["setup", "import", "load", "decimate", "plot", "save", "cleanup"]
+
+
+class JobTimer:
+    """
+    Record time of each stage in a plot job. Time of stages with the same name is summed,
+    such as ``plot`` and ``save`` for several areas.
+    Stages of one job may be recorded in different threads, such as writing images in background.
+
+    Attributes
+    ----------
+    stages
+        seconds of each stage.
+    fields
+        seconds of loading each field from data files, part of ``load`` stage.
+    """
+    def __init__(self):
+        self.stages: dict[str, float] = dict()
+        self.fields: dict[str, float] = dict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start_time)
+
+    def add_stage(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_field(self, name: str, seconds: float):
+        with self._lock:
+            self.fields[name] = self.fields.get(name, 0.0) + seconds
+
+
+_local = threading.local()
+
+
+def set_job_timer(job_timer: Optional[JobTimer]):
+    """
+    Set timer for the job running in current thread. Use None to stop recording.
+    """
+    _local.job_timer = job_timer
+
+
+def get_job_timer() -> Optional[JobTimer]:
+    return getattr(_local, "job_timer", None)
+
+
+@contextmanager
+def timing_stage(name: str) -> Iterator[None]:
+    """
+    Record time of a stage in timer of current job, do nothing if no timer is set.
+    """
+    job_timer = get_job_timer()
+    if job_timer is None:
+        yield
+        return
+    with job_timer.stage(name):
+        yield
+
+
+def record_field_time(name: str, seconds: float):
+    """
+    Record time of loading a field in timer of current job, do nothing if no timer is set.
+    """
+    job_timer = get_job_timer()
+    if job_timer is not None:
+        job_timer.add_field(name, seconds)
+
+
+def write_timing_record(file_path: Union[str, Path], record: dict):
+    """
+    Append a record to timing file as one JSON line.
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def summarize_stage_times(records: list[dict]) -> dict[str, dict[str, dict[str, float]]]:
+    """
+    Summarize stage times by plot type.
+
+    Parameters
+    ----------
+    records
+        timing records, each one has keys ``plot_name``, ``elapsed_time`` and ``stages``.
+
+    Returns
+    -------
+    dict
+        ``{plot_name: {stage: {"count", "p50", "p95", "max"}}}``, stage ``total`` is the elapsed time of jobs.
+    """
+    stage_times: dict[str, dict[str, list[float]]] = dict()
+    for record in records:
+        plot_times = stage_times.setdefault(record["plot_name"], dict())
+        plot_times.setdefault("total", []).append(record["elapsed_time"])
+        for stage, seconds in record["stages"].items():
+            plot_times.setdefault(stage, []).append(seconds)
+
+    summary = dict()
+    for plot_name, plot_times in stage_times.items():
+        summary[plot_name] = {
+            stage: {
+                "count": len(values),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "max": float(np.max(values)),
+            }
+            for stage, values in plot_times.items()
+        }
+    return summary
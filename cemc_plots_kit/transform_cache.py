@@ -0,0 +1,482 @@
+"""
+Cache projected grid coordinates and barb sample positions in current process and on disk.
+
+Fields of one system share the same latitude-longitude grid, and figures of one area share the same map,
+but cartopy transforms data for every figure:
+
+* barbs with ``regrid_shape``: all grid points are projected, and wind is interpolated to a regular grid of barbs
+  in map projection by triangulating all grid points (``cartopy.vector_transform.vector_scalar_to_grid``).
+* contour and filled contour: contour paths are projected from data projection to map projection.
+
+``TransformCache`` computes these transforms once for each grid, projections and map extent:
+
+* barb samples: barb positions in map projection, and vertices and weights of linear interpolation
+  in the triangulation of the grid, so each figure only interpolates wind at barb positions.
+  Interpolated wind is the same as cartopy.
+* projected grid: grid coordinates in map projection, so contours are computed in map projection
+  and not projected again. Only used if data projection is different from map projection,
+  and only if enabled by ``contours`` option, because contour lines are slightly different.
+
+Cached items are kept in memory of current process, and saved as ``.npz`` files if ``cache_dir`` is set,
+so later tasks reuse them.
+
+Use ``enable_transform_cache`` to let cedarkit layers use the cache, and ``disable_transform_cache`` to restore them.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union, Hashable
+import hashlib
+import os
+import threading
+
+import numpy as np
+import xarray as xr
+import matplotlib.axes
+import cartopy.crs as ccrs
+
+from cemc_plots_kit.logger import get_logger
+
+
+transform_cache_logger = get_logger(__name__)
+
+
+@dataclass
+class BarbSamples:
+    """
+    Barb positions in map projection and interpolation weights from a latitude-longitude grid.
+
+    Weights are barycentric coordinates in triangles of the Delaunay triangulation of all grid points,
+    the same as linear interpolation of ``scipy.interpolate.griddata`` used by cartopy to regrid barbs.
+
+    Attributes
+    ----------
+    x
+        x coordinates of barbs in map projection, 1D array.
+    y
+        y coordinates of barbs in map projection, 1D array.
+    longitudes
+        longitude of each barb, 2D array with shape (len(y), len(x)).
+    latitudes
+        latitude of each barb, 2D array with shape (len(y), len(x)).
+    indexes
+        flat indexes of 3 vertices of the triangle containing each barb, shape (3, len(y), len(x)).
+    weights
+        barycentric weights of 3 vertices, shape (3, len(y), len(x)). NaN for barbs outside the grid.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    longitudes: np.ndarray
+    latitudes: np.ndarray
+    indexes: np.ndarray
+    weights: np.ndarray
+
+    def interpolate(self, values: np.ndarray) -> np.ndarray:
+        """
+        Interpolate values of the 2D grid (latitude, longitude) to barb positions.
+        """
+        flat_values = np.asarray(values).ravel()
+        weighted_values = flat_values[self.indexes] * self.weights
+        return weighted_values[0] + weighted_values[1] + weighted_values[2]
+
+
+def get_grid_coordinates(field: xr.DataArray) -> Optional[tuple[np.ndarray, np.ndarray]]:
+    """
+    Return longitude and latitude coordinates of a 2D field with ``latitude`` and ``longitude`` dimensions,
+    None for other fields.
+    """
+    if field.dims != ("latitude", "longitude"):
+        return None
+    longitudes = np.asarray(field["longitude"].values, dtype=np.float64)
+    latitudes = np.asarray(field["latitude"].values, dtype=np.float64)
+    if len(longitudes) < 2 or len(latitudes) < 2:
+        return None
+    return longitudes, latitudes
+
+
+def get_grid_key(longitudes: np.ndarray, latitudes: np.ndarray) -> str:
+    """
+    Return key of a latitude-longitude grid. Exact coordinates are used,
+    because triangulation of regular grids depends on the last bits of coordinates.
+    """
+    digest = hashlib.sha1()
+    for values in (longitudes, latitudes):
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+def get_crs_key(crs: ccrs.CRS) -> str:
+    return crs.proj4_init
+
+
+def get_regrid_shape(regrid_shape, target_extent) -> tuple[int, int]:
+    """
+    Return (nx, ny) of barb grid, the same as ``GeoAxes._regrid_shape_aspect`` in cartopy.
+    """
+    if isinstance(regrid_shape, (tuple, list)):
+        return int(regrid_shape[0]), int(regrid_shape[1])
+    target_size = int(regrid_shape)
+    x_range, y_range = np.diff(target_extent)[::2]
+    desired_aspect = x_range / y_range
+    if x_range >= y_range:
+        return int(target_size * desired_aspect), target_size
+    else:
+        return target_size, int(target_size / desired_aspect)
+
+
+def compute_barb_samples(
+        longitudes: np.ndarray,
+        latitudes: np.ndarray,
+        src_crs: ccrs.CRS,
+        target_crs: ccrs.CRS,
+        target_extent: tuple[float, float, float, float],
+        regrid_shape,
+) -> BarbSamples:
+    """
+    Compute barb positions on a regular grid of ``target_extent`` in ``target_crs``,
+    and linear interpolation weights from the latitude-longitude grid.
+
+    Steps are the same as ``cartopy.vector_transform.vector_scalar_to_grid``:
+    barb positions are transformed back to ``src_crs``, and grid points and barb positions are scaled
+    by the range of barb positions before triangulation, so interpolated values are the same as cartopy.
+    """
+    # scipy is required by cartopy to regrid vectors.
+    from scipy.spatial import Delaunay
+
+    nx, ny = get_regrid_shape(regrid_shape, target_extent)
+    x0, x1, y0, y1 = target_extent
+    unit_x, unit_y = np.meshgrid(np.linspace(0, 1, nx), np.linspace(0, 1, ny))
+    grid_x = unit_x * (x1 - x0) + x0
+    grid_y = unit_y * (y1 - y0) + y0
+    point_x, point_y = np.meshgrid(longitudes, latitudes)
+
+    if get_crs_key(src_crs) == get_crs_key(target_crs):
+        sample_longitudes, sample_latitudes = grid_x, grid_y
+        sample_x, sample_y = unit_x, unit_y
+        source_x0, source_x1, source_y0, source_y1 = x0, x1, y0, y1
+    else:
+        points = src_crs.transform_points(target_crs, grid_x, grid_y)
+        sample_longitudes, sample_latitudes = points[..., 0], points[..., 1]
+        finite_longitudes = sample_longitudes[np.isfinite(sample_longitudes)]
+        finite_latitudes = sample_latitudes[np.isfinite(sample_latitudes)]
+        source_x0, source_x1 = finite_longitudes.min(), finite_longitudes.max()
+        source_y0, source_y1 = finite_latitudes.min(), finite_latitudes.max()
+        sample_x = (sample_longitudes - source_x0) / (source_x1 - source_x0)
+        sample_y = (sample_latitudes - source_y0) / (source_y1 - source_y0)
+        # cartopy transforms grid points to src_crs itself, which may wrap longitudes.
+        points = src_crs.transform_points(src_crs, point_x, point_y)
+        point_x, point_y = points[..., 0], points[..., 1]
+
+    triangulation = Delaunay(np.column_stack([
+        (point_x.ravel() - source_x0) / (source_x1 - source_x0),
+        (point_y.ravel() - source_y0) / (source_y1 - source_y0),
+    ]))
+    sample_points = np.column_stack([sample_x.ravel(), sample_y.ravel()])
+    simplex = triangulation.find_simplex(sample_points)
+    outside = simplex < 0
+    simplex = np.where(outside, 0, simplex)
+    # barycentric coordinates, in the same order of operations as ``scipy.interpolate.LinearNDInterpolator``.
+    transform = triangulation.transform[simplex]
+    offset_x = sample_points[:, 0] - transform[:, 2, 0]
+    offset_y = sample_points[:, 1] - transform[:, 2, 1]
+    weight_0 = transform[:, 0, 0] * offset_x + transform[:, 0, 1] * offset_y
+    weight_1 = transform[:, 1, 0] * offset_x + transform[:, 1, 1] * offset_y
+    weights = np.column_stack([weight_0, weight_1, 1.0 - weight_0 - weight_1])
+    weights[outside] = np.nan
+    indexes = triangulation.simplices[simplex].astype(np.int64)
+    indexes[outside] = 0
+
+    return BarbSamples(
+        x=grid_x[0],
+        y=grid_y[:, 0],
+        longitudes=sample_longitudes,
+        latitudes=sample_latitudes,
+        indexes=indexes.T.reshape(3, ny, nx),
+        weights=weights.T.reshape(3, ny, nx),
+    )
+
+
+def compute_projected_grid(
+        longitudes: np.ndarray,
+        latitudes: np.ndarray,
+        src_crs: ccrs.CRS,
+        target_crs: ccrs.CRS,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return 2D x and y coordinates of the latitude-longitude grid in ``target_crs``, as float32 arrays.
+    """
+    grid_longitudes, grid_latitudes = np.meshgrid(longitudes, latitudes)
+    points = target_crs.transform_points(src_crs, grid_longitudes, grid_latitudes)
+    return points[..., 0].astype(np.float32), points[..., 1].astype(np.float32)
+
+
+class TransformCache:
+    """
+    Cache of barb samples and projected grids in current process, optionally saved in a directory.
+
+    Attributes
+    ----------
+    cache_dir
+        directory to save cached items as ``.npz`` files, not saved if None.
+    max_items
+        max number of items kept in memory, earliest items are dropped first.
+    """
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None, max_items: int = 64):
+        # jobs change working directory, so relative directory is resolved when the cache is created.
+        self.cache_dir = None if cache_dir is None else Path(cache_dir).absolute()
+        self.max_items = max_items
+        self._items: dict[str, dict[str, np.ndarray]] = dict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_barb_samples(
+            self,
+            longitudes: np.ndarray,
+            latitudes: np.ndarray,
+            src_crs: ccrs.CRS,
+            target_crs: ccrs.CRS,
+            target_extent: tuple[float, float, float, float],
+            regrid_shape,
+    ) -> BarbSamples:
+        target_extent = tuple(float(v) for v in target_extent)
+        key = (
+            "barb", get_grid_key(longitudes, latitudes), get_crs_key(src_crs), get_crs_key(target_crs),
+            target_extent, repr(regrid_shape),
+        )
+
+        def compute():
+            samples = compute_barb_samples(longitudes, latitudes, src_crs, target_crs, target_extent, regrid_shape)
+            return vars(samples)
+
+        return BarbSamples(**self._get(key, compute))
+
+    def get_projected_grid(
+            self,
+            longitudes: np.ndarray,
+            latitudes: np.ndarray,
+            src_crs: ccrs.CRS,
+            target_crs: ccrs.CRS,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        key = ("grid", get_grid_key(longitudes, latitudes), get_crs_key(src_crs), get_crs_key(target_crs))
+
+        def compute():
+            x, y = compute_projected_grid(longitudes, latitudes, src_crs, target_crs)
+            return dict(x=x, y=y)
+
+        item = self._get(key, compute)
+        return item["x"], item["y"]
+
+    def clear(self):
+        """
+        Drop all items in memory. Files in ``cache_dir`` are kept.
+        """
+        with self._lock:
+            self._items.clear()
+
+    def _get(self, key: Hashable, compute) -> dict[str, np.ndarray]:
+        name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        with self._lock:
+            item = self._items.get(name, None)
+            if item is not None:
+                self.hits += 1
+                return item
+            self.misses += 1
+
+        item = self._load(name)
+        if item is None:
+            item = compute()
+            self._save(name, item)
+        with self._lock:
+            if len(self._items) >= self.max_items:
+                del self._items[next(iter(self._items))]
+            item = self._items.setdefault(name, item)
+        return item
+
+    def _get_file_path(self, name: str) -> Path:
+        return Path(self.cache_dir, f"{name}.npz")
+
+    def _load(self, name: str) -> Optional[dict[str, np.ndarray]]:
+        if self.cache_dir is None:
+            return None
+        file_path = self._get_file_path(name)
+        if not file_path.exists():
+            return None
+        try:
+            with np.load(file_path) as data:
+                return {k: data[k] for k in data.files}
+        except (OSError, ValueError) as e:
+            transform_cache_logger.warning(f"failed to load transform cache file {file_path}: {e}")
+            return None
+
+    def _save(self, name: str, item: dict[str, np.ndarray]):
+        if self.cache_dir is None:
+            return
+        file_path = self._get_file_path(name)
+        temp_file_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(temp_file_path, "wb") as f:
+                np.savez(f, **item)
+            os.replace(temp_file_path, file_path)
+        except OSError as e:
+            transform_cache_logger.warning(f"failed to save transform cache file {file_path}: {e}")
+            temp_file_path.unlink(missing_ok=True)
+
+
+def add_barb(
+        ax,
+        x_field: xr.DataArray,
+        y_field: xr.DataArray,
+        projection: Optional[ccrs.Projection] = None,
+        length: float = 4,
+        linewidth: float = 0.5,
+        pivot: str = "middle",
+        barbcolor: str = "red",
+        flagcolor: str = "red",
+        barb_increments: Optional[dict] = None,
+        **kwargs
+):
+    """
+    Replacement of ``add_barb`` in cedarkit layers, interpolating wind to barb positions using cached samples.
+    Use original function if transform cache is not enabled or the field is not on a latitude-longitude grid.
+    Default styles are the same as ``cedarkit.maps.graph.add_barb``.
+    """
+    style_kwargs = dict(
+        length=length,
+        linewidth=linewidth,
+        pivot=pivot,
+        barbcolor=barbcolor,
+        flagcolor=flagcolor,
+        barb_increments=barb_increments,
+    )
+    regrid_shape = kwargs.get("regrid_shape", None)
+    grid = get_grid_coordinates(x_field)
+    target_crs = getattr(ax, "projection", None)
+    if (
+            _transform_cache is None or regrid_shape is None or projection is None
+            or grid is None or target_crs is None or x_field.shape != y_field.shape
+    ):
+        return _base_functions["add_barb"](ax, x_field, y_field, projection=projection, **style_kwargs, **kwargs)
+
+    kwargs.pop("regrid_shape")
+    target_extent = kwargs.pop("target_extent", ax.get_extent(target_crs))
+    samples = _transform_cache.get_barb_samples(*grid, projection, target_crs, target_extent, regrid_shape)
+    u = samples.interpolate(x_field.values)
+    v = samples.interpolate(y_field.values)
+    if get_crs_key(projection) != get_crs_key(target_crs):
+        u, v = target_crs.transform_vectors(projection, samples.longitudes, samples.latitudes, u, v)
+
+    # barbs are on a regular grid in map projection and plotted in native coordinates,
+    # the same as ``GeoAxes.barbs`` after regridding.
+    x, y = np.meshgrid(samples.x, samples.y)
+    return matplotlib.axes.Axes.barbs(ax, x, y, u, v, **style_kwargs, **kwargs)
+
+
+def _add_projected_contour(function_name: str, ax, field: xr.DataArray, *args, projection=None, **kwargs):
+    grid = get_grid_coordinates(field)
+    target_crs = getattr(ax, "projection", None)
+    base_function = _base_functions[function_name]
+    if (
+            _transform_cache is None or not _transform_contours or projection is None or grid is None or target_crs is None
+            or get_crs_key(projection) == get_crs_key(target_crs) or "x" in kwargs or "y" in kwargs
+    ):
+        return base_function(ax, field, *args, projection=projection, **kwargs)
+
+    x, y = _transform_cache.get_projected_grid(*grid, projection, target_crs)
+    if not (np.isfinite(x).all() and np.isfinite(y).all()):
+        # some grid points are outside the map projection.
+        return base_function(ax, field, *args, projection=projection, **kwargs)
+    projected_field = field.assign_coords(
+        projected_x=(("latitude", "longitude"), x),
+        projected_y=(("latitude", "longitude"), y),
+    )
+    return base_function(ax, projected_field, *args, projection=target_crs, x="projected_x", y="projected_y", **kwargs)
+
+
+def add_contourf(ax, field: xr.DataArray, *args, **kwargs):
+    """
+    Replacement of ``add_contourf`` in cedarkit layers, plotting in map projection using cached projected grid.
+    """
+    return _add_projected_contour("add_contourf", ax, field, *args, **kwargs)
+
+
+def add_contour(ax, field: xr.DataArray, *args, **kwargs):
+    """
+    Replacement of ``add_contour`` in cedarkit layers, plotting in map projection using cached projected grid.
+    """
+    return _add_projected_contour("add_contour", ax, field, *args, **kwargs)
+
+
+_transform_cache: Optional[TransformCache] = None
+_transform_contours: bool = False
+_base_functions: dict = dict()
+
+
+def enable_transform_cache(cache_dir: Optional[Union[str, Path]] = None, contours: bool = False):
+    """
+    Cache transforms in current process, and let cedarkit layers use the cache.
+    Called in initializer of processes running jobs, see ``cemc_plots_kit.task.init_job_process``.
+
+    Parameters
+    ----------
+    cache_dir
+        directory to save cached items, only kept in memory if None.
+    contours
+        if True, contours are also plotted on cached projected grids when data projection is different from
+        map projection. Contour lines are computed in map projection instead of being projected from data projection,
+        so they are slightly different.
+    """
+    global _transform_cache, _transform_contours
+    _transform_cache = TransformCache(cache_dir=cache_dir)
+    _transform_contours = contours
+    install_transform_cache(contours=contours)
+
+
+def disable_transform_cache():
+    """
+    Drop transform cache of current process, and restore original functions of cedarkit layers.
+    """
+    global _transform_cache, _transform_contours
+    _transform_cache = None
+    _transform_contours = False
+    uninstall_transform_cache()
+
+
+def get_transform_cache() -> Optional[TransformCache]:
+    return _transform_cache
+
+
+def install_transform_cache(contours: bool = False):
+    """
+    Replace ``add_barb`` used by ``cedarkit.maps.chart.layer`` with function in this module,
+    and also ``add_contourf`` and ``add_contour`` if ``contours`` is True.
+    Original functions are restored by ``uninstall_transform_cache``.
+    """
+    from cedarkit.maps.chart import layer
+
+    replacements = {
+        "add_barb": add_barb,
+    }
+    if contours:
+        replacements.update({
+            "add_contourf": add_contourf,
+            "add_contour": add_contour,
+        })
+    for name, function in replacements.items():
+        current_function = getattr(layer, name, None)
+        if current_function is None or current_function is function:
+            continue
+        _base_functions[name] = current_function
+        setattr(layer, name, function)
+
+
+def uninstall_transform_cache():
+    """
+    Restore functions of ``cedarkit.maps.chart.layer`` replaced by ``install_transform_cache``.
+    """
+    from cedarkit.maps.chart import layer
+
+    for name, function in list(_base_functions.items()):
+        setattr(layer, name, function)
+        del _base_functions[name]
@@ -0,0 +1,75 @@
+from pathlib import Path
+from typing import Optional, Iterable
+import os
+import time
+
+from cemc_plots_kit.logger import get_logger
+
+
+watch_logger = get_logger(__name__)
+
+
+class DataFileWatcher:
+    """
+    Check whether data files written by the model are complete, by polling file status.
+
+    A file is complete if:
+
+    * marker file ``{file_path}{marker_suffix}`` exists, when ``marker_suffix`` is set.
+    * or size and modification time of the file have not changed for ``stable_time`` seconds.
+
+    Complete files are remembered and not checked again.
+
+    Attributes
+    ----------
+    stable_time
+        seconds that file status should stay unchanged.
+    marker_suffix
+        suffix of marker file written after the data file is complete, such as ``.ok``.
+    """
+    def __init__(self, stable_time: float = 30, marker_suffix: Optional[str] = None):
+        self.stable_time = stable_time
+        self.marker_suffix = marker_suffix
+        self._ready_files: set[Path] = set()
+        # file path -> (size, mtime, time when the status is first seen)
+        self._file_status: dict[Path, tuple[int, float, float]] = dict()
+
+    def is_ready(self, file_path: Path) -> bool:
+        """
+        Check whether a file is complete.
+        """
+        file_path = Path(file_path)
+        if file_path in self._ready_files:
+            return True
+
+        if self.marker_suffix is not None:
+            if Path(f"{file_path}{self.marker_suffix}").exists():
+                self._set_ready(file_path)
+                return True
+            return False
+
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return False
+
+        now = time.monotonic()
+        status = self._file_status.get(file_path, None)
+        if status is None or status[0] != stat.st_size or status[1] != stat.st_mtime:
+            self._file_status[file_path] = (stat.st_size, stat.st_mtime, now)
+            return False
+        if stat.st_size > 0 and now - status[2] >= self.stable_time:
+            self._set_ready(file_path)
+            return True
+        return False
+
+    def check(self, file_paths: Iterable[Path]) -> set[Path]:
+        """
+        Return complete files in ``file_paths``.
+        """
+        return set(f for f in file_paths if self.is_ready(f))
+
+    def _set_ready(self, file_path: Path):
+        watch_logger.info(f"data file is ready: {file_path}")
+        self._ready_files.add(file_path)
+        self._file_status.pop(file_path, None)
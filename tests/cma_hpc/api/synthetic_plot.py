@@ -0,0 +1,100 @@
+"""
+A small plot module without cedar_graph, used to test executors.
+
+``load`` records id of the process running the job in ``{data_dir}/pids/{forecast_hour}``,
+and raises error for forecast hours in ``LOAD_ERROR_HOURS``.
+``render_plot`` creates a figure, and raises error after the figure is created for forecast hours in ``PLOT_ERROR_HOURS``.
+"""
+from datetime import timedelta
+from pathlib import Path
+import os
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from cemc_plots_kit.config import ExprConfig, TimeConfig, RuntimeConfig, PlotConfig, JobConfig
+from cemc_plots_kit.registry import PlotInfo
+
+
+matplotlib.use("Agg")
+
+PLOT_NAME = "synthetic_plot"
+PLOT_INFO = PlotInfo(name=PLOT_NAME, description="synthetic plot for tests", module=__name__)
+# the same plot reading data files of forecast time and 6 hours before, like accumulated precipitation plots.
+ACCUMULATED_PLOT_INFO = PlotInfo(
+    name="synthetic_accumulated_plot",
+    description="synthetic accumulated plot for tests",
+    module=__name__,
+    accumulation_interval=timedelta(hours=6),
+)
+
+LOAD_ERROR_HOURS: set[int] = set()
+PLOT_ERROR_HOURS: set[int] = set()
+
+
+class Panel:
+    def __init__(self, fig):
+        self.fig = fig
+
+    def save(self, output_image_file_path):
+        self.fig.savefig(output_image_file_path)
+
+
+def get_forecast_hour(time_config: TimeConfig) -> int:
+    return int(time_config.forecast_time / pd.Timedelta(hours=1))
+
+
+def load(expr_config: ExprConfig, time_config: TimeConfig) -> np.ndarray:
+    forecast_hour = get_forecast_hour(time_config)
+    pid_dir = Path(expr_config.data_dir, "pids")
+    pid_dir.mkdir(exist_ok=True)
+    Path(pid_dir, f"{forecast_hour}").write_text(f"{os.getpid()}")
+    if forecast_hour in LOAD_ERROR_HOURS:
+        raise IOError(f"data is not found: {forecast_hour}")
+    return np.random.default_rng(forecast_hour).random((20, 20))
+
+
+def render_plot(job_config: JobConfig, plot_data: np.ndarray, area_range=None, area_name=None) -> Panel:
+    fig = plt.figure(figsize=(2, 2), dpi=50)
+    if get_forecast_hour(job_config.time_config) in PLOT_ERROR_HOURS:
+        raise RuntimeError("plot failed")
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.imshow(plot_data)
+    return Panel(fig)
+
+
+def get_worker_pids(data_dir: Path) -> dict[int, int]:
+    """
+    Return process id of each forecast hour recorded by ``load``.
+    """
+    return {int(f.name): int(f.read_text()) for f in Path(data_dir, "pids").iterdir()}
+
+
+def create_job_configs(tmp_path: Path, forecast_hours, plot_name: str = PLOT_NAME, **kwargs) -> list[JobConfig]:
+    """
+    Create jobs of the synthetic plot, ``kwargs`` are passed to ``RuntimeConfig``.
+    """
+    expr_config = ExprConfig(
+        system_name="CMA-GFS",
+        data_dir=str(tmp_path / "data"),
+        data_file_name_template="data.{forecast_hour_label}.grb2",
+    )
+    Path(expr_config.data_dir).mkdir(exist_ok=True, parents=True)
+    runtime_config = RuntimeConfig(
+        work_dir=str(tmp_path / "work"),
+        output_dir=str(tmp_path / "output"),
+        manifest_file=str(tmp_path / "manifest.jsonl"),
+        group_jobs_by_file=False,
+        **kwargs,
+    )
+    return [
+        JobConfig(
+            expr_config=expr_config,
+            time_config=TimeConfig(start_time=pd.Timestamp("2024-11-13 00:00"), forecast_time=pd.Timedelta(hours=hour)),
+            runtime_config=runtime_config,
+            plot_config=PlotConfig(plot_name=plot_name),
+        )
+        for hour in forecast_hours
+    ]
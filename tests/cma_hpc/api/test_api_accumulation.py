@@ -0,0 +1,145 @@
+from pathlib import Path
+import sys
+
+import pandas as pd
+import xarray as xr
+
+from cedar_graph.data import DataLoader
+from cedar_graph.data.field_info import apcp_info, asnow_info, t_2m_info
+
+from cemc_plots_kit.config import ExprConfig, TimeConfig
+from cemc_plots_kit.source import (
+    ExprLocalDataSource, AccumulatedFieldStore, AccumulatedDataSource,
+    enable_accumulated_field_stores, disable_accumulated_field_stores, get_accumulated_data_source,
+)
+
+sys.path.insert(0, str(Path(__file__).parents[3] / "benchmarks"))
+from synthetic_data import GridSpec, generate_file
+
+
+GRID_SPEC = GridSpec(100, 120, 45, 25, 0.5)
+START_TIME = pd.Timestamp("2024-11-13 00:00")
+FORECAST_TIMES = pd.timedelta_range("0h", "36h", freq="3h")
+
+
+def create_expr_config(data_dir: Path) -> ExprConfig:
+    for forecast_time in FORECAST_TIMES:
+        forecast_hour = int(forecast_time / pd.Timedelta(hours=1))
+        generate_file(
+            data_dir / f"data.{forecast_hour:03d}.grb2",
+            grid_spec=GRID_SPEC,
+            start_time=START_TIME,
+            forecast_time=forecast_time,
+        )
+    return ExprConfig(
+        system_name="CMA-MESO",
+        data_dir=str(data_dir),
+        data_file_name_template="data.{forecast_hour_label}.grb2",
+    )
+
+
+def load_accumulation(data_source, field_info, forecast_time: pd.Timedelta, interval: pd.Timedelta) -> xr.DataArray:
+    """
+    Accumulation loaded as ``load_data`` in cedar_graph, the difference of fields at two forecast times.
+    """
+    data_loader = DataLoader(data_source=data_source)
+    field = data_loader.load(field_info, start_time=START_TIME, forecast_time=forecast_time)
+    previous_field = data_loader.load(field_info, start_time=START_TIME, forecast_time=forecast_time - interval)
+    return field - previous_field
+
+
+def test_accumulations_match_loaded_fields(tmp_path):
+    expr_config = create_expr_config(tmp_path)
+    data_source = ExprLocalDataSource(expr_config=expr_config)
+    field_bytes = data_source.retrieve(apcp_info, start_time=START_TIME, forecast_time=FORECAST_TIMES[0]).nbytes
+
+    # budget of 5 fields is smaller than fields in the longest interval, so forecast times are dropped and reloaded.
+    for max_bytes in (None, 5 * field_bytes):
+        store = AccumulatedFieldStore(
+            data_source=data_source, field_info=apcp_info, start_time=START_TIME, max_bytes=max_bytes,
+        )
+        for interval in ("3h", "6h", "12h", "24h"):
+            interval = pd.Timedelta(interval)
+            forecast_times = [t for t in FORECAST_TIMES if t >= interval]
+            for forecast_time in forecast_times:
+                expected_field = load_accumulation(data_source, apcp_info, forecast_time, interval)
+                xr.testing.assert_identical(
+                    store.get_accumulation(forecast_time=forecast_time, interval=interval),
+                    expected_field,
+                )
+            if max_bytes is not None:
+                assert store.nbytes <= max_bytes
+
+        if max_bytes is None:
+            assert store.loads == len(FORECAST_TIMES)
+            assert store.evictions == 0
+        else:
+            assert store.evictions > 0
+            assert store.loads - store.evictions == len(store.forecast_times) == 5
+
+        # all forecast times used by one call are kept, even if the budget is exceeded.
+        interval = pd.Timedelta(hours=3)
+        forecast_times = FORECAST_TIMES[1:]
+        fields = store.get_accumulations(forecast_times=forecast_times, interval=interval)
+        for forecast_time, field in zip(forecast_times, fields.transpose("forecast_time", ...)):
+            expected_field = load_accumulation(data_source, apcp_info, forecast_time, interval)
+            xr.testing.assert_equal(
+                field.drop_vars("forecast_time"),
+                expected_field.drop_vars([name for name in expected_field.coords if name not in expected_field.dims]),
+            )
+
+
+def test_accumulated_data_source(tmp_path):
+    expr_config = create_expr_config(tmp_path)
+    data_source = ExprLocalDataSource(expr_config=expr_config)
+    stores = [
+        AccumulatedFieldStore(data_source=data_source, field_info=field_info, start_time=START_TIME)
+        for field_info in (apcp_info, asnow_info)
+    ]
+    accumulated_data_source = AccumulatedDataSource(data_source=data_source, stores=stores)
+
+    forecast_time = pd.Timedelta(hours=24)
+    interval = pd.Timedelta(hours=24)
+    for field_info in (apcp_info, asnow_info):
+        xr.testing.assert_identical(
+            load_accumulation(accumulated_data_source, field_info, forecast_time, interval),
+            load_accumulation(data_source, field_info, forecast_time, interval),
+        )
+    # other fields are loaded from wrapped data source.
+    xr.testing.assert_identical(
+        accumulated_data_source.retrieve(t_2m_info, start_time=START_TIME, forecast_time=forecast_time),
+        data_source.retrieve(t_2m_info, start_time=START_TIME, forecast_time=forecast_time),
+    )
+    assert [store.forecast_times for store in stores] == [[pd.Timedelta(0), forecast_time]] * 2
+
+
+def test_rain_plot_load(tmp_path):
+    from cemc_plots_kit.plots import rain_24h, prep_24h
+    from cedar_graph.plots.cn.rain_24h.default import load_data as load_rain_24h_data
+    from cedar_graph.plots.cn.prep_24h.default import load_data as load_prep_24h_data
+
+    expr_config = create_expr_config(tmp_path)
+    data_loader = DataLoader(data_source=ExprLocalDataSource(expr_config=expr_config))
+    enable_accumulated_field_stores(max_bytes=None)
+    try:
+        for forecast_time in pd.timedelta_range("24h", "36h", freq="3h"):
+            time_config = TimeConfig(start_time=START_TIME, forecast_time=forecast_time)
+            for plot_module, load_data in ((rain_24h, load_rain_24h_data), (prep_24h, load_prep_24h_data)):
+                plot_data = plot_module.load(expr_config=expr_config, time_config=time_config)
+                expected_plot_data = load_data(
+                    data_loader=data_loader,
+                    start_time=START_TIME,
+                    forecast_time=forecast_time,
+                    interval=pd.Timedelta(hours=24),
+                )
+                for name, field in vars(expected_plot_data).items():
+                    xr.testing.assert_identical(getattr(plot_data, name), field)
+
+        # stores are shared by both plots and all forecast times.
+        data_source = get_accumulated_data_source(
+            expr_config=expr_config, field_infos=[apcp_info], start_time=START_TIME,
+        )
+        # 0h-12h and 24h-36h
+        assert data_source.stores[0].loads == 10
+    finally:
+        disable_accumulated_field_stores()
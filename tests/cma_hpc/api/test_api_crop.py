@@ -0,0 +1,85 @@
+import numpy as np
+import xarray as xr
+
+from cedarkit.maps.util import AreaRange
+
+from cemc_plots_kit.config import ExprConfig, NamedArea
+from cemc_plots_kit.source.crop import get_crop_bounds, get_crop_slices, crop_field
+
+
+# global grid like CMA-GFS: longitude 0-360, latitude from north to south.
+LONGITUDES = np.arange(0, 360, 0.25)
+LATITUDES = np.arange(90, -90.01, -0.25)
+
+
+def create_field() -> xr.DataArray:
+    return xr.DataArray(
+        np.random.default_rng(0).random((len(LATITUDES), len(LONGITUDES))),
+        dims=["latitude", "longitude"],
+        coords={"latitude": LATITUDES, "longitude": LONGITUDES},
+    )
+
+
+def test_get_crop_bounds():
+    expr_config = ExprConfig(system_name="CMA-GFS", data_dir="/data", area=AreaRange.from_tuple((100, 120, 30, 40)))
+    assert get_crop_bounds(expr_config) is None
+
+    expr_config.crop_area = True
+    assert get_crop_bounds(expr_config) == (98, 122, 28, 42)
+
+    expr_config.areas = [
+        NamedArea(name="north", area=AreaRange.from_tuple((110, 130, 35, 50))),
+        NamedArea(name="south", area=AreaRange.from_tuple((100, 115, 18, 30))),
+    ]
+    expr_config.crop_margin = 1.0
+    assert get_crop_bounds(expr_config) == (99, 131, 17, 51)
+
+
+def test_get_crop_slices_descending_latitude():
+    longitude_slice, latitude_slice = get_crop_slices(LONGITUDES, LATITUDES, (100, 120, 30, 40))
+
+    # one more point on each side.
+    assert LONGITUDES[longitude_slice][[0, -1]].tolist() == [99.75, 120.25]
+    assert LATITUDES[latitude_slice][[0, -1]].tolist() == [40.25, 29.75]
+
+
+def test_get_crop_slices_ascending_grid():
+    longitudes = np.arange(70, 140.01, 0.5)
+    latitudes = np.arange(10, 60.01, 0.5)
+    longitude_slice, latitude_slice = get_crop_slices(longitudes, latitudes, (100, 120, 30, 40))
+    assert longitudes[longitude_slice][[0, -1]].tolist() == [99.5, 120.5]
+    assert latitudes[latitude_slice][[0, -1]].tolist() == [29.5, 40.5]
+
+    # bounds at the grid edge are not extended outside the grid.
+    longitude_slice, latitude_slice = get_crop_slices(longitudes, latitudes, (70, 140, 10, 60))
+    assert (longitude_slice, latitude_slice) == (slice(0, len(longitudes)), slice(0, len(latitudes)))
+
+
+def test_get_crop_slices_no_crop():
+    # area across the start meridian of 0-360 grid.
+    assert get_crop_slices(LONGITUDES, LATITUDES, (-10, 20, 30, 60)) is None
+    # western longitudes are not converted to 0-360.
+    assert get_crop_slices(LONGITUDES, LATITUDES, (-120, -100, 30, 40)) is None
+    # area outside of regional grid.
+    longitudes = np.arange(70, 140.01, 0.5)
+    latitudes = np.arange(10, 60.01, 0.5)
+    assert get_crop_slices(longitudes, latitudes, (60, 120, 30, 40)) is None
+    # no latitude inside bounds.
+    assert get_crop_slices(longitudes, latitudes, (100, 120, 70, 80)) is None
+
+
+def test_crop_field():
+    field = create_field()
+    cropped_field = crop_field(field, (100, 120, 30, 40))
+    assert cropped_field.sizes == {"latitude": 43, "longitude": 83}
+    xr.testing.assert_identical(
+        cropped_field,
+        field.sel(latitude=slice(40.25, 29.75), longitude=slice(99.75, 120.25)),
+    )
+    # cropped data doesn't share memory with the full field.
+    assert not np.shares_memory(cropped_field.values, field.values)
+
+    # fields which can't be cropped are returned unchanged.
+    assert crop_field(field, (-10, 20, 30, 60)) is field
+    profile = field.isel(longitude=0)
+    assert crop_field(profile, (100, 120, 30, 40)) is profile
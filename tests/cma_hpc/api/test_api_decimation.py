@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+
+import numpy as np
+import xarray as xr
+
+from cedarkit.maps.util import AreaRange
+
+from cemc_plots_kit.decimation import decimate_plot_data
+
+
+@dataclass
+class PlotData:
+    field_rain: xr.DataArray
+    field_u: xr.DataArray
+    field_v: xr.DataArray
+
+
+def create_field(resolution: float) -> xr.DataArray:
+    latitudes = np.arange(60, 10, -resolution)
+    longitudes = np.arange(70, 145, resolution)
+    return xr.DataArray(
+        np.random.rand(len(latitudes), len(longitudes)).astype(np.float32),
+        dims=["latitude", "longitude"],
+        coords={"latitude": latitudes, "longitude": longitudes},
+    )
+
+
+def test_decimate_plot_data():
+    field = create_field(0.01)
+    plot_data = PlotData(field_rain=field, field_u=field, field_v=field)
+
+    decimated_plot_data = decimate_plot_data(plot_data, area=None, method="mean")
+    assert decimated_plot_data.field_rain.shape == (field.shape[0] // 2, field.shape[1] // 2)
+    np.testing.assert_allclose(
+        decimated_plot_data.field_rain.values[0, 0],
+        field.values[0:2, 0:2].mean(),
+        rtol=1e-6,
+    )
+    assert decimated_plot_data.field_u.shape == decimated_plot_data.field_v.shape
+    assert decimated_plot_data.field_u.shape[1] < decimated_plot_data.field_rain.shape[1]
+    # wind components are subsampled.
+    assert decimated_plot_data.field_u.values[0, 0] == field.values[0, 0]
+    assert plot_data.field_rain is field
+
+    small_area = AreaRange.from_tuple((105, 125, 34, 45))
+    assert decimate_plot_data(plot_data, area=small_area, method="mean").field_rain is field
+
+    coarse_field = create_field(0.125)
+    coarse_plot_data = PlotData(field_rain=coarse_field, field_u=coarse_field, field_v=coarse_field)
+    assert decimate_plot_data(coarse_plot_data, area=None, method="subsample").field_rain is coarse_field
+
+
+@dataclass
+class MaskPlotData:
+    field_rain: xr.DataArray
+    field_snow: xr.DataArray
+    field_category: xr.DataArray
+
+
+def test_decimate_plot_data_masks():
+    field = create_field(0.01)
+    snow = field > 0.5
+    plot_data = MaskPlotData(
+        field_rain=field.where(~snow),
+        field_snow=field.where(snow),
+        field_category=snow.astype(np.int8),
+    )
+
+    def check_subsampled(decimated_field: xr.DataArray, original_field: xr.DataArray):
+        xr.testing.assert_identical(
+            decimated_field,
+            original_field.isel(longitude=slice(None, None, 2), latitude=slice(None, None, 2)),
+        )
+
+    # masked fields and categories are not averaged, so masks don't overlap.
+    decimated_plot_data = decimate_plot_data(plot_data, area=None, method="mean")
+    for name in ("field_rain", "field_snow", "field_category"):
+        check_subsampled(getattr(decimated_plot_data, name), getattr(plot_data, name))
+    assert not np.logical_and(
+        np.isfinite(decimated_plot_data.field_rain.values),
+        np.isfinite(decimated_plot_data.field_snow.values),
+    ).any()
+
+    # fields declared by plot module are averaged.
+    decimated_plot_data = decimate_plot_data(plot_data, area=None, method="mean", mean_fields=("field_rain",))
+    assert decimated_plot_data.field_rain.shape == decimated_plot_data.field_snow.shape
+    np.testing.assert_allclose(
+        decimated_plot_data.field_rain.values[0, 0],
+        np.nanmean(plot_data.field_rain.values[0:2, 0:2]),
+        rtol=1e-6,
+    )
+    check_subsampled(decimated_plot_data.field_snow, plot_data.field_snow)
+
+    # continuous fields not declared by plot module are subsampled.
+    continuous_plot_data = PlotData(field_rain=field, field_u=field, field_v=field)
+    decimated_plot_data = decimate_plot_data(continuous_plot_data, area=None, method="mean", mean_fields=())
+    check_subsampled(decimated_plot_data.field_rain, field)
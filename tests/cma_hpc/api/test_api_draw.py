@@ -5,6 +5,7 @@ import pytest
 import pandas as pd
 
 from cedarkit.maps.util import AreaRange
+from cemc_plots_kit.config import NamedArea
 from cemc_plots_kit.draw import draw_plot
 
 
@@ -72,3 +73,38 @@ def test_draw_plot_area(cma_gfs_system_name, last_two_day, forecast_time_24h, cm
     )
 
     assert image_file_path.exists()
+
+
+def test_draw_plot_areas(cma_gfs_system_name, last_two_day, forecast_time_24h, cma_gfs_data_dir, base_work_dir, cn_area_list):
+    system_name = cma_gfs_system_name
+    plot_type = "height_500_mslp"
+    start_time = last_two_day
+    forecast_time = forecast_time_24h
+    data_dir = cma_gfs_data_dir
+    areas = [NamedArea(name=plot_area.name, area=plot_area.area) for plot_area in cn_area_list]
+    work_dir = f"{base_work_dir}/areas/{system_name}/{plot_type}"
+    data_file_name_template = "gmf.gra.{start_time_label}{forecast_hour_label}.grb2"
+
+    start_time_label = start_time.strftime("%Y%m%d%H")
+    forecast_hour_label = f"{int(forecast_time / pd.Timedelta(hours=1)):03d}"
+    image_file_paths = [
+        Path(work_dir, f"{plot_type}_{named_area.name}_{start_time_label}_{forecast_hour_label}.png")
+        for named_area in areas
+    ]
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    outputs = draw_plot(
+        system_name=system_name,
+        plot_type=plot_type,
+        start_time=start_time,
+        forecast_time=forecast_time,
+        data_dir=data_dir,
+        work_dir=work_dir,
+        data_file_name_template=data_file_name_template,
+        areas=areas,
+    )
+
+    assert len(outputs) == len(areas)
+    for image_file_path in image_file_paths:
+        assert image_file_path.exists()
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from cedar_graph.data import DataSource
+from cedar_graph.data.field_info import t_2m_info, mslp_info
+
+from cemc_plots_kit.source import FieldCache, CachedDataSource
+
+
+def create_field(value: float) -> xr.DataArray:
+    return xr.DataArray(
+        np.full((10, 20), value, dtype=np.float32),
+        dims=["latitude", "longitude"],
+        coords={"latitude": np.arange(10.0), "longitude": np.arange(20.0)},
+    )
+
+
+def test_field_cache_lru():
+    field_bytes = create_field(0).nbytes
+    field_cache = FieldCache(max_bytes=field_bytes * 2)
+
+    field_cache.put("a", create_field(1))
+    field_cache.put("b", create_field(2))
+    # "a" becomes the most recently used field, so "b" is evicted.
+    assert field_cache.get("a").values[0, 0] == 1
+    field_cache.put("c", create_field(3))
+    assert len(field_cache) == 2
+    assert field_cache.get("b") is None
+    assert field_cache.get("c").values[0, 0] == 3
+    assert field_cache.get("a").values[0, 0] == 1
+
+    # replacing a cached field doesn't evict other fields.
+    field_cache.put("a", create_field(4))
+    assert field_cache.get("a").values[0, 0] == 4
+    assert len(field_cache) == 2
+
+    # field larger than memory budget is not cached.
+    field_cache.put("large", xr.concat([create_field(5)] * 3, dim="level"))
+    assert field_cache.get("large") is None
+
+    stats = field_cache.stats
+    assert (stats.hits, stats.misses, stats.evictions) == (4, 2, 1)
+    assert stats.current_bytes == field_bytes * 2
+    assert stats.hit_rate == 4 / 6
+
+    field_cache.clear()
+    assert len(field_cache) == 0
+    assert field_cache.stats.current_bytes == 0
+
+
+class CountDataSource(DataSource):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def retrieve(self, field_info, start_time, forecast_time):
+        self.count += 1
+        if field_info is mslp_info:
+            return None
+        return create_field(self.count)
+
+
+def test_cached_data_source():
+    data_source = CountDataSource()
+    field_cache = FieldCache(max_bytes=create_field(0).nbytes * 4)
+    cached_data_source = CachedDataSource(data_source=data_source, field_cache=field_cache, source_key="expr")
+    start_time = pd.Timestamp("2024-11-13 00:00")
+    forecast_time = pd.Timedelta(hours=24)
+
+    field = cached_data_source.retrieve(t_2m_info, start_time=start_time, forecast_time=forecast_time)
+    # returned fields are copies, changes are not kept in cache.
+    field.values[...] = -1
+    cached_field = cached_data_source.retrieve(t_2m_info, start_time=start_time, forecast_time=forecast_time)
+    assert cached_field.values[0, 0] == 1
+    assert data_source.count == 1
+
+    cached_data_source.retrieve(t_2m_info, start_time=start_time, forecast_time=pd.Timedelta(hours=48))
+    assert data_source.count == 2
+
+    # missing fields are not cached.
+    assert cached_data_source.retrieve(mslp_info, start_time=start_time, forecast_time=forecast_time) is None
+    assert cached_data_source.retrieve(mslp_info, start_time=start_time, forecast_time=forecast_time) is None
+    assert data_source.count == 4
+
+    stats = field_cache.stats
+    assert (stats.hits, stats.misses) == (1, 4)
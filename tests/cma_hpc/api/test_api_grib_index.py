@@ -0,0 +1,84 @@
+from dataclasses import replace
+from pathlib import Path
+import os
+import sys
+
+import pandas as pd
+import xarray as xr
+
+from cedar_graph.data.source import get_field_from_file
+from cedar_graph.data.field_info import u_info, hgt_info, t_2m_info, mslp_info, apcp_info
+
+from cemc_plots_kit.config import ExprConfig
+from cemc_plots_kit.source import (
+    ExprLocalDataSource, get_field_from_file_with_index, get_field_from_file_with_mmap, close_mapped_files,
+)
+from cemc_plots_kit.source.index import get_grib_index, get_index_file_path
+
+sys.path.insert(0, str(Path(__file__).parents[3] / "benchmarks"))
+from synthetic_data import GridSpec, generate_file
+
+
+GRID_SPEC = GridSpec(100, 120, 45, 25, 0.5)
+START_TIME = pd.Timestamp("2024-11-13 00:00")
+
+FIELD_INFOS = [
+    replace(u_info, level_type="pl", level=850),
+    replace(hgt_info, level_type="pl", level=500),
+    t_2m_info,
+    mslp_info,
+    apcp_info,
+]
+
+
+def test_grib_index_matches_full_scan(tmp_path):
+    file_path = tmp_path / "data.grb2"
+    index_dir = tmp_path / "index"
+    generate_file(file_path, grid_spec=GRID_SPEC, start_time=START_TIME, forecast_time=pd.Timedelta(hours=3))
+
+    for field_info in FIELD_INFOS:
+        field = get_field_from_file(field_info=field_info, file_path=file_path)
+        xr.testing.assert_identical(
+            get_field_from_file_with_index(field_info=field_info, file_path=file_path, index_dir=index_dir),
+            field,
+        )
+        xr.testing.assert_identical(
+            get_field_from_file_with_mmap(field_info=field_info, file_path=file_path, index_dir=index_dir),
+            field,
+        )
+    assert get_index_file_path(file_path, index_dir=index_dir).exists()
+    missing_field_info = replace(u_info, level_type="pl", level=700)
+    assert get_field_from_file_with_index(field_info=missing_field_info, file_path=file_path, index_dir=index_dir) is None
+
+    # rewrite the file with another grid, so offsets of messages are changed and the index is rebuilt.
+    grib_index = get_grib_index(file_path, index_dir=index_dir)
+    generate_file(
+        file_path, grid_spec=GridSpec(105, 115, 40, 30, 0.25), start_time=START_TIME, forecast_time=pd.Timedelta(hours=6),
+    )
+    os.utime(file_path, (grib_index.file_mtime + 10, grib_index.file_mtime + 10))
+    for field_info in FIELD_INFOS:
+        field = get_field_from_file(field_info=field_info, file_path=file_path)
+        xr.testing.assert_identical(
+            get_field_from_file_with_index(field_info=field_info, file_path=file_path, index_dir=index_dir),
+            field,
+        )
+        xr.testing.assert_identical(
+            get_field_from_file_with_mmap(field_info=field_info, file_path=file_path, index_dir=index_dir),
+            field,
+        )
+    assert get_grib_index(file_path, index_dir=index_dir) is not grib_index
+    close_mapped_files()
+
+
+def test_grib_index_multi_level_fallback(tmp_path):
+    generate_file(
+        tmp_path / "data.grb2", grid_spec=GRID_SPEC, start_time=START_TIME, forecast_time=pd.Timedelta(hours=3),
+    )
+    expr_config = ExprConfig(system_name="CMA-MESO", data_dir=str(tmp_path), data_file_name_template="data.grb2")
+    field_info = replace(u_info, level_type="pl", level=[850])
+
+    def retrieve(grib_index: bool):
+        data_source = ExprLocalDataSource(expr_config=replace(expr_config, grib_index=grib_index))
+        return data_source.retrieve(field_info=field_info, start_time=START_TIME, forecast_time=pd.Timedelta(hours=3))
+
+    xr.testing.assert_identical(retrieve(grib_index=True), retrieve(grib_index=False))
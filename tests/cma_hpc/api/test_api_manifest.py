@@ -0,0 +1,48 @@
+from dataclasses import replace
+
+import pandas as pd
+
+from cemc_plots_kit.config import ExprConfig, RuntimeConfig
+from cemc_plots_kit.manifest import JobManifest, get_job_fingerprint
+from cemc_plots_kit.output import get_output_image_file_paths
+from cemc_plots_kit.task import create_job_configs
+
+
+def test_manifest_skip_and_redraw(cma_gfs_system_name, last_two_day, cma_gfs_data_dir, tmp_path):
+    expr_config = ExprConfig(
+        system_name=cma_gfs_system_name,
+        data_dir=cma_gfs_data_dir,
+        data_file_name_template="gmf.gra.{start_time_label}{forecast_hour_label}.grb2",
+    )
+    runtime_config = RuntimeConfig(base_work_dir=str(tmp_path), output_dir=str(tmp_path / "output"))
+    job_config = create_job_configs(
+        expr_config=expr_config,
+        runtime_config=runtime_config,
+        start_time=last_two_day,
+        forecast_times=[pd.Timedelta(hours=24)],
+        plot_names=["height_500_mslp"],
+    )[0]
+
+    output_image_files = get_output_image_file_paths(job_config)
+    for output_image_file in output_image_files:
+        output_image_file.parent.mkdir(parents=True, exist_ok=True)
+        output_image_file.write_bytes(b"image")
+
+    manifest = JobManifest(tmp_path / "manifest.jsonl")
+    manifest.add(job_config=job_config, output_image_files=output_image_files)
+    manifest.load()
+    assert manifest.is_completed(job_config, get_job_fingerprint(job_config))
+
+    changed_job_configs = [
+        replace(job_config, runtime_config=replace(runtime_config, image_format="png8")),
+        replace(job_config, runtime_config=replace(runtime_config, png_compress_level=1)),
+        replace(job_config, runtime_config=replace(runtime_config, decimation="mean")),
+        replace(job_config, runtime_config=replace(runtime_config, transform_cache=True)),
+        replace(job_config, runtime_config=replace(runtime_config, output_dir=str(tmp_path / "new_output"))),
+        replace(job_config, expr_config=replace(expr_config, crop_area=True)),
+    ]
+    for changed_job_config in changed_job_configs:
+        assert not manifest.is_completed(changed_job_config, get_job_fingerprint(changed_job_config))
+
+    output_image_files[0].unlink()
+    assert not manifest.is_completed(job_config, get_job_fingerprint(job_config))
@@ -0,0 +1,84 @@
+"""
+Test ``CachedMap`` with this module as base map loader package, so no shapefile is read.
+"""
+import sys
+
+import pytest
+
+from cemc_plots_kit import map_cache
+from cemc_plots_kit.map_cache import CachedMap, clear_map_feature_cache
+
+
+LOAD_CALLS = []
+
+
+class map_class:
+    """
+    Base map class which records each call and returns new feature objects.
+    """
+    def __init__(self, map_type=None, **kwargs):
+        self.map_type = map_type
+        self.kwargs = kwargs
+        self.scale = kwargs.get("scale", "default")
+
+    def coastline(self, *args, **kwargs) -> list:
+        LOAD_CALLS.append((self.map_type, self.kwargs, "coastline", args, kwargs))
+        return [object()]
+
+    def provinces(self, *args, **kwargs) -> list:
+        LOAD_CALLS.append((self.map_type, self.kwargs, "provinces", args, kwargs))
+        return [object()]
+
+
+@pytest.fixture(autouse=True)
+def use_fake_base_map(monkeypatch):
+    monkeypatch.setattr(map_cache, "_base_map_package", __name__)
+    LOAD_CALLS.clear()
+    clear_map_feature_cache()
+    yield
+    clear_map_feature_cache()
+
+
+def test_cached_map_same_key():
+    features = CachedMap(map_type="cn", scale="l").coastline(color="k", linewidth=0.5)
+    # new map objects with the same arguments, keyword arguments in different order.
+    assert CachedMap(map_type="cn", scale="l").coastline(linewidth=0.5, color="k") is features
+    assert CachedMap("cn", scale="l").coastline(color="k", linewidth=0.5) is features
+    assert len(LOAD_CALLS) == 1
+
+
+@pytest.mark.parametrize("map_type, map_kwargs, method, args, kwargs", [
+    ("cn", dict(scale="h"), "coastline", (), dict(color="k", linewidth=0.5)),
+    ("world", dict(scale="l"), "coastline", (), dict(color="k", linewidth=0.5)),
+    (None, dict(scale="l"), "coastline", (), dict(color="k", linewidth=0.5)),
+    ("cn", dict(scale="l"), "provinces", (), dict(color="k", linewidth=0.5)),
+    ("cn", dict(scale="l"), "coastline", (), dict(color="k", linewidth=1.0)),
+    ("cn", dict(scale="l"), "coastline", ("land",), dict(color="k", linewidth=0.5)),
+])
+def test_cached_map_different_key(map_type, map_kwargs, method, args, kwargs):
+    features = CachedMap(map_type="cn", scale="l").coastline(color="k", linewidth=0.5)
+    other_features = getattr(CachedMap(map_type=map_type, **map_kwargs), method)(*args, **kwargs)
+    assert other_features is not features
+    assert len(LOAD_CALLS) == 2
+
+
+def test_cached_map_base_package(monkeypatch):
+    features = CachedMap(map_type="cn").coastline()
+    # the same arguments for another base map loader package.
+    monkeypatch.setattr(map_cache, "_base_map_package", f"{__name__}_copy")
+    monkeypatch.setitem(sys.modules, f"{__name__}_copy", sys.modules[__name__])
+    assert CachedMap(map_type="cn").coastline() is not features
+    assert len(LOAD_CALLS) == 2
+
+
+def test_cached_map_attributes():
+    cached_map = CachedMap(map_type="cn", scale="l")
+    assert cached_map.map_type == "cn"
+    # attributes which are not methods are not cached.
+    assert cached_map.scale == "l"
+    assert cached_map.kwargs == {"scale": "l"}
+
+    features = cached_map.coastline()
+    clear_map_feature_cache()
+    assert cached_map.coastline() is not features
+    assert len(LOAD_CALLS) == 2
@@ -0,0 +1,114 @@
+import io
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from cemc_plots_kit import output
+from cemc_plots_kit.output import encode_image, to_palette_image, write_image, ImageWriter
+
+
+def create_image(seed: int = 0, height: int = 30, width: int = 40) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (height, width, 4), dtype=np.uint8)
+
+
+def read_image(file_path) -> np.ndarray:
+    with Image.open(file_path) as image:
+        return np.asarray(image.convert("RGBA"))
+
+
+def test_write_image(tmp_path, monkeypatch):
+    file_path = tmp_path / "image.png"
+    image = create_image()
+    write_image(image, file_path)
+    np.testing.assert_array_equal(read_image(file_path), image)
+    assert [f.name for f in tmp_path.iterdir()] == ["image.png"]
+
+    # error before rename: existing image is not changed and temporary file is removed.
+    def replace_with_error(src, dst):
+        raise OSError("disk is full")
+
+    monkeypatch.setattr(output.os, "replace", replace_with_error)
+    with pytest.raises(OSError, match="disk is full"):
+        write_image(create_image(1), file_path)
+    np.testing.assert_array_equal(read_image(file_path), image)
+    assert [f.name for f in tmp_path.iterdir()] == ["image.png"]
+
+
+def test_image_writer_back_pressure(tmp_path, monkeypatch):
+    can_write = threading.Event()
+    original_write_image = output.write_image
+
+    def blocked_write_image(*args, **kwargs):
+        can_write.wait(10)
+        return original_write_image(*args, **kwargs)
+
+    monkeypatch.setattr(output, "write_image", blocked_write_image)
+    images = [create_image(i) for i in range(3)]
+    file_paths = [tmp_path / f"{i}.png" for i in range(3)]
+
+    with ImageWriter(max_workers=1, max_pending=2) as image_writer:
+        image_writer.submit(images[0], file_paths[0])
+        image_writer.submit(images[1], file_paths[1])
+
+        # the third image waits for a free slot while two images are not written.
+        submitter = threading.Thread(target=image_writer.submit, args=(images[2], file_paths[2]))
+        submitter.start()
+        time.sleep(0.2)
+        assert submitter.is_alive()
+
+        can_write.set()
+        submitter.join(10)
+        assert not submitter.is_alive()
+        assert image_writer.wait(file_paths) is None
+
+    for image, file_path in zip(images, file_paths):
+        np.testing.assert_array_equal(read_image(file_path), image)
+
+
+def test_image_writer_error(tmp_path):
+    file_path = tmp_path / "missing_dir" / "image.png"
+    with ImageWriter(max_workers=1, max_pending=1) as image_writer:
+        future = image_writer.submit(create_image(), file_path)
+        assert isinstance(image_writer.wait([file_path]), FileNotFoundError)
+        assert future.exception() is not None
+        # slot of the failed image is released.
+        image_writer.submit(create_image(), tmp_path / "image.png")
+    assert [f.name for f in tmp_path.iterdir()] == ["image.png"]
+
+
+def create_palette_image(color_count: int, seed: int = 0) -> np.ndarray:
+    """
+    Create an image using a few colors like filled contours, including transparent colors.
+    """
+    rng = np.random.default_rng(seed)
+    colors = rng.integers(0, 256, (color_count, 4), dtype=np.uint8)
+    colors[0] = (255, 255, 255, 0)
+    colors[1] = (0, 0, 0, 255)
+    # all colors are used.
+    indexes = np.concatenate([np.arange(color_count), rng.integers(0, color_count, 60 * 50 - color_count)])
+    return colors[indexes.reshape(60, 50)]
+
+
+@pytest.mark.parametrize("color_count", [2, 17, 256])
+def test_to_palette_image_exact(color_count):
+    image = create_palette_image(color_count)
+    palette_image = to_palette_image(image)
+    assert palette_image.mode == "P"
+    np.testing.assert_array_equal(np.asarray(palette_image.convert("RGBA")), image)
+
+
+def test_to_palette_image_quantize():
+    image = create_image()
+    palette_image = to_palette_image(image)
+    assert palette_image.mode == "P"
+    assert len(palette_image.getcolors(maxcolors=256)) <= 256
+
+
+@pytest.mark.parametrize("image_format", ["png", "png8", "webp"])
+def test_encode_image_lossless(image_format):
+    image = create_palette_image(100)
+    content = encode_image(image, image_format=image_format, compress_level=1)
+    np.testing.assert_array_equal(read_image(io.BytesIO(content)), image)
@@ -0,0 +1,96 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import xarray as xr
+import cartopy.crs as ccrs
+
+from cedarkit.maps.chart import Panel, Layer
+from cedarkit.maps.chart.panel import Schema
+from cedarkit.maps.domains import XYDomain
+from cedarkit.maps.style import ContourStyle, BarbStyle
+
+from cemc_plots_kit.output import render_panel
+from cemc_plots_kit.panel_pool import enable_panel_pool, disable_panel_pool, get_panel_pool, install_panel_pool
+
+
+class BoxMapDomain(XYDomain):
+    """
+    Map domain with a static frame and header instead of map features, which need downloaded shape files.
+    """
+    def __init__(self, area: tuple = (100, 120, 30, 45)):
+        super().__init__()
+        self.area = area
+
+    def render_panel(self, panel: Panel):
+        chart = panel.add_chart(domain=self)
+        ax = chart.fig.add_axes((0.1, 0.2, 0.8, 0.7), projection=ccrs.PlateCarree())
+        ax.set_extent(self.area, crs=ccrs.PlateCarree())
+        start_longitude, end_longitude, start_latitude, end_latitude = self.area
+        ax.plot(
+            [start_longitude + 2, end_longitude - 2, end_longitude - 2, start_longitude + 2, start_longitude + 2],
+            [start_latitude + 2, start_latitude + 2, end_latitude - 2, end_latitude - 2, start_latitude + 2],
+            color="gray",
+            transform=ccrs.PlateCarree(),
+        )
+        chart.fig.text(0.1, 0.95, "static header")
+        layer = Layer(projection=ccrs.PlateCarree(), chart=chart)
+        layer.set_axes(ax)
+
+
+def create_field(forecast_hour: int) -> xr.DataArray:
+    latitudes = np.arange(50, 25, -0.5)
+    longitudes = np.arange(95, 125, 0.5)
+    rng = np.random.default_rng(forecast_hour)
+    return xr.DataArray(
+        rng.random((len(latitudes), len(longitudes))) * 10,
+        dims=["latitude", "longitude"],
+        coords={"latitude": latitudes, "longitude": longitudes},
+    )
+
+
+def plot(forecast_hour: int) -> Panel:
+    """
+    Plot like cedar_graph plot functions: filled contours, contours, barbs, title and colorbar on a new panel.
+    """
+    field = create_field(forecast_hour)
+    panel = Panel(domain=BoxMapDomain(), schema=Schema(figsize=(4, 4), dpi=50))
+    contourf_style = ContourStyle(colors="viridis", levels=np.linspace(0, 10, 11), fill=True)
+    contour_sets = panel.plot(field, style=contourf_style)
+    panel.plot(field, style=ContourStyle(colors="black", levels=[5], linewidths=0.5))
+    panel.plot([[field - 5, create_field(forecast_hour + 1) * 2]], style=BarbStyle())
+    panel.fig.text(0.1, 0.92, f"forecast hour: {forecast_hour}")
+    colorbar_ax = panel.fig.add_axes((0.1, 0.1, 0.8, 0.03))
+    panel.fig.colorbar(contour_sets[0][0], cax=colorbar_ax, orientation="horizontal")
+    return panel
+
+
+def render(forecast_hour: int) -> np.ndarray:
+    panel = plot(forecast_hour)
+    image = render_panel(panel)
+    panel_pool = get_panel_pool()
+    if panel_pool is None or not panel_pool.contains(panel):
+        plt.close(panel.fig)
+    return image
+
+
+def test_reused_panel_renders_same_image(monkeypatch):
+    forecast_hours = [0, 3]
+    fresh_images = [render(hour) for hour in forecast_hours]
+    assert not np.array_equal(fresh_images[0], fresh_images[1])
+
+    # ``Panel`` of this module is restored after the test.
+    monkeypatch.setitem(globals(), "Panel", Panel)
+    enable_panel_pool()
+    install_panel_pool(plot)
+    try:
+        pooled_images = [render(hour) for hour in forecast_hours]
+        panel_pool = get_panel_pool()
+        assert (panel_pool.creations, panel_pool.reuses) == (1, 1)
+        # render the first forecast hour again on the panel used by the second one.
+        pooled_images.append(render(forecast_hours[0]))
+        assert panel_pool.reuses == 2
+    finally:
+        disable_panel_pool()
+
+    for fresh_image, pooled_image in zip(fresh_images + fresh_images[:1], pooled_images):
+        np.testing.assert_array_equal(pooled_image, fresh_image)
+
@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import pytest
+
+from cemc_plots_kit.registry import PLOT_REGISTRY
+from cemc_plots_kit.task import run_by_pipeline, run_job_configs
+
+from . import synthetic_plot
+
+
+@pytest.fixture
+def register_synthetic_plot(monkeypatch):
+    monkeypatch.setitem(PLOT_REGISTRY, synthetic_plot.PLOT_NAME, synthetic_plot.PLOT_INFO)
+    monkeypatch.setattr(synthetic_plot, "LOAD_ERROR_HOURS", {3})
+    # last job, so its figure is not closed by following jobs.
+    monkeypatch.setattr(synthetic_plot, "PLOT_ERROR_HOURS", {21})
+
+
+def test_run_by_pipeline(tmp_path, register_synthetic_plot):
+    forecast_hours = range(0, 24, 3)
+    job_configs = synthetic_plot.create_job_configs(tmp_path, forecast_hours)
+    plt.close("all")
+
+    job_results = run_by_pipeline(job_configs=job_configs, load_workers=2, save_workers=2, queue_size=2)
+
+    assert [r.job_config for r in job_results] == job_configs
+    for hour, job_result in zip(forecast_hours, job_results):
+        if hour == 3:
+            assert "data is not found" in job_result.error
+        elif hour == 21:
+            assert "plot failed" in job_result.error
+        else:
+            assert job_result.succeeded
+            assert len(job_result.output_image_files) == 1
+            assert Path(job_result.output_image_files[0]).stat().st_size > 0
+            assert {"load", "plot", "save"} <= set(job_result.stage_times)
+    # figure of the failed plot is closed.
+    assert plt.get_fignums() == []
+
+
+@pytest.mark.parametrize("option", [
+    dict(shared_field_store_size="1GB"),
+    dict(max_jobs_per_worker=2),
+    dict(max_worker_rss="4GB"),
+    dict(async_save=True),
+])
+def test_run_job_configs_pipeline_unsupported_options(tmp_path, register_synthetic_plot, option):
+    job_configs = synthetic_plot.create_job_configs(tmp_path, [0], executor="pipeline", **option)
+    with pytest.raises(ValueError, match=next(iter(option))):
+        run_job_configs(job_configs=job_configs, runtime_config=job_configs[0].runtime_config)
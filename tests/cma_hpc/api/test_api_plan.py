@@ -0,0 +1,34 @@
+import json
+
+import pandas as pd
+
+from cemc_plots_kit.config import ExprConfig, RuntimeConfig, NamedArea
+from cemc_plots_kit.plan import write_plan, load_plan, parse_job_range
+from cemc_plots_kit.task import create_job_configs
+
+
+def test_plan_round_trip(cma_gfs_system_name, last_two_day, cma_gfs_data_dir, cn_area_list, tmp_path):
+    expr_config = ExprConfig(
+        system_name=cma_gfs_system_name,
+        data_dir=cma_gfs_data_dir,
+        data_file_name_template="gmf.gra.{start_time_label}{forecast_hour_label}.grb2",
+        areas=[NamedArea(name=plot_area.name, area=plot_area.area) for plot_area in cn_area_list[:2]],
+    )
+    job_configs = create_job_configs(
+        expr_config=expr_config,
+        runtime_config=RuntimeConfig(base_work_dir=str(tmp_path)),
+        start_time=last_two_day,
+        forecast_times=pd.timedelta_range("0h", "48h", freq="6h"),
+        plot_names=["height_500_mslp", "rain_24h"],
+    )
+    plan_file_path = tmp_path / "jobs.jsonl"
+
+    write_plan(plan_file_path, job_configs)
+
+    assert load_plan(plan_file_path) == job_configs
+    assert load_plan(plan_file_path, job_range=parse_job_range("2:5")) == job_configs[2:5]
+
+    with open(plan_file_path) as f:
+        item = json.loads(f.readline())
+    assert len(item["output_files"]) == 2
+    assert len(item["input_files"]) == 1
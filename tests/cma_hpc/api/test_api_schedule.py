@@ -0,0 +1,34 @@
+import pandas as pd
+
+from cemc_plots_kit.config import ExprConfig, RuntimeConfig
+from cemc_plots_kit.schedule import group_jobs_by_input_file, split_job_groups
+from cemc_plots_kit.task import create_job_configs
+
+
+def test_split_job_groups(cma_gfs_system_name, last_two_day, cma_gfs_data_dir):
+    expr_config = ExprConfig(
+        system_name=cma_gfs_system_name,
+        data_dir=cma_gfs_data_dir,
+        data_file_name_template="gmf.gra.{start_time_label}{forecast_hour_label}.grb2",
+    )
+    job_configs = create_job_configs(
+        expr_config=expr_config,
+        runtime_config=RuntimeConfig(base_work_dir="."),
+        start_time=last_two_day,
+        forecast_times=pd.timedelta_range("24h", "48h", freq="24h"),
+        plot_names=["height_500_mslp", "t_2m", "wind_10m", "rain_24h"],
+    )
+    job_groups = group_jobs_by_input_file(job_configs)
+    assert len(job_groups) == 2
+
+    assert split_job_groups(job_groups, job_configs=job_configs, min_count=2) is job_groups
+    assert split_job_groups([], job_configs=job_configs, min_count=2) == []
+
+    split_groups = split_job_groups(job_groups, job_configs=job_configs, min_count=5)
+    assert len(split_groups) == 5
+    assert sorted(i for group in split_groups for i in group.job_indexes) == list(range(len(job_configs)))
+    for group in split_groups:
+        assert all(job_configs[i].time_config.forecast_time == job_configs[group.job_indexes[0]].time_config.forecast_time
+                   for i in group.job_indexes)
+
+    assert len(split_job_groups(job_groups, job_configs=job_configs, min_count=100)) == len(job_configs)
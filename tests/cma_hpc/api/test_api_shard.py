@@ -0,0 +1,62 @@
+import pandas as pd
+
+from cemc_plots_kit.config import ExprConfig, RuntimeConfig
+from cemc_plots_kit.registry import get_plot_names
+from cemc_plots_kit.schedule import Shard, get_job_cost
+from cemc_plots_kit.manifest import get_job_key
+from cemc_plots_kit.task import create_job_configs, shard_job_configs
+
+
+def test_shard_job_configs(cma_gfs_system_name, last_two_day, cma_gfs_data_dir):
+    expr_config = ExprConfig(
+        system_name=cma_gfs_system_name,
+        data_dir=cma_gfs_data_dir,
+        data_file_name_template="gmf.gra.{start_time_label}{forecast_hour_label}.grb2",
+    )
+    job_configs = create_job_configs(
+        expr_config=expr_config,
+        runtime_config=RuntimeConfig(base_work_dir="."),
+        start_time=last_two_day,
+        forecast_times=pd.timedelta_range("0h", "240h", freq="3h"),
+        plot_names=get_plot_names(),
+    )
+    shard_count = 4
+
+    shards = [
+        shard_job_configs(job_configs, shard=Shard(index=i, count=shard_count))
+        for i in range(shard_count)
+    ]
+
+    job_keys = [get_job_key(job_config) for shard_jobs in shards for job_config in shard_jobs]
+    assert sorted(job_keys) == sorted(get_job_key(job_config) for job_config in job_configs)
+
+    shard_costs = [sum(get_job_cost(job_config) for job_config in shard_jobs) for shard_jobs in shards]
+    total_cost = sum(shard_costs)
+    assert max(shard_costs) - min(shard_costs) < 0.05 * total_cost / shard_count
+
+    assert shard_job_configs(job_configs, shard=Shard(index=1, count=shard_count)) == shards[1]
+
+
+def test_shard_job_configs_with_few_forecast_times(cma_gfs_system_name, last_two_day, cma_gfs_data_dir):
+    expr_config = ExprConfig(
+        system_name=cma_gfs_system_name,
+        data_dir=cma_gfs_data_dir,
+        data_file_name_template="gmf.gra.{start_time_label}{forecast_hour_label}.grb2",
+    )
+    job_configs = create_job_configs(
+        expr_config=expr_config,
+        runtime_config=RuntimeConfig(base_work_dir="."),
+        start_time=last_two_day,
+        forecast_times=[pd.Timedelta(hours=24)],
+        plot_names=get_plot_names(),
+    )
+    shard_count = 4
+
+    shards = [
+        shard_job_configs(job_configs, shard=Shard(index=i, count=shard_count))
+        for i in range(shard_count)
+    ]
+
+    assert all(len(shard_jobs) > 0 for shard_jobs in shards)
+    job_keys = [get_job_key(job_config) for shard_jobs in shards for job_config in shard_jobs]
+    assert sorted(job_keys) == sorted(get_job_key(job_config) for job_config in job_configs)
@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from cemc_plots_kit.source import SharedFieldStoreServer, SharedFieldStore
+from cemc_plots_kit.source.shared import open_block, is_process_alive, _LOADING, _READY
+
+
+def create_field() -> xr.DataArray:
+    latitudes = np.arange(60, 10, -0.5)
+    longitudes = np.arange(70, 145, 0.5)
+    return xr.DataArray(
+        np.random.rand(len(latitudes), len(longitudes)).astype(np.float32),
+        dims=["latitude", "longitude"],
+        coords={"latitude": latitudes, "longitude": longitudes},
+        name="t",
+    )
+
+
+def test_shared_field_store():
+    field = create_field()
+    server = SharedFieldStoreServer(max_bytes=field.nbytes * 4)
+    store = SharedFieldStore(handle=server.handle)
+    load_count = 0
+
+    def load():
+        nonlocal load_count
+        load_count += 1
+        return field
+
+    try:
+        first_field = store.get_or_load("t", load)
+        second_field = store.get_or_load("t", load)
+        assert load_count == 1
+        xr.testing.assert_identical(first_field, field)
+        xr.testing.assert_identical(second_field, field)
+        with pytest.raises(ValueError):
+            second_field.values[0, 0] = 0
+        assert server.handle.entries[store.get_block_name("t")]["refs"] == 2
+
+        assert store.get_or_load("missing", lambda: None) is None
+        assert store.get_or_load("missing", load) is None
+        assert load_count == 1
+
+        store.release_job_fields()
+        assert server.handle.entries[store.get_block_name("t")]["refs"] == 0
+        del first_field, second_field
+    finally:
+        store.close()
+        server.close()
+
+
+def test_shared_field_store_reserve():
+    field = create_field()
+    server = SharedFieldStoreServer(max_bytes=field.nbytes * 3 // 2)
+    store = SharedFieldStore(handle=server.handle)
+    loading_name = store.get_block_name("loading")
+    try:
+        # another process is creating a block for a field.
+        assert store._reserve(loading_name, field.nbytes)
+        loading_block = open_block(name=loading_name, create=True, size=field.nbytes)
+        loading_block.close()
+
+        # no space left for a second field, it is returned without shared memory.
+        loaded_field = store.get_or_load("t", lambda: field)
+        assert loaded_field is field
+        assert store.get_block_name("t") not in server.handle.entries
+    finally:
+        store.close()
+        server.close()
+
+    with pytest.raises(FileNotFoundError):
+        open_block(name=loading_name)
+
+
+def test_shared_field_store_wait():
+    field = create_field()
+    server = SharedFieldStoreServer(max_bytes=field.nbytes * 4)
+    loader_store = SharedFieldStore(handle=server.handle)
+    store = SharedFieldStore(handle=server.handle)
+    loading = threading.Event()
+    load_count = 0
+
+    def slow_load():
+        nonlocal load_count
+        load_count += 1
+        loading.set()
+        time.sleep(0.5)
+        return field
+
+    try:
+        # another worker is decoding the field, current worker waits for it instead of decoding it again.
+        loader = threading.Thread(target=loader_store.get_or_load, args=("t", slow_load))
+        loader.start()
+        assert loading.wait(10)
+        xr.testing.assert_identical(store.get_or_load("t", slow_load), field)
+        loader.join()
+        assert load_count == 1
+    finally:
+        loader_store.close()
+        store.close()
+        server.close()
+
+
+def test_shared_field_store_loader_exited():
+    field = create_field()
+    server = SharedFieldStoreServer(max_bytes=field.nbytes * 4)
+    store = SharedFieldStore(handle=server.handle, wait_timeout=600)
+    name = store.get_block_name("t")
+
+    # a worker exits while decoding the field.
+    process = multiprocessing.Process(target=time.sleep, args=(0,))
+    process.start()
+    process.join()
+    server.handle.entries[name] = dict(state=_LOADING, pid=process.pid)
+    assert not is_process_alive(process.pid)
+    assert is_process_alive(os.getpid())
+
+    try:
+        start_time = time.monotonic()
+        xr.testing.assert_identical(store.get_or_load("t", lambda: field), field)
+        assert time.monotonic() - start_time < 10
+        assert server.handle.entries[name]["state"] == _READY
+    finally:
+        store.close()
+        server.close()
@@ -88,3 +88,44 @@ plots:
         f.write(task_file_content)
 
     run_task(task_file_path=task_file_path)
+
+
+def test_run_task_parallel(cma_gfs_system_name, last_two_day, cma_gfs_data_dir, base_work_dir):
+    system_name = cma_gfs_system_name
+    start_time = last_two_day
+    start_time_label = start_time.strftime("%Y%m%d%H")
+    data_dir = cma_gfs_data_dir
+    case_base_work_dir = f"{base_work_dir}/parallel/{system_name}"
+    task_file_path = Path(case_base_work_dir) / "task.yaml"
+
+    shutil.rmtree(case_base_work_dir, ignore_errors=True)
+    Path(case_base_work_dir).mkdir(parents=True, exist_ok=True)
+
+    task_file_content = f"""
+runtime:
+  base_work_dir: {case_base_work_dir}
+  executor: parallel
+  max_workers: 4
+
+source:
+  data_dir: {data_dir}
+
+system_name: {system_name}
+
+time:
+  start_time: {start_time_label}
+  forecast_time: 48h
+  forecast_interval: 6h
+
+plots:
+  height_500_mslp: on
+  rain_24h: on
+"""
+    with open(task_file_path, "w") as f:
+        f.write(task_file_content)
+
+    job_results = run_task(task_file_path=task_file_path)
+    assert len(job_results) == 14
+    for job_result in job_results:
+        assert job_result.succeeded
+        assert job_result.output_image_files[0].exists()
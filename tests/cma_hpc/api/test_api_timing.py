@@ -0,0 +1,92 @@
+import json
+import threading
+
+from cemc_plots_kit.registry import PLOT_REGISTRY
+from cemc_plots_kit.task import run_job_configs
+from cemc_plots_kit.timing import (
+    JobTimer, set_job_timer, get_job_timer, timing_stage, record_field_time,
+    write_timing_record, summarize_stage_times,
+)
+
+from . import synthetic_plot
+
+
+def test_job_timer():
+    job_timer = JobTimer()
+    set_job_timer(job_timer)
+    try:
+        with timing_stage("plot"):
+            pass
+        with timing_stage("plot"):
+            pass
+        record_field_time("t", 0.5)
+        record_field_time("t", 0.25)
+
+        # timer is set for current thread only.
+        thread = threading.Thread(target=lambda: record_field_time("u", 1.0))
+        thread.start()
+        thread.join()
+    finally:
+        set_job_timer(None)
+
+    assert get_job_timer() is None
+    assert list(job_timer.stages) == ["plot"]
+    assert job_timer.fields == {"t": 0.75}
+
+    # nothing is recorded without timer.
+    with timing_stage("save"):
+        pass
+    assert "save" not in job_timer.stages
+
+
+def test_write_timing_record(tmp_path):
+    file_path = tmp_path / "timing" / "timing.jsonl"
+    records = [
+        {"plot_name": "a", "elapsed_time": 1.5, "stages": {"load": 1.0, "plot": 0.5}},
+        {"plot_name": "b", "elapsed_time": 2.0, "stages": {"load": 2.0}},
+    ]
+    for record in records:
+        write_timing_record(file_path, record)
+    lines = file_path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == records
+
+
+def test_summarize_stage_times():
+    records = [
+        {"plot_name": "a", "elapsed_time": float(i + 1), "stages": {"load": float(i), "plot": 1.0}}
+        for i in range(21)
+    ]
+    records.append({"plot_name": "b", "elapsed_time": 3.0, "stages": {"load": 2.0}})
+
+    summary = summarize_stage_times(records)
+
+    assert set(summary) == {"a", "b"}
+    assert summary["a"]["load"] == {"count": 21, "p50": 10.0, "p95": 19.0, "max": 20.0}
+    assert summary["a"]["plot"] == {"count": 21, "p50": 1.0, "p95": 1.0, "max": 1.0}
+    assert summary["a"]["total"] == {"count": 21, "p50": 11.0, "p95": 20.0, "max": 21.0}
+    assert summary["b"] == {
+        "load": {"count": 1, "p50": 2.0, "p95": 2.0, "max": 2.0},
+        "total": {"count": 1, "p50": 3.0, "p95": 3.0, "max": 3.0},
+    }
+
+
+def test_run_job_configs_timing_file(tmp_path, monkeypatch):
+    monkeypatch.setitem(PLOT_REGISTRY, synthetic_plot.PLOT_NAME, synthetic_plot.PLOT_INFO)
+    monkeypatch.setattr(synthetic_plot, "LOAD_ERROR_HOURS", {3})
+    timing_file = tmp_path / "timing.jsonl"
+    forecast_hours = [0, 3, 6]
+    job_configs = synthetic_plot.create_job_configs(tmp_path, forecast_hours, timing_file=str(timing_file))
+
+    job_results = run_job_configs(job_configs=job_configs, runtime_config=job_configs[0].runtime_config)
+
+    assert [r.succeeded for r in job_results] == [True, False, True]
+    records = [json.loads(line) for line in timing_file.read_text().splitlines()]
+    # failed jobs are also recorded.
+    assert sorted(record["forecast_time"] for record in records) == ["0 days 00:00:00", "0 days 03:00:00", "0 days 06:00:00"]
+    for record in records:
+        assert record["plot_name"] == synthetic_plot.PLOT_NAME
+        assert record["elapsed_time"] >= sum(record["stages"].values()) * 0.99
+        if record["succeeded"]:
+            assert {"load", "plot", "save"} <= set(record["stages"])
+        else:
+            assert "save" not in record["stages"]
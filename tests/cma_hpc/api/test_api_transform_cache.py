@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+import cartopy.crs as ccrs
+from cartopy.vector_transform import vector_scalar_to_grid
+
+from cemc_plots_kit.transform_cache import (
+    TransformCache, enable_transform_cache, disable_transform_cache, add_barb, add_contourf, add_contour,
+)
+
+
+LATITUDES = np.arange(60, 10, -0.5)
+LONGITUDES = np.arange(70, 145, 0.5)
+
+
+def create_wind() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Random wind, not separable in longitude and latitude, so interpolation methods give different values.
+    """
+    rng = np.random.default_rng(0)
+    shape = (len(LATITUDES), len(LONGITUDES))
+    return rng.normal(0, 10, shape), rng.normal(0, 10, shape)
+
+
+def check_barb_samples(cache_dir, src_crs, target_crs, target_extent):
+    grid_longitudes, grid_latitudes = np.meshgrid(LONGITUDES, LATITUDES)
+    u, v = create_wind()
+
+    x, y, expected_u, expected_v = vector_scalar_to_grid(
+        src_crs, target_crs, (20, 15), grid_longitudes, grid_latitudes, u, v,
+        target_extent=target_extent,
+    )
+
+    transform_cache = TransformCache(cache_dir=cache_dir)
+    samples = transform_cache.get_barb_samples(
+        LONGITUDES, LATITUDES, src_crs, target_crs, target_extent, (20, 15))
+    sample_u = samples.interpolate(u)
+    sample_v = samples.interpolate(v)
+    if src_crs != target_crs:
+        sample_u, sample_v = target_crs.transform_vectors(
+            src_crs, samples.longitudes, samples.latitudes, sample_u, sample_v)
+    np.testing.assert_allclose(samples.x, x[0])
+    np.testing.assert_allclose(samples.y, y[:, 0])
+    np.testing.assert_allclose(sample_u, expected_u, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(sample_v, expected_v, rtol=0, atol=1e-12)
+    return samples
+
+
+def test_barb_samples_plate_carree():
+    crs = ccrs.PlateCarree()
+    check_barb_samples(None, crs, crs, (100, 120, 30, 45))
+
+
+def test_barb_samples_lambert_conformal(tmp_path):
+    src_crs = ccrs.PlateCarree()
+    target_crs = ccrs.LambertConformal(central_longitude=110, standard_parallels=(30, 60))
+    corners = target_crs.transform_points(src_crs, np.array([100, 120]), np.array([30, 45]))
+    target_extent = (corners[0, 0], corners[1, 0], corners[0, 1], corners[1, 1])
+    samples = check_barb_samples(tmp_path, src_crs, target_crs, target_extent)
+
+    # load from files in cache directory.
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+    new_samples = TransformCache(cache_dir=tmp_path).get_barb_samples(
+        LONGITUDES, LATITUDES, src_crs, target_crs, target_extent, (20, 15))
+    np.testing.assert_array_equal(new_samples.indexes, samples.indexes)
+    np.testing.assert_array_equal(new_samples.weights, samples.weights)
+
+
+@pytest.mark.parametrize("contours", [False, True])
+def test_enable_transform_cache(contours):
+    from cedarkit.maps.chart import layer
+
+    original_functions = {name: getattr(layer, name) for name in ("add_barb", "add_contourf", "add_contour")}
+    enable_transform_cache(contours=contours)
+    try:
+        assert layer.add_barb is add_barb
+        assert (layer.add_contourf is add_contourf) == contours
+        assert (layer.add_contour is add_contour) == contours
+    finally:
+        disable_transform_cache()
+    for name, function in original_functions.items():
+        assert getattr(layer, name) is function
@@ -0,0 +1,117 @@
+from pathlib import Path
+import os
+import threading
+import time
+
+import pytest
+
+from cemc_plots_kit.registry import PLOT_REGISTRY
+from cemc_plots_kit.schedule import get_job_input_files
+from cemc_plots_kit.task import run_by_watch
+from cemc_plots_kit.watch import DataFileWatcher
+
+from . import synthetic_plot
+
+
+def test_data_file_watcher_stable_time(tmp_path):
+    file_path = tmp_path / "data.grb2"
+    watcher = DataFileWatcher(stable_time=0.2)
+    assert not watcher.is_ready(file_path)
+
+    # empty file is never complete.
+    file_path.touch()
+    assert not watcher.is_ready(file_path)
+    time.sleep(0.3)
+    assert not watcher.is_ready(file_path)
+
+    file_path.write_bytes(b"GRIB")
+    assert not watcher.is_ready(file_path)
+    time.sleep(0.3)
+    # file is still being written.
+    with open(file_path, "ab") as f:
+        f.write(b"7777")
+    assert not watcher.is_ready(file_path)
+    time.sleep(0.3)
+    assert watcher.check([file_path, tmp_path / "missing.grb2"]) == {file_path}
+
+    # complete files are not checked again.
+    file_path.unlink()
+    assert watcher.is_ready(file_path)
+
+
+def test_data_file_watcher_marker(tmp_path):
+    file_path = tmp_path / "data.grb2"
+    file_path.write_bytes(b"GRIB7777")
+    watcher = DataFileWatcher(stable_time=0, marker_suffix=".ok")
+    time.sleep(0.1)
+    assert not watcher.is_ready(file_path)
+    assert not watcher.is_ready(file_path)
+
+    Path(f"{file_path}.ok").touch()
+    assert watcher.is_ready(file_path)
+
+
+@pytest.mark.parametrize("executor", ["serial", "parallel"])
+def test_run_by_watch_accumulated_plot(tmp_path, monkeypatch, executor):
+    plot_info = synthetic_plot.ACCUMULATED_PLOT_INFO
+    monkeypatch.setitem(PLOT_REGISTRY, plot_info.name, plot_info)
+    job_configs = synthetic_plot.create_job_configs(
+        tmp_path,
+        forecast_hours=[6, 12],
+        plot_name=plot_info.name,
+        executor=executor,
+        max_workers=2,
+        watch_interval=0.05,
+        watch_marker_suffix=".ok",
+        watch_timeout="30s",
+    )
+    input_files = [get_job_input_files(job_config) for job_config in job_configs]
+    data_dir = Path(job_configs[0].expr_config.data_dir)
+    assert [[f.name for f in files] for files in input_files] == [
+        ["data.006.grb2", "data.000.grb2"],
+        ["data.012.grb2", "data.006.grb2"],
+    ]
+    marker_times = dict()
+
+    def write_files():
+        # data file of t-6h for the second job arrives last.
+        for file_name in ("data.000.grb2", "data.012.grb2", "data.006.grb2"):
+            time.sleep(0.3)
+            (data_dir / file_name).write_bytes(b"GRIB7777")
+            marker_file_path = data_dir / f"{file_name}.ok"
+            marker_file_path.touch()
+            marker_times[file_name] = os.stat(marker_file_path).st_mtime_ns
+
+    writer = threading.Thread(target=write_files)
+    writer.start()
+    try:
+        job_results = run_by_watch(job_configs=job_configs, runtime_config=job_configs[0].runtime_config)
+    finally:
+        writer.join()
+
+    assert [r.succeeded for r in job_results] == [True, True]
+    # both jobs start after their last data file is complete.
+    for hour in (6, 12):
+        assert os.stat(data_dir / "pids" / f"{hour}").st_mtime_ns >= marker_times["data.006.grb2"]
+
+
+def test_run_by_watch_timeout(tmp_path, monkeypatch):
+    plot_info = synthetic_plot.ACCUMULATED_PLOT_INFO
+    monkeypatch.setitem(PLOT_REGISTRY, plot_info.name, plot_info)
+    job_configs = synthetic_plot.create_job_configs(
+        tmp_path,
+        forecast_hours=[6, 12],
+        plot_name=plot_info.name,
+        watch_interval=0.05,
+        watch_marker_suffix=".ok",
+        watch_timeout="0.5s",
+    )
+    data_dir = Path(job_configs[0].expr_config.data_dir)
+    for file_name in ("data.000.grb2", "data.006.grb2"):
+        (data_dir / file_name).write_bytes(b"GRIB7777")
+        Path(data_dir / f"{file_name}.ok").touch()
+
+    job_results = run_by_watch(job_configs=job_configs, runtime_config=job_configs[0].runtime_config)
+    assert job_results[0].succeeded
+    assert "data.012.grb2" in job_results[1].error
+    assert "data.006.grb2" not in job_results[1].error
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from cemc_plots_kit import task
+from cemc_plots_kit.registry import PLOT_REGISTRY
+from cemc_plots_kit.task import run_by_parallel, run_by_serial
+
+from . import synthetic_plot
+
+
+@pytest.fixture(autouse=True)
+def register_synthetic_plot(monkeypatch):
+    monkeypatch.setitem(PLOT_REGISTRY, synthetic_plot.PLOT_NAME, synthetic_plot.PLOT_INFO)
+
+
+def get_job_pids(tmp_path, forecast_hours) -> list[int]:
+    pids = synthetic_plot.get_worker_pids(tmp_path / "data")
+    return [pids[hour] for hour in forecast_hours]
+
+
+def test_max_jobs_per_worker(tmp_path):
+    forecast_hours = list(range(0, 18, 3))
+    job_configs = synthetic_plot.create_job_configs(tmp_path, forecast_hours)
+
+    job_results = run_by_parallel(job_configs=job_configs, max_workers=1, max_jobs_per_worker=2)
+
+    assert all(r.succeeded for r in job_results)
+    pids = get_job_pids(tmp_path, forecast_hours)
+    # worker is replaced after every two jobs.
+    assert pids[0] == pids[1] and pids[2] == pids[3] and pids[4] == pids[5]
+    assert len({pids[0], pids[2], pids[4], os.getpid()}) == 4
+
+
+@pytest.mark.parametrize("max_worker_rss, pid_count", [(1, 4), (1 << 50, 1)])
+def test_max_worker_rss(tmp_path, max_worker_rss, pid_count):
+    forecast_hours = list(range(0, 12, 3))
+    job_configs = synthetic_plot.create_job_configs(tmp_path, forecast_hours)
+
+    job_results = run_by_parallel(job_configs=job_configs, max_workers=1, max_worker_rss=max_worker_rss)
+
+    assert all(r.succeeded for r in job_results)
+    assert all(r.rss is not None for r in job_results)
+    # worker is replaced after each job if rss is larger than the limit.
+    pids = get_job_pids(tmp_path, forecast_hours)
+    assert len(set(pids)) == pid_count
+    assert os.getpid() not in pids
+
+
+def test_serial_with_worker_limits(tmp_path, monkeypatch):
+    forecast_hours = [0, 3, 6]
+    job_configs = synthetic_plot.create_job_configs(tmp_path, forecast_hours)
+    calls = []
+    original_run_by_parallel = task.run_by_parallel
+
+    def run_by_parallel_spy(**kwargs):
+        calls.append(kwargs)
+        return original_run_by_parallel(**kwargs)
+
+    monkeypatch.setattr(task, "run_by_parallel", run_by_parallel_spy)
+
+    job_results = run_by_serial(job_configs=job_configs, max_jobs_per_worker=2, field_cache_size=1 << 20)
+    assert all(r.succeeded for r in job_results)
+    assert len(calls) == 1
+    assert calls[0]["max_workers"] == 1
+    assert calls[0]["max_jobs_per_worker"] == 2
+    assert calls[0]["field_cache_size"] == 1 << 20
+    pids = get_job_pids(tmp_path, forecast_hours)
+    assert pids[0] == pids[1] != pids[2]
+    assert os.getpid() not in pids
+
+    # without limits, jobs run in current process.
+    calls.clear()
+    job_results = run_by_serial(job_configs=job_configs)
+    assert all(r.succeeded for r in job_results)
+    assert len(calls) == 0
+    assert get_job_pids(tmp_path, forecast_hours) == [os.getpid()] * 3
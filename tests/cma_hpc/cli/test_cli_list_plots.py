@@ -0,0 +1,14 @@
+from typer.testing import CliRunner
+
+
+from cemc_plots_kit.__main__ import app
+from cemc_plots_kit.registry import get_plot_names
+
+
+def test_list_plots():
+    runner = CliRunner()
+    result = runner.invoke(app, ["list-plots"])
+
+    assert result.exit_code == 0
+    plot_names = [line.split()[0] for line in result.output.strip().splitlines()]
+    assert plot_names == get_plot_names()
@@ -72,3 +72,8 @@ def get_plot_area(name: str) -> Optional[PlotArea]:
 @pytest.fixture
 def cn_area_north_china() -> PlotArea:
     return get_plot_area("NorthChina")
+
+
+@pytest.fixture
+def cn_area_list() -> list[PlotArea]:
+    return cn_areas